@@ -0,0 +1,9 @@
+# __init__.py
+# -*- coding: utf-8 -*-
+
+"""Headless benchmarks of ParticlePy.
+
+All benchmarks run with SDL's dummy video driver, so no display is needed.
+
+Usage: python -m benchmarks [--counts 1000 10000 100000] [--output results.json]
+"""
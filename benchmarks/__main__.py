@@ -0,0 +1,95 @@
+# __main__.py
+# -*- coding: utf-8 -*-
+
+"""Runs all benchmarks and writes the results as JSON.
+
+Usage: python -m benchmarks [-h]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks import scenarios  # noqa: E402
+
+
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="particle counts of the steady scenario")
+    parser.add_argument("--shapes", nargs="+", choices=scenarios.SHAPES, default=list(scenarios.SHAPES),
+                        help="shapes of the steady scenario")
+    parser.add_argument("--frames", type=int, default=10, help="timed frames per steady run")
+    parser.add_argument("--churn-frames", type=int, default=600, help="frames of the churn scenario, 0 to skip it")
+    parser.add_argument("--churn-rate", type=int, default=5, help="particles emitted per churn frame")
+    parser.add_argument("--tiled-threads", type=int, nargs="*", default=[1],
+                        help="thread counts of the tiled rendering scenario on a 4K target, none to skip it")
+    parser.add_argument("--seed", type=int, default=0, help="seed of random values")
+    parser.add_argument("--output", help="file to write the JSON results to instead of stdout")
+    return parser.parse_args(arguments)
+
+
+def environment():
+    import numpy
+    import pygame
+    import particlepy
+    return {"python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "particlepy": particlepy.__version__,
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(str(part) for part in pygame.get_sdl_version()),
+            "numpy": numpy.__version__,
+            "video_driver": os.environ.get("SDL_VIDEODRIVER")}
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    results = []
+    for shape in arguments.shapes:
+        for count in arguments.counts:
+            for gravity in (False, True):
+                for fade in (False, True):
+                    result = scenarios.steady(shape=shape, count=count, frames=arguments.frames, gravity=gravity,
+                                              fade=fade, seed=arguments.seed)
+                    results.append(result)
+                    print("steady {:<6} {:>7} gravity={:<5} fade={:<5} {}".format(
+                        shape, count, str(gravity), str(fade),
+                        " ".join("{}={:.2f}ms".format(name, phase["median_ms"])
+                                 for name, phase in result["phases"].items())), file=sys.stderr)
+    if arguments.churn_frames > 0:
+        result = scenarios.churn(frames=arguments.churn_frames, rate=arguments.churn_rate, seed=arguments.seed)
+        results.append(result)
+        print("churn  rect   {:>7} {}".format(result["max_particles"],
+                                               " ".join("{}={:.2f}ms".format(name, phase["median_ms"])
+                                                        for name, phase in result["phases"].items())),
+              file=sys.stderr)
+
+    for threads in arguments.tiled_threads:
+        for count in arguments.counts:
+            result = scenarios.tiled(count=count, frames=arguments.frames, threads=threads, seed=arguments.seed)
+            results.append(result)
+            print("tiled  circle {:>7} threads={:<3} serial={:.2f}ms tiled={:.2f}ms speedup={:.2f}".format(
+                count, threads, result["phases"]["serial"]["median_ms"], result["phases"]["tiled"]["median_ms"],
+                result["speedup"]), file=sys.stderr)
+
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+              "environment": environment(),
+              "settings": vars(arguments),
+              "results": results}
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
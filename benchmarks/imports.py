@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# imports.py
+
+"""Measures import time and memory of particlepy in fresh interpreters.
+
+"headless" only imports particlepy, "render" also makes the first surface, which loads pygame.
+Memory is the Python heap traced by :mod:`tracemalloc` and the peak resident set size of the process.
+
+Usage: python benchmarks/imports.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+CODE = """
+import json, os, resource, sys, time, tracemalloc
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, {root!r})
+tracemalloc.start()
+start = time.perf_counter()
+import particlepy
+if {render!r}:
+    particlepy.shape.Circle(radius=4, color=(3, 80, 111)).make_surface()
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds,
+                  "traced_bytes": tracemalloc.get_traced_memory()[0],
+                  "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  "pygame_loaded": "pygame" in sys.modules}}))
+"""
+
+
+def measure(render, runs):
+    samples = [json.loads(subprocess.check_output([sys.executable, "-c", CODE.format(root=ROOT, render=render)]))
+               for _ in range(runs)]
+    return {"seconds": statistics.median(sample["seconds"] for sample in samples),
+            "traced_bytes": statistics.median(sample["traced_bytes"] for sample in samples),
+            "max_rss_kib": statistics.median(sample["max_rss_kib"] for sample in samples),
+            "pygame_loaded": samples[0]["pygame_loaded"]}
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(json.dumps({"headless": measure(False, runs), "render": measure(True, runs)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# memory.py
+
+"""Measures the Python heap memory per particle with :mod:`tracemalloc`.
+
+"baseline" is the object per particle layout before slots: every particle and shape has a ``__dict__``, lists for
+position, velocity and color and a data dict. "current" is what is left after building, "peak" the most memory used
+while building. Surface pixels are allocated by SDL and are not included.
+
+Usage: python benchmarks/memory.py [count]
+"""
+
+import os
+import sys
+import gc
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import particlepy  # noqa: E402
+
+
+class LegacyShape(object):
+    """Shape with the attributes of :class:`particlepy.shape.Circle` before slots, without surface"""
+
+    def __init__(self, radius, color, alpha=255, angle=0):
+        self._orig_alpha = alpha
+        self.alpha = self._orig_alpha
+        self.angle = angle
+        self._orig_angle = self.angle
+        self.radius = radius
+        self._orig_radius = self.radius
+        self.color = list(color)
+        self._orig_color = tuple(self.color)
+        self.surface = None
+        self.rect = None
+
+
+class LegacyParticle(object):
+    """Particle with the attributes of :class:`particlepy.particle.Particle` before slots"""
+
+    def __init__(self, shape, position, velocity, delta_radius, data=None, alive=True):
+        self.shape = shape
+        self.position = list(position)
+        self.velocity = list(velocity)
+        self.delta_radius = delta_radius
+        self.progress, self.inverted_progress = 1.0, 0.0
+        self.data = data if data else {}
+        self.time = 0
+        self.alive = alive
+
+
+def baseline(count):
+    return [LegacyParticle(shape=LegacyShape(radius=4, color=(3, 80, 111)),
+                           position=(i % 800, i // 800),
+                           velocity=(1, -1),
+                           delta_radius=0.1) for i in range(count)]
+
+
+def make_particles(count):
+    return [particlepy.particle.Particle(shape=particlepy.shape.Circle(radius=4, color=(3, 80, 111)),
+                                        position=(i % 800, i // 800),
+                                        velocity=(1, -1),
+                                        delta_radius=0.1) for i in range(count)]
+
+
+def measure(build, count):
+    """Returns the current and peak bytes per particle of building :attr:`count` particles"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(count)
+    gc.collect()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return (after - before) / count, (peak - before) / count
+
+
+def detached(count):
+    return make_particles(count)
+
+
+def emitted(count):
+    particle_system = particlepy.particle.ParticleSystem()
+    for particle in make_particles(count):
+        particle_system.emit(particle)
+    return particle_system
+
+
+def rows(count):
+    particle_system = particlepy.particle.ParticleSystem()
+    particle_system.emit_many(count=count, shape=particlepy.shape.Circle(radius=4, color=(3, 80, 111)),
+                              position=[(i % 800, i // 800) for i in range(count)], velocity=(1, -1), delta_radius=0.1)
+    return particle_system
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print("particles: {}".format(count))
+    base_current, base_peak = measure(baseline, count)
+    print("{:<20} {:>9} {:>9} {:>8}".format("layout", "current", "peak", "saved"))
+    for name, build in (("baseline", baseline), ("detached particle", detached), ("emitted particle", emitted),
+                        ("emit_many row", rows)):
+        current, peak = (base_current, base_peak) if build is baseline else measure(build, count)
+        print("{:<20} {:>7.1f} B {:>7.1f} B {:>7.1f}%".format(name, current, peak,
+                                                             100 * (1 - current / base_current)))
+
+
+if __name__ == "__main__":
+    main()
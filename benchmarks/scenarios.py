@@ -0,0 +1,207 @@
+# scenarios.py
+# -*- coding: utf-8 -*-
+
+"""Benchmark scenarios. Every scenario returns a dictionary which can be serialized as JSON."""
+
+import os
+import math
+import random
+import statistics
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy  # noqa: E402
+import pygame  # noqa: E402
+
+import particlepy  # noqa: E402
+
+SCREEN_SIZE = 800, 800
+DELTA_TIME = 1 / 60
+GRAVITY = (0, 1)
+FADE_COLOR = (83, 150, 181)
+FADE_ALPHA = 0
+SHAPES = ("circle", "rect", "image")
+TARGET_4K = 3840, 2160
+
+
+def make_screen():
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode(SCREEN_SIZE)
+    return pygame.Surface(SCREEN_SIZE)
+
+
+def make_prototype(name):
+    if name == "circle":
+        return particlepy.shape.Circle(radius=8, color=(3, 80, 111))
+    if name == "rect":
+        return particlepy.shape.Rect(radius=8, color=(3, 80, 111), angle=30)
+    if name == "image":
+        surface = pygame.Surface((16, 16), pygame.SRCALPHA)
+        pygame.draw.circle(surface, (255, 200, 80), (8, 8), 8)
+        return particlepy.shape.Image(surface=surface, size=(16, 16))
+    raise ValueError("unknown shape '{}'".format(name))
+
+
+def summarize(samples):
+    """Returns the timings of one phase in milliseconds"""
+    return {"mean_ms": statistics.mean(samples) * 1000,
+            "median_ms": statistics.median(samples) * 1000,
+            "min_ms": min(samples) * 1000,
+            "max_ms": max(samples) * 1000}
+
+
+def steady(shape, count, frames, gravity, fade, seed=0):
+    """Times the phases of a system with :attr:`count` long-living particles.
+
+    The particles are emitted at once and shrink so slowly that the count stays the same during all frames.
+    """
+    screen = make_screen()
+    rng = numpy.random.default_rng(seed)
+    particle_system = particlepy.particle.ParticleSystem(capacity=count)
+    particle_system.emit_many(count=count, shape=make_prototype(shape),
+                              position=rng.uniform((0, 0), SCREEN_SIZE, size=(count, 2)),
+                              velocity=rng.uniform(-150, 150, size=(count, 2)),
+                              delta_radius=rng.uniform(0.001, 0.01, size=count),
+                              angle=rng.uniform(0, 360, size=count))
+    gravity = GRAVITY if gravity else None
+
+    phases = {"update": [], "make_shape": [], "render": []}
+    if fade:
+        phases["fade"] = []
+
+    # the first frame makes every surface and is not timed
+    particle_system.make_shape()
+    particle_system.render(screen)
+
+    for _ in range(frames):
+        start = time.perf_counter()
+        particle_system.update(delta_time=DELTA_TIME, gravity=gravity)
+        phases["update"].append(time.perf_counter() - start)
+
+        if fade:
+            start = time.perf_counter()
+            if shape != "image":
+                particlepy.math.fade_system_color(particle_system, FADE_COLOR)
+            particlepy.math.fade_system_alpha(particle_system, FADE_ALPHA)
+            phases["fade"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        particle_system.make_shape()
+        phases["make_shape"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        particle_system.render(screen)
+        phases["render"].append(time.perf_counter() - start)
+        screen.fill((13, 17, 23))
+
+    return {"scenario": "steady",
+            "shape": shape,
+            "count": count,
+            "frames": frames,
+            "gravity": gravity is not None,
+            "fade": fade,
+            "particles": particle_system.store.count,
+            "phases": {name: summarize(samples) for name, samples in phases.items()}}
+
+
+def churn(frames, rate=5, seed=0):
+    """Reproduces the main loop of ``examples/example.py``.
+
+    Every frame :attr:`rate` rectangles are emitted at a cursor moving in a circle, colors are faded per particle,
+    shapes are made, rotated by 5 degrees and rendered. Timings include the Python loops of the example.
+    """
+    screen = make_screen()
+    random.seed(seed)
+    particle_system = particlepy.particle.ParticleSystem()
+    phases = {"update": [], "emit": [], "fade": [], "make_shape": [], "rotate": [], "render": []}
+    counts = []
+
+    for frame in range(frames):
+        start = time.perf_counter()
+        particle_system.update(delta_time=DELTA_TIME)
+        phases["update"].append(time.perf_counter() - start)
+
+        cursor = (400 + 200 * math.cos(frame / 30), 400 + 200 * math.sin(frame / 30))
+        start = time.perf_counter()
+        for _ in range(rate):
+            particle_system.emit(
+                particlepy.particle.Particle(shape=particlepy.shape.Rect(radius=16,
+                                                                         angle=random.randint(0, 360),
+                                                                         color=(3, 80, 111),
+                                                                         alpha=255),
+                                             position=cursor,
+                                             velocity=(random.uniform(-150, 150), random.uniform(-150, 150)),
+                                             delta_radius=0.2))
+        phases["emit"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for particle in particle_system.particles:
+            particle.shape.color = particlepy.math.fade_color(particle=particle,
+                                                              color=FADE_COLOR,
+                                                              progress=particle.inverted_progress)
+        phases["fade"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        particle_system.make_shape()
+        phases["make_shape"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for particle in particle_system.particles:
+            particle.shape.angle += 5
+        phases["rotate"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        particle_system.render(screen)
+        phases["render"].append(time.perf_counter() - start)
+        screen.fill((13, 17, 23))
+        counts.append(particle_system.store.count)
+
+    return {"scenario": "churn",
+            "shape": "rect",
+            "rate": rate,
+            "frames": frames,
+            "particles": counts[-1] if counts else 0,
+            "max_particles": max(counts, default=0),
+            "phases": {name: summarize(samples) for name, samples in phases.items()}}
+
+
+def tiled(count, frames, threads, tile_size=(512, 512), seed=0):
+    """Compares serial rendering with :class:`particlepy.render.TiledRenderer` on a 4K target."""
+    import particlepy.render
+
+    make_screen()
+    target = pygame.Surface(TARGET_4K)
+    rng = numpy.random.default_rng(seed)
+    particle_system = particlepy.particle.ParticleSystem(capacity=count)
+    particle_system.emit_many(count=count, shape=make_prototype("circle"),
+                              position=rng.uniform((0, 0), TARGET_4K, size=(count, 2)),
+                              velocity=(0, 0), delta_radius=0,
+                              radius=rng.uniform(2, 16, size=count),
+                              color=rng.uniform(0, 255, size=(count, 3)))
+    particle_system.make_shape()
+
+    renderer = particlepy.render.TiledRenderer(tile_size=tile_size, threads=threads, min_particles=0)
+    phases = {"serial": [], "tiled": []}
+    for name, active in (("serial", None), ("tiled", renderer)):
+        particle_system.renderer = active
+        particle_system.render(target)
+        for _ in range(frames):
+            target.fill((13, 17, 23))
+            start = time.perf_counter()
+            particle_system.render(target)
+            phases[name].append(time.perf_counter() - start)
+    renderer.close()
+
+    serial = statistics.median(phases["serial"])
+    return {"scenario": "tiled",
+            "shape": "circle",
+            "count": count,
+            "frames": frames,
+            "target": list(TARGET_4K),
+            "tile_size": list(tile_size),
+            "threads": threads,
+            "speedup": serial / statistics.median(phases["tiled"]),
+            "phases": {name: summarize(samples) for name, samples in phases.items()}}
@@ -4,6 +4,17 @@
 __author__ = "grimmigerFuchs"
 __version__ = "1.1.0"
 
+import particlepy.lazy
 import particlepy.particle
 import particlepy.shape
 import particlepy.math
+import particlepy.store
+import particlepy.cache
+import particlepy.emitter
+import particlepy.stats
+import particlepy.render
+import particlepy.spatial
+import particlepy.forces
+import particlepy.noise
+import particlepy.replay
+import particlepy.snapshot
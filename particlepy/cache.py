@@ -0,0 +1,411 @@
+# cache.py
+# -*- coding: utf-8 -*-
+
+from typing import Tuple, List, Hashable, Dict, Callable
+from collections import OrderedDict
+import weakref
+
+from particlepy.lazy import pygame
+
+import particlepy.shape
+
+
+class Quantizer(object):
+    """Quantizes the visual state of shapes. Shapes with equal keys look (almost) the same, so their surfaces can be shared
+        (:class:`SpriteCache`) or do not have to be made again (:func:`particlepy.shape.Shape.refresh_surface()`)
+
+    Args:
+        radius_step (float, optional): Quantization step of radius, defaults to `0.5`
+        color_step (int, optional): Quantization step of each color channel, defaults to `4`
+        alpha_step (int, optional): Quantization step of alpha, defaults to `4`
+        angle_step (float, optional): Quantization step of angle in degrees, defaults to `5`
+
+    Attributes:
+        radius_step (float): Quantization step of radius
+        color_step (int): Quantization step of each color channel
+        alpha_step (int): Quantization step of alpha
+        angle_step (float): Quantization step of angle in degrees
+    """
+
+    def __init__(self, radius_step: float = 0.5, color_step: int = 4, alpha_step: int = 4, angle_step: float = 5):
+        """Constructor method
+        """
+        self.radius_step = radius_step
+        self.color_step = color_step
+        self.alpha_step = alpha_step
+        self.angle_step = angle_step
+
+    def make_key(self, kind: type, radius: float, color: Tuple[float, float, float], alpha: float,
+                 angle: float) -> Tuple:
+        """Quantizes the visual state of a shape
+
+        Args:
+            kind (type): Class of shape
+            radius (float): Radius of shape
+            color (Tuple[float, float, float]): Color of shape
+            alpha (float): Transparency of shape
+            angle (float): Degrees of rotation
+
+        Returns:
+            Tuple: Key of the surface
+        """
+        color_step = self.color_step
+        return (kind,
+                round(radius / self.radius_step),
+                int(color[0]) // color_step, int(color[1]) // color_step, int(color[2]) // color_step,
+                int(alpha) // self.alpha_step,
+                round((angle % 360) / self.angle_step))
+
+
+def _surface_bytes(surface: "pygame.Surface") -> int:
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class SpriteCache(Quantizer):
+    """Least recently used cache of shape surfaces. Shapes whose quantized radius, color, alpha and angle are equal share
+        one surface, so :func:`particlepy.shape.BaseForm.make_surface()` only draws a new surface on a cache miss.
+        Cached surfaces are shared between shapes and must not be modified
+
+    Args:
+        max_size (int, optional): Maximum number of cached surfaces, defaults to `4096`
+        radius_step (float, optional): Quantization step of radius, defaults to `0.5`
+        color_step (int, optional): Quantization step of each color channel, defaults to `4`
+        alpha_step (int, optional): Quantization step of alpha, defaults to `4`
+        angle_step (float, optional): Quantization step of angle in degrees, defaults to `5`
+        max_bytes (int, optional): Maximum memory of the cached surfaces, `None` for no limit, defaults to `None`
+
+    Attributes:
+        max_size (int): Maximum number of cached surfaces
+        max_bytes (int): Maximum memory of the cached surfaces, `None` for no limit
+        bytes (int): Memory of the cached surfaces, width times height times bytes per pixel
+        radius_step (float): Quantization step of radius
+        color_step (int): Quantization step of each color channel
+        alpha_step (int): Quantization step of alpha
+        angle_step (float): Quantization step of angle in degrees
+        hits (int): Number of lookups which found a surface
+        misses (int): Number of lookups which did not find a surface
+        evictions (int): Number of surfaces removed because :attr:`max_size` or :attr:`max_bytes` was reached
+    """
+
+    def __init__(self, max_size: int = 4096, radius_step: float = 0.5, color_step: int = 4, alpha_step: int = 4,
+                 angle_step: float = 5, max_bytes: int = None):
+        """Constructor method
+        """
+        super(SpriteCache, self).__init__(radius_step=radius_step, color_step=color_step, alpha_step=alpha_step,
+                                          angle_step=angle_step)
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.bytes = 0
+
+        self._surfaces: "OrderedDict[Hashable, pygame.Surface]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    @property
+    def hit_rate(self) -> float:
+        """Returns the share of lookups which found a surface
+
+        Returns:
+            float: :code:`hits / (hits + misses)`, `0` if there were no lookups
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: Hashable) -> "pygame.Surface":
+        """Looks up a surface and marks it as most recently used
+
+        Args:
+            key (Hashable): Key made by :func:`SpriteCache.make_key()`
+
+        Returns:
+            :class:`pygame.Surface`: Cached surface, `None` if there is none
+        """
+        surface = self._surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+        return surface
+
+    def put(self, key: Hashable, surface: "pygame.Surface"):
+        """Adds a surface and evicts the least recently used ones if :attr:`max_size` or :attr:`max_bytes` is exceeded
+
+        Args:
+            key (Hashable): Key made by :func:`SpriteCache.make_key()`
+            surface (:class:`pygame.Surface`): Surface to cache
+        """
+        surfaces = self._surfaces
+        old = surfaces.get(key)
+        if old is not None:
+            self.bytes -= _surface_bytes(old)
+        surfaces[key] = surface
+        surfaces.move_to_end(key)
+        self.bytes += _surface_bytes(surface)
+        while surfaces and (len(surfaces) > self.max_size or
+                            (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            self.bytes -= _surface_bytes(surfaces.popitem(last=False)[1])
+            self.evictions += 1
+
+    def clear(self):
+        """Removes all cached surfaces
+        """
+        self._surfaces.clear()
+        self.bytes = 0
+
+    def reset_stats(self):
+        """Sets :attr:`hits`, :attr:`misses` and :attr:`evictions` to `0`
+        """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class TintCache(SpriteCache):
+    """Cache of white base surfaces and of tinted copies of them. Shapes whose quantized radius and angle are equal share
+        one base surface, drawn once in white, and every quantized color and alpha gets a copy of that base multiplied
+        by the color with :code:`pygame.BLEND_RGBA_MULT`. Fading the color of shapes (e.g. with
+        :func:`particlepy.math.fade_color()`) then only tints a copy of an existing base instead of drawing and rotating
+        the shape again. Tinted surfaces are shared between shapes and must not be modified
+
+    Args:
+        max_size (int, optional): Maximum number of tinted surfaces, defaults to `4096`
+        max_bases (int, optional): Maximum number of base surfaces, defaults to `1024`
+        radius_step (float, optional): Quantization step of radius, defaults to `0.5`
+        color_step (int, optional): Quantization step of each color channel, defaults to `4`
+        alpha_step (int, optional): Quantization step of alpha, defaults to `4`
+        angle_step (float, optional): Quantization step of angle in degrees, defaults to `5`
+
+    Attributes:
+        max_bases (int): Maximum number of base surfaces
+        base_hits (int): Number of tinted surfaces made from an existing base
+        base_misses (int): Number of base surfaces drawn
+    """
+
+    def __init__(self, max_size: int = 4096, max_bases: int = 1024, radius_step: float = 0.5, color_step: int = 4,
+                 alpha_step: int = 4, angle_step: float = 5):
+        """Constructor method
+        """
+        super(TintCache, self).__init__(max_size=max_size, radius_step=radius_step, color_step=color_step,
+                                        alpha_step=alpha_step, angle_step=angle_step)
+        self.max_bases = max_bases
+
+        self._bases: "OrderedDict[Hashable, pygame.Surface]" = OrderedDict()
+
+        self.base_hits = 0
+        self.base_misses = 0
+
+    @staticmethod
+    def base_key(key: Tuple) -> Tuple:
+        """Returns the part of a key made by :func:`TintCache.make_key()` which selects the base surface
+
+        Args:
+            key (Tuple): Key of a tinted surface
+
+        Returns:
+            Tuple: Class of shape, quantized radius and quantized angle
+        """
+        kind, radius, red, green, blue, alpha, angle = key
+        return kind, radius, angle
+
+    def tint(self, key: Tuple, color: Tuple[float, float, float], alpha: float,
+             make_base: Callable[[], "pygame.Surface"]) -> "pygame.Surface":
+        """Returns the tinted surface of :attr:`key`, made from the base surface if it is not cached
+
+        Args:
+            key (Tuple): Key made by :func:`TintCache.make_key()`
+            color (Tuple[float, float, float]): Color multiplied into the base surface
+            alpha (float): Transparency of the tinted surface
+            make_base (Callable[[], :class:`pygame.Surface`]): Draws the base surface in white if there is none
+
+        Returns:
+            :class:`pygame.Surface`: Tinted surface
+        """
+        surface = self.get(key)
+        if surface is not None:
+            return surface
+
+        base_key = self.base_key(key)
+        base = self._bases.get(base_key)
+        if base is None:
+            self.base_misses += 1
+            base = make_base()
+            self._bases[base_key] = base
+            while len(self._bases) > self.max_bases:
+                self._bases.popitem(last=False)
+        else:
+            self.base_hits += 1
+            self._bases.move_to_end(base_key)
+
+        surface = base.copy()
+        red, green, blue = color
+        surface.fill((int(red), int(green), int(blue), 255), special_flags=pygame.BLEND_RGBA_MULT)
+        surface.set_alpha(int(alpha))
+        self.put(key, surface)
+        return surface
+
+    def clear(self):
+        """Removes all cached base and tinted surfaces
+        """
+        super(TintCache, self).clear()
+        self._bases.clear()
+
+    def reset_stats(self):
+        """Sets :attr:`hits`, :attr:`misses`, :attr:`evictions`, :attr:`base_hits` and :attr:`base_misses` to `0`
+        """
+        super(TintCache, self).reset_stats()
+        self.base_hits = 0
+        self.base_misses = 0
+
+
+class ImageChain(object):
+    """Pre-scaled and pre-rotated versions of one source surface, used by :class:`particlepy.shape.Image` in prebaked mode.
+        The surfaces are made on the first call of :func:`ImageChain.get()` and shared by all images using the chain.
+        Use :func:`get_image_chain()` to get the shared chain of a surface
+
+    Args:
+        surface (:class:`pygame.Surface`): Source surface
+        size (Tuple[int, int]): Biggest size of the chain
+        size_steps (int, optional): Number of sizes from :code:`size / size_steps` up to :attr:`size`, defaults to `16`
+        angle_steps (int, optional): Number of angles evenly spread over `360` degrees, defaults to `36`
+        max_bytes (int, optional): Memory limit of the pre-made surfaces and their transparent copies.
+            :attr:`angle_steps` and then :attr:`size_steps` are halved until the chain fits, the rest is left to
+            :attr:`alpha_cache`, defaults to `32 MiB`
+        alpha_cache_size (int, optional): Maximum number of transparent copies kept in :attr:`alpha_cache`, defaults to `1024`
+
+    Attributes:
+        size (Tuple[int, int]): Biggest size of the chain
+        size_steps (int): Number of sizes
+        angle_steps (int): Number of angles
+        max_bytes (int): Memory limit of the pre-made surfaces and their transparent copies
+        alpha_cache (:class:`SpriteCache`): Copies of chain surfaces with alpha below `255`, limited to the memory the
+            pre-made surfaces leave of :attr:`max_bytes`
+        surfaces (List[List[:class:`pygame.Surface`]]): Surfaces by size and angle index, empty until first use
+    """
+
+    def __init__(self, surface: "pygame.Surface", size: Tuple[int, int], size_steps: int = 16, angle_steps: int = 36,
+                 max_bytes: int = 32 * 1024 * 1024, alpha_cache_size: int = 1024):
+        """Constructor method
+        """
+        self._source = surface.copy()
+        self.size = (int(size[0]), int(size[1]))
+        self.size_steps = max(int(size_steps), 1)
+        self.angle_steps = max(int(angle_steps), 1)
+        self.max_bytes = max_bytes
+        self.alpha_cache = SpriteCache(max_size=alpha_cache_size)
+        self.surfaces: List[List[pygame.Surface]] = []
+
+    def estimate_bytes(self, size_steps: int, angle_steps: int) -> int:
+        """Estimates the memory of the pre-made surfaces with 4 bytes per pixel and the bounding box of rotated surfaces
+
+        Args:
+            size_steps (int): Number of sizes
+            angle_steps (int): Number of angles
+
+        Returns:
+            int: Estimated number of bytes
+        """
+        # rotated surfaces grow up to the diagonal, (1 + sqrt(2)) / 2 squared is an average of about 1.46
+        factor = 1 if angle_steps == 1 else 1.46
+        total = 0
+        for width, height in self._level_sizes(size_steps):
+            total += width * height * 4 * factor * angle_steps
+        return int(total)
+
+    def _level_sizes(self, size_steps: int) -> List[Tuple[int, int]]:
+        return [(max(round(self.size[0] * level / size_steps), 1), max(round(self.size[1] * level / size_steps), 1))
+                for level in range(1, size_steps + 1)]
+
+    def build(self):
+        """Makes all scaled and rotated surfaces if they are not made yet
+        """
+        if self.surfaces:
+            return
+        while self.estimate_bytes(self.size_steps, self.angle_steps) > self.max_bytes:
+            if self.angle_steps > 1:
+                self.angle_steps //= 2
+            elif self.size_steps > 1:
+                self.size_steps //= 2
+            else:
+                break
+        for level_size in self._level_sizes(self.size_steps):
+            scaled = pygame.transform.scale(self._source, level_size)
+            self.surfaces.append([particlepy.shape.rotate(surface=scaled, angle=360 * step / self.angle_steps)
+                                  for step in range(self.angle_steps)])
+        # transparent copies get what is left of the memory limit
+        used = sum(_surface_bytes(surface) for level in self.surfaces for surface in level)
+        self.alpha_cache.max_bytes = max(self.max_bytes - used, 0)
+
+    def make_key(self, size: Tuple[float, float], angle: float, alpha: float = 255) -> Tuple[int, int, int]:
+        """Returns the indices of the pre-made surface nearest to :attr:`size` and :attr:`angle`.
+            The chain has to be built before
+
+        Args:
+            size (Tuple[float, float]): Size of image, the width selects the size step
+            angle (float): Degrees of rotation
+            alpha (float, optional): Transparency, defaults to `255`
+
+        Returns:
+            Tuple[int, int, int]: Size index, angle index and quantized alpha (`None` for opaque surfaces)
+        """
+        level = min(max(round(size[0] / self.size[0] * self.size_steps), 1), self.size_steps) - 1
+        step = round((angle % 360) * self.angle_steps / 360) % self.angle_steps
+        return level, step, None if alpha >= 255 else int(alpha) // self.alpha_cache.alpha_step
+
+    def get(self, size: Tuple[float, float], angle: float, alpha: float = 255) -> "pygame.Surface":
+        """Returns the pre-made surface nearest to :attr:`size` and :attr:`angle`. Surfaces with alpha below `255` are
+            copies kept in :attr:`alpha_cache`
+
+        Args:
+            size (Tuple[float, float]): Size of image, the width selects the size step
+            angle (float): Degrees of rotation
+            alpha (float, optional): Transparency, defaults to `255`
+
+        Returns:
+            :class:`pygame.Surface`: Surface which must not be modified
+        """
+        self.build()
+        key = self.make_key(size=size, angle=angle, alpha=alpha)
+        level, step, alpha_level = key
+        surface = self.surfaces[level][step]
+        if alpha_level is None:
+            return surface
+
+        transparent = self.alpha_cache.get(key)
+        if transparent is None:
+            transparent = surface.copy()
+            transparent.set_alpha(alpha)
+            self.alpha_cache.put(key, transparent)
+        return transparent
+
+
+_image_chains: "weakref.WeakKeyDictionary[pygame.Surface, Dict[Tuple, ImageChain]]" = weakref.WeakKeyDictionary()
+
+
+def get_image_chain(surface: "pygame.Surface", size: Tuple[int, int], size_steps: int = 16, angle_steps: int = 36,
+                    max_bytes: int = 32 * 1024 * 1024) -> ImageChain:
+    """Returns the :class:`ImageChain` shared by all images with the same source surface and chain arguments.
+        The chain is dropped together with the source surface
+
+    Args:
+        surface (:class:`pygame.Surface`): Source surface
+        size (Tuple[int, int]): Biggest size of the chain
+        size_steps (int, optional): Number of sizes, defaults to `16`
+        angle_steps (int, optional): Number of angles, defaults to `36`
+        max_bytes (int, optional): Memory limit of the pre-made surfaces, defaults to `32 MiB`
+
+    Returns:
+        :class:`ImageChain`: Shared chain
+    """
+    chains = _image_chains.setdefault(surface, {})
+    key = (int(size[0]), int(size[1]), size_steps, angle_steps, max_bytes)
+    chain = chains.get(key)
+    if chain is None:
+        chain = chains[key] = ImageChain(surface=surface, size=size, size_steps=size_steps, angle_steps=angle_steps,
+                                         max_bytes=max_bytes)
+    return chain
@@ -0,0 +1,252 @@
+# emitter.py
+# -*- coding: utf-8 -*-
+
+from typing import Tuple, Union
+import numpy
+
+import particlepy.particle
+import particlepy.shape
+
+
+class Distribution(object):
+    """This is the distribution class. It is only used to subclass and draws random values for many particles at once
+    """
+
+    def sample(self, rng: numpy.random.Generator, count: int) -> numpy.ndarray:
+        """Draws :attr:`count` values
+
+        Args:
+            rng (:class:`numpy.random.Generator`): Random number generator
+            count (int): Number of values
+
+        Returns:
+            :class:`numpy.ndarray`: Values, shape `(count,)` or `(count, components)`
+        """
+        raise NotImplementedError
+
+
+class Uniform(Distribution):
+    """Uniform distribution between :attr:`low` and :attr:`high`. Both can be numbers or sequences
+        (e.g. :code:`Uniform((-150, -150), (150, 150))` for velocities or two colors)
+
+    Args:
+        low (Union[float, Tuple[float, ...]]): Lower bound
+        high (Union[float, Tuple[float, ...]]): Upper bound
+
+    Attributes:
+        low (:class:`numpy.ndarray`): Lower bound
+        high (:class:`numpy.ndarray`): Upper bound
+    """
+
+    def __init__(self, low: Union[float, Tuple[float, ...]], high: Union[float, Tuple[float, ...]]):
+        """Constructor method
+        """
+        self.low = numpy.asarray(low, dtype=numpy.float32)
+        self.high = numpy.asarray(high, dtype=numpy.float32)
+
+    def sample(self, rng: numpy.random.Generator, count: int) -> numpy.ndarray:
+        shape = (count,) + numpy.broadcast(self.low, self.high).shape
+        return rng.uniform(self.low, self.high, size=shape)
+
+
+class Normal(Distribution):
+    """Normal distribution around :attr:`mean`. Both arguments can be numbers or sequences
+
+    Args:
+        mean (Union[float, Tuple[float, ...]]): Mean value
+        deviation (Union[float, Tuple[float, ...]]): Standard deviation
+
+    Attributes:
+        mean (:class:`numpy.ndarray`): Mean value
+        deviation (:class:`numpy.ndarray`): Standard deviation
+    """
+
+    def __init__(self, mean: Union[float, Tuple[float, ...]], deviation: Union[float, Tuple[float, ...]]):
+        """Constructor method
+        """
+        self.mean = numpy.asarray(mean, dtype=numpy.float32)
+        self.deviation = numpy.asarray(deviation, dtype=numpy.float32)
+
+    def sample(self, rng: numpy.random.Generator, count: int) -> numpy.ndarray:
+        shape = (count,) + numpy.broadcast(self.mean, self.deviation).shape
+        return rng.normal(self.mean, self.deviation, size=shape)
+
+
+class Cone(Distribution):
+    """Two-dimensional vectors pointing in a cone, e.g. for velocities of sparks
+
+    Args:
+        direction (float, optional): Degrees of the cone axis, `0` points right and `90` down (pygame coordinates),
+            defaults to `0`
+        spread (float, optional): Opening angle of the cone in degrees, `360` for all directions, defaults to `360`
+        speed (Union[float, :class:`Distribution`], optional): Length of vectors, defaults to `1`
+
+    Attributes:
+        direction (float): Degrees of the cone axis
+        spread (float): Opening angle of the cone in degrees
+        speed (Union[float, :class:`Distribution`]): Length of vectors
+    """
+
+    def __init__(self, direction: float = 0, spread: float = 360, speed: Union[float, Distribution] = 1):
+        """Constructor method
+        """
+        self.direction = direction
+        self.spread = spread
+        self.speed = speed
+
+    def sample(self, rng: numpy.random.Generator, count: int) -> numpy.ndarray:
+        angles = numpy.radians(self.direction + rng.uniform(-self.spread / 2, self.spread / 2, size=count))
+        speeds = sample(self.speed, rng, count)
+        return numpy.stack((numpy.cos(angles), numpy.sin(angles)), axis=1) * numpy.reshape(speeds, (count, 1))
+
+
+class Ring(Distribution):
+    """Two-dimensional vectors evenly spread over a ring between :attr:`inner` and :attr:`outer` radius,
+        e.g. for spawn offsets or explosions
+
+    Args:
+        inner (float): Inner radius
+        outer (float): Outer radius
+
+    Attributes:
+        inner (float): Inner radius
+        outer (float): Outer radius
+    """
+
+    def __init__(self, inner: float, outer: float):
+        """Constructor method
+        """
+        self.inner = inner
+        self.outer = outer
+
+    def sample(self, rng: numpy.random.Generator, count: int) -> numpy.ndarray:
+        angles = rng.uniform(0, 2 * numpy.pi, size=count)
+        radii = numpy.sqrt(rng.uniform(self.inner ** 2, self.outer ** 2, size=count))
+        return numpy.stack((numpy.cos(angles), numpy.sin(angles)), axis=1) * radii[:, None]
+
+
+def sample(value, rng: numpy.random.Generator, count: int):
+    """Draws :attr:`count` values if :attr:`value` is a :class:`Distribution` and returns it unchanged otherwise
+
+    Args:
+        value (Union[:class:`Distribution`, object]): Distribution or constant value
+        rng (:class:`numpy.random.Generator`): Random number generator
+        count (int): Number of values
+
+    Returns:
+        Union[:class:`numpy.ndarray`, object]: Values
+    """
+    if isinstance(value, Distribution):
+        return value.sample(rng, count)
+    return value
+
+
+class Emitter(object):
+    """The emitter class. It spawns many particles into a :class:`particlepy.particle.ParticleSystem` with one call of
+        :func:`particlepy.particle.ParticleSystem.emit_many()`. Every particle property is either a constant or a
+        :class:`Distribution`
+
+    Args:
+        system (:class:`particlepy.particle.ParticleSystem`): Particle system to emit into
+        shape (:class:`particlepy.shape.Shape`): Prototype of the particle shapes
+        position (Tuple[float, float]): Center position of the emitter
+        velocity (Union[Tuple[float, float], :class:`Distribution`]): Velocities
+        delta_radius (Union[float, :class:`Distribution`]): Radius decrease values
+        offset (Union[Tuple[float, float], :class:`Distribution`], optional): Offsets to :attr:`position`,
+            defaults to `None`
+        radius (Union[float, :class:`Distribution`], optional): Radii (square sizes of images), taken from :attr:`shape`
+            if `None`, defaults to `None`
+        color (Union[Tuple[int, int, int], :class:`Distribution`], optional): Colors, taken from :attr:`shape` if `None`,
+            defaults to `None`
+        alpha (Union[int, :class:`Distribution`], optional): Transparencies, taken from :attr:`shape` if `None`,
+            defaults to `None`
+        angle (Union[float, :class:`Distribution`], optional): Degrees of rotation, taken from :attr:`shape` if `None`,
+            defaults to `None`
+        rate (float, optional): Particles per second emitted by :func:`Emitter.update()`, defaults to `0`
+        seed (Union[int, :class:`numpy.random.Generator`], optional): Seed or generator for random values, `None` to
+            use :attr:`particlepy.particle.ParticleSystem.rng` of :attr:`system`, defaults to `None`
+
+    Attributes:
+        system (:class:`particlepy.particle.ParticleSystem`): Particle system to emit into
+        shape (:class:`particlepy.shape.Shape`): Prototype of the particle shapes
+        position (Tuple[float, float]): Center position of the emitter
+        velocity (Union[Tuple[float, float], :class:`Distribution`]): Velocities
+        delta_radius (Union[float, :class:`Distribution`]): Radius decrease values
+        offset (Union[Tuple[float, float], :class:`Distribution`]): Offsets to :attr:`position`
+        radius (Union[float, :class:`Distribution`]): Radii
+        color (Union[Tuple[int, int, int], :class:`Distribution`]): Colors
+        alpha (Union[int, :class:`Distribution`]): Transparencies
+        angle (Union[float, :class:`Distribution`]): Degrees of rotation
+        rate (float): Particles per second
+    """
+
+    def __init__(self, system: particlepy.particle.ParticleSystem, shape: particlepy.shape.Shape,
+                 position: Tuple[float, float], velocity, delta_radius, offset=None, radius=None, color=None,
+                 alpha=None, angle=None, rate: float = 0, seed: Union[int, numpy.random.Generator] = None):
+        """Constructor method
+        """
+        self.system = system
+        self.shape = shape
+        self.position = position
+        self.velocity = velocity
+        self.delta_radius = delta_radius
+        self.offset = offset
+        self.radius = radius
+        self.color = color
+        self.alpha = alpha
+        self.angle = angle
+        self.rate = rate
+        self._rng = None if seed is None else numpy.random.default_rng(seed)
+
+        self._accumulator = 0.0
+
+    @property
+    def rng(self) -> numpy.random.Generator:
+        """Returns the random number generator of the emitter, or the current
+            :attr:`particlepy.particle.ParticleSystem.rng` of :attr:`system` if it has none
+
+        Returns:
+            :class:`numpy.random.Generator`: Random number generator
+        """
+        return self._rng if self._rng is not None else self.system.rng
+
+    @rng.setter
+    def rng(self, rng: numpy.random.Generator):
+        self._rng = rng
+
+    def emit(self, count: int):
+        """Emits :attr:`count` particles at once
+
+        Args:
+            count (int): Number of particles
+        """
+        if count <= 0:
+            return
+        rng = self.rng
+        position = numpy.asarray(self.position, dtype=numpy.float32)
+        if self.offset is not None:
+            position = position + sample(self.offset, rng, count)
+
+        self.system.emit_many(count=count, shape=self.shape, position=position,
+                              velocity=sample(self.velocity, rng, count),
+                              delta_radius=sample(self.delta_radius, rng, count),
+                              radius=sample(self.radius, rng, count),
+                              color=sample(self.color, rng, count),
+                              alpha=sample(self.alpha, rng, count),
+                              angle=sample(self.angle, rng, count))
+
+    def update(self, delta_time: float) -> int:
+        """Emits :code:`rate * delta_time` particles. Fractions are carried over to the next call, so the number of
+            particles per second does not depend on the frame rate
+
+        Args:
+            delta_time (float): Frame time in seconds
+
+        Returns:
+            int: Number of emitted particles
+        """
+        self._accumulator += self.rate * delta_time
+        count = int(self._accumulator)
+        self._accumulator -= count
+        self.emit(count)
+        return count
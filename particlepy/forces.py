@@ -0,0 +1,340 @@
+# forces.py
+# -*- coding: utf-8 -*-
+
+from typing import Tuple, Callable
+import numpy
+
+import particlepy.noise
+
+
+class Force(object):
+    """This is the force class. It is only used to subclass. Forces are attached to a
+        :class:`particlepy.particle.ParticleSystem` and return the acceleration of all particles at once. The sum of all
+        enabled forces is added to the velocities like gravity, once per frame or per second if the system is
+        :attr:`particlepy.particle.ParticleSystem.time_based`
+
+    Args:
+        name (str, optional): Name in :attr:`particlepy.stats.FrameRecord.forces`, defaults to the class name
+        enabled (bool, optional): `True` if force should be applied, and `False` if otherwise, defaults to `True`
+
+    Attributes:
+        name (str): Name in :attr:`particlepy.stats.FrameRecord.forces`
+        enabled (bool): `True` if force is applied, and `False` if otherwise
+    """
+
+    def __init__(self, name: str = None, enabled: bool = True):
+        """Constructor method
+        """
+        self.name = name or type(self).__name__
+        self.enabled = enabled
+
+    def enable(self):
+        """Sets :attr:`enabled` `True`
+        """
+        self.enabled = True
+
+    def disable(self):
+        """Sets :attr:`enabled` `False`
+        """
+        self.enabled = False
+
+    def advance(self, delta_time: float):
+        """Moves forces changing over time forward. Called by the particle system before every step in which the force
+            is enabled
+
+        Args:
+            delta_time (float): Time of step
+        """
+        pass
+
+    def state(self) -> Tuple[float, ...]:
+        """Returns the values :func:`Force.advance()` changes, e.g. to record them
+
+        Returns:
+            Tuple[float, ...]: Values of the state, empty for forces which do not change over time
+        """
+        return ()
+
+    def set_state(self, state: Tuple[float, ...]):
+        """Restores values returned by :func:`Force.state()`
+
+        Args:
+            state (Tuple[float, ...]): Values of the state
+        """
+        pass
+
+    def acceleration(self, position: numpy.ndarray, velocity: numpy.ndarray) -> numpy.ndarray:
+        """Returns the acceleration of all particles
+
+        Args:
+            position (:class:`numpy.ndarray`): Center positions, shape `(count, 2)`
+            velocity (:class:`numpy.ndarray`): Velocities, shape `(count, 2)`
+
+        Returns:
+            :class:`numpy.ndarray`: Accelerations, shape `(count, 2)` or broadcastable to it
+        """
+        raise NotImplementedError
+
+
+class Gravity(Force):
+    """Constant acceleration, like the gravity argument of :func:`particlepy.particle.ParticleSystem.update()`
+
+    Args:
+        acceleration (Tuple[float, float]): Acceleration
+        **arguments: Arguments of :class:`Force`
+
+    Attributes:
+        vector (Tuple[float, float]): Acceleration
+    """
+
+    def __init__(self, acceleration: Tuple[float, float], **arguments):
+        """Constructor method
+        """
+        super(Gravity, self).__init__(**arguments)
+        self.vector = acceleration
+
+    def acceleration(self, position: numpy.ndarray, velocity: numpy.ndarray) -> numpy.ndarray:
+        return numpy.asarray(self.vector, dtype=numpy.float32)
+
+
+class Attractor(Force):
+    """Pulls particles towards a point. The acceleration is :attr:`strength` divided by the distance to the power of
+        :attr:`falloff`
+
+    Args:
+        position (Tuple[float, float]): Center of attraction
+        strength (float): Acceleration at distance `1` (at every distance for :attr:`falloff` `0`)
+        radius (float, optional): Distance from which on particles are not affected, `None` for no limit,
+            defaults to `None`
+        falloff (float, optional): `0` for constant, `1` for inverse and `2` for inverse square acceleration,
+            defaults to `0`
+        min_distance (float, optional): Smaller distances count as this one, keeps close particles from being flung
+            away, defaults to `1`
+        **arguments: Arguments of :class:`Force`
+
+    Attributes:
+        position (Tuple[float, float]): Center of attraction
+        strength (float): Acceleration at distance `1`
+        radius (float): Distance from which on particles are not affected
+        falloff (float): Power of distance the acceleration is divided by
+        min_distance (float): Smaller distances count as this one
+    """
+
+    def __init__(self, position: Tuple[float, float], strength: float, radius: float = None, falloff: float = 0,
+                 min_distance: float = 1, **arguments):
+        """Constructor method
+        """
+        super(Attractor, self).__init__(**arguments)
+        self.position = position
+        self.strength = strength
+        self.radius = radius
+        self.falloff = falloff
+        self.min_distance = min_distance
+
+    def _pull(self, position: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        # vectors towards the center and the acceleration per unit of their length, one value per particle
+        delta = numpy.asarray(self.position, dtype=numpy.float32) - position
+        distance = numpy.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+        factor = numpy.zeros_like(distance)
+        numpy.divide(numpy.float32(self.strength), distance, out=factor, where=distance > 0)
+        if self.falloff:
+            clamped = numpy.maximum(distance, numpy.float32(self.min_distance))
+            if self.falloff == 1:
+                factor /= clamped
+            elif self.falloff == 2:
+                factor /= clamped * clamped
+            else:
+                factor /= clamped ** numpy.float32(self.falloff)
+        if self.radius is not None:
+            factor[distance > self.radius] = 0
+        return delta, factor
+
+    def acceleration(self, position: numpy.ndarray, velocity: numpy.ndarray) -> numpy.ndarray:
+        delta, factor = self._pull(position)
+        return delta * factor[:, None]
+
+
+class Repulsor(Attractor):
+    """Pushes particles away from a point, the opposite of :class:`Attractor` with the same arguments
+    """
+
+    def acceleration(self, position: numpy.ndarray, velocity: numpy.ndarray) -> numpy.ndarray:
+        delta, factor = self._pull(position)
+        factor *= -1
+        return delta * factor[:, None]
+
+
+class Vortex(Attractor):
+    """Swirls particles around a point, counterclockwise on screen for a positive :attr:`strength`. Arguments are the
+        ones of :class:`Attractor`
+
+    Args:
+        pull (float, optional): Share of the acceleration pulling particles towards the center, lets them spiral in,
+            defaults to `0`
+        **arguments: Arguments of :class:`Attractor`
+
+    Attributes:
+        pull (float): Share of the acceleration pulling particles towards the center
+    """
+
+    def __init__(self, position: Tuple[float, float], strength: float, pull: float = 0, **arguments):
+        """Constructor method
+        """
+        super(Vortex, self).__init__(position=position, strength=strength, **arguments)
+        self.pull = pull
+
+    def acceleration(self, position: numpy.ndarray, velocity: numpy.ndarray) -> numpy.ndarray:
+        delta, factor = self._pull(position)
+        # delta points to the center and the y axis down, so (-dy, dx) turns counterclockwise on screen
+        tangent = numpy.empty_like(delta)
+        numpy.negative(delta[:, 1], out=tangent[:, 0])
+        tangent[:, 1] = delta[:, 0]
+        if self.pull:
+            tangent += delta * numpy.float32(self.pull)
+        return tangent * factor[:, None]
+
+
+class Wind(Force):
+    """Pushes particles until they move with the wind. The acceleration is proportional to the velocity of particles
+        relative to the wind
+
+    Args:
+        velocity (Tuple[float, float]): Velocity of the wind
+        coupling (float, optional): Share of the relative velocity taken over per frame (per second if time based),
+            defaults to `0.1`
+        **arguments: Arguments of :class:`Force`
+
+    Attributes:
+        velocity (Tuple[float, float]): Velocity of the wind
+        coupling (float): Share of the relative velocity taken over
+    """
+
+    def __init__(self, velocity: Tuple[float, float], coupling: float = 0.1, **arguments):
+        """Constructor method
+        """
+        super(Wind, self).__init__(**arguments)
+        self.velocity = velocity
+        self.coupling = coupling
+
+    def acceleration(self, position: numpy.ndarray, velocity: numpy.ndarray) -> numpy.ndarray:
+        return (numpy.asarray(self.velocity, dtype=numpy.float32) - velocity) * numpy.float32(self.coupling)
+
+
+class LinearDrag(Force):
+    """Slows particles down proportionally to their speed, like air resistance of slow particles
+
+    Args:
+        coefficient (float): Share of the velocity lost per frame (per second if time based), should stay below `1`
+            per step
+        **arguments: Arguments of :class:`Force`
+
+    Attributes:
+        coefficient (float): Share of the velocity lost
+    """
+
+    def __init__(self, coefficient: float, **arguments):
+        """Constructor method
+        """
+        super(LinearDrag, self).__init__(**arguments)
+        self.coefficient = coefficient
+
+    def acceleration(self, position: numpy.ndarray, velocity: numpy.ndarray) -> numpy.ndarray:
+        return velocity * numpy.float32(-self.coefficient)
+
+
+class QuadraticDrag(Force):
+    """Slows particles down proportionally to their squared speed, like air resistance of fast particles
+
+    Args:
+        coefficient (float): Deceleration at speed `1`
+        **arguments: Arguments of :class:`Force`
+
+    Attributes:
+        coefficient (float): Deceleration at speed `1`
+    """
+
+    def __init__(self, coefficient: float, **arguments):
+        """Constructor method
+        """
+        super(QuadraticDrag, self).__init__(**arguments)
+        self.coefficient = coefficient
+
+    def acceleration(self, position: numpy.ndarray, velocity: numpy.ndarray) -> numpy.ndarray:
+        speed = numpy.sqrt(velocity[:, 0] * velocity[:, 0] + velocity[:, 1] * velocity[:, 1])
+        speed *= -self.coefficient
+        return velocity * speed[:, None]
+
+
+class CallableForce(Force):
+    """Force computed by a user function, which gets the arrays of all particles at once
+
+    Args:
+        function (Callable[[:class:`numpy.ndarray`, :class:`numpy.ndarray`], :class:`numpy.ndarray`]): Function
+            returning the accelerations for the positions and velocities, see :func:`Force.acceleration()`
+        **arguments: Arguments of :class:`Force`, the name defaults to the function name
+
+    Attributes:
+        function (Callable[[:class:`numpy.ndarray`, :class:`numpy.ndarray`], :class:`numpy.ndarray`]): Function
+            returning the accelerations
+    """
+
+    def __init__(self, function: Callable[[numpy.ndarray, numpy.ndarray], numpy.ndarray], **arguments):
+        """Constructor method
+        """
+        arguments.setdefault("name", getattr(function, "__name__", None))
+        super(CallableForce, self).__init__(**arguments)
+        self.function = function
+
+    def acceleration(self, position: numpy.ndarray, velocity: numpy.ndarray) -> numpy.ndarray:
+        return self.function(position, velocity)
+
+
+class Turbulence(Force):
+    """Pushes particles along a precomputed, tileable noise field (see :func:`particlepy.noise.flow_field()`), like
+        smoke in moving air. The field is sampled by particle position with bilinear interpolation and scrolls over time
+
+    Args:
+        strength (float): Acceleration where the field is strongest
+        scale (float, optional): Width and height of the area one tile of the field covers, larger values make larger
+            swirls, defaults to `256`
+        scroll (Tuple[float, float], optional): Velocity the field moves with. Like particle velocities, it is
+            multiplied by the delta time of every step, whether the system is time based or not, defaults to `(0, 0)`
+        field (:class:`particlepy.noise.FlowField`, optional): Field to sample, defaults to the curl noise field of
+            :func:`particlepy.noise.flow_field()` with default arguments
+        **arguments: Arguments of :class:`Force`
+
+    Attributes:
+        strength (float): Acceleration where the field is strongest
+        scale (float): Width and height of the area one tile of the field covers
+        scroll (Tuple[float, float]): Velocity the field moves with
+        field (:class:`particlepy.noise.FlowField`): Sampled field
+        offset (List[float]): Distance the field moved so far, wrapped at :attr:`scale`
+    """
+
+    def __init__(self, strength: float, scale: float = 256, scroll: Tuple[float, float] = (0, 0),
+                 field: particlepy.noise.FlowField = None, **arguments):
+        """Constructor method
+        """
+        super(Turbulence, self).__init__(**arguments)
+        self.strength = strength
+        self.scale = scale
+        self.scroll = scroll
+        self.field = field if field is not None else particlepy.noise.flow_field()
+        self.offset = [0.0, 0.0]
+
+    def advance(self, delta_time: float):
+        # the field tiles every scale units, so wrapping keeps the offset small and precise
+        self.offset[0] = (self.offset[0] + self.scroll[0] * delta_time) % self.scale
+        self.offset[1] = (self.offset[1] + self.scroll[1] * delta_time) % self.scale
+
+    def state(self) -> Tuple[float, ...]:
+        return tuple(self.offset)
+
+    def set_state(self, state: Tuple[float, ...]):
+        self.offset = [float(value) for value in state]
+
+    def acceleration(self, position: numpy.ndarray, velocity: numpy.ndarray) -> numpy.ndarray:
+        points = particlepy.noise.grid_points(position, self.field, self.scale, self.offset)
+        vectors = self.field.sample(points)
+        vectors *= numpy.float32(self.strength)
+        return vectors
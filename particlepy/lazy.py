@@ -0,0 +1,75 @@
+# lazy.py
+# -*- coding: utf-8 -*-
+
+from types import ModuleType
+import contextlib
+import importlib
+import sys
+
+
+class LazyModule(object):
+    """Stands in for a module which is imported on first attribute access. Used for pygame, so the simulation
+        (particles, systems, emitters, math) runs in processes which never draw anything without loading SDL
+
+    Args:
+        name (str): Name of module, e.g. `"pygame"`
+        quiet (bool, optional): `True` to hide what the module prints on import, defaults to `True`
+
+    Attributes:
+        name (str): Name of module
+        quiet (bool): `True` to hide what the module prints on import
+    """
+
+    def __init__(self, name: str, quiet: bool = True):
+        """Constructor method
+        """
+        self.name = name
+        self.quiet = quiet
+
+    def __getattr__(self, name: str):
+        # only called for missing attributes, so after loading the copied module attributes are found directly
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        return "<lazy module '{}' ({})>".format(self.name, "loaded" if self.loaded else "not loaded")
+
+    @property
+    def loaded(self) -> bool:
+        """Returns whether the module is imported by :func:`LazyModule.load()`
+
+        Returns:
+            bool: `True` if module is loaded, and `False` if otherwise
+        """
+        return "_module" in self.__dict__
+
+    @property
+    def imported(self) -> bool:
+        """Returns whether the module is imported, by this object or by any other code (e.g. the game itself)
+
+        Returns:
+            bool: `True` if module is imported, and `False` if otherwise
+        """
+        return "_module" in self.__dict__ or self.name in sys.modules
+
+    def load(self) -> ModuleType:
+        """Imports the module if it is not imported yet
+
+        Returns:
+            :class:`types.ModuleType`: Module
+
+        Raises:
+            ImportError: Module is not installed
+        """
+        module = self.__dict__.get("_module")
+        if module is None:
+            if self.quiet:
+                with contextlib.redirect_stdout(None):
+                    module = importlib.import_module(self.name)
+            else:
+                module = importlib.import_module(self.name)
+            self.__dict__.update((key, value) for key, value in vars(module).items() if not key.startswith("__"))
+            self.__dict__["_module"] = module
+        return module
+
+
+pygame = LazyModule("pygame")
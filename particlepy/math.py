@@ -1,9 +1,11 @@
 # math.py
 # -*- coding: utf-8 -*-
 
-from typing import Tuple
+from typing import Tuple, Sequence, Union
+import numpy
 
 import particlepy.particle
+import particlepy.shape
 
 
 def fade_color(particle: particlepy.particle.Particle, color: Tuple[int, int, int], progress: float) -> list:
@@ -22,7 +24,8 @@ def fade_color(particle: particlepy.particle.Particle, color: Tuple[int, int, in
         AssertionError: If :attr:`particle.shape` not :class:`particlepy.shape.BaseForm`
     """
     assert isinstance(particle.shape, particlepy.shape.BaseForm)
-    return [particle.shape.orig_color[i] + (color[i] - particle.shape.orig_color[i]) * progress for i in range(3)]
+    r, g, b = particle.shape.orig_color
+    return [r + (color[0] - r) * progress, g + (color[1] - g) * progress, b + (color[2] - b) * progress]
 
 
 def fade_alpha(particle: particlepy.particle.Particle, alpha: int, progress: float) -> float:
@@ -38,3 +41,120 @@ def fade_alpha(particle: particlepy.particle.Particle, alpha: int, progress: flo
         float: New alpha of particle
     """
     return particle.shape.orig_alpha + (alpha - particle.shape.orig_alpha) * progress
+
+
+def fade_colors(orig_colors: numpy.ndarray, color: Tuple[int, int, int], progress: numpy.ndarray) -> numpy.ndarray:
+    """Batch version of :func:`fade_color`. Fades many colors over life span (:attr:`progress`) to new color (:attr:`color`)
+
+    Args:
+        orig_colors (:class:`numpy.ndarray`): Colors to fade from, shape `(n, 3)`,
+            e.g. :attr:`particlepy.store.ParticleStore.orig_color`
+        color (Tuple[int, int, int]): Color to fade to
+        progress (:class:`numpy.ndarray`): Life span identifiers, shape `(n,)`
+
+    Returns:
+        :class:`numpy.ndarray`: New colors, shape `(n, 3)`
+    """
+    progress = numpy.asarray(progress, dtype=numpy.float32)[:, None]
+    return orig_colors + (numpy.asarray(color, dtype=numpy.float32) - orig_colors) * progress
+
+
+def fade_alphas(orig_alphas: numpy.ndarray, alpha: int, progress: numpy.ndarray) -> numpy.ndarray:
+    """Batch version of :func:`fade_alpha`. Fades many transparencies over life span (:attr:`progress`) to :attr:`alpha`
+
+    Args:
+        orig_alphas (:class:`numpy.ndarray`): Transparencies to fade from, shape `(n,)`,
+            e.g. :attr:`particlepy.store.ParticleStore.orig_alpha`
+        alpha (int): Transparency to fade to
+        progress (:class:`numpy.ndarray`): Life span identifiers, shape `(n,)`
+
+    Returns:
+        :class:`numpy.ndarray`: New transparencies, shape `(n,)`
+    """
+    return orig_alphas + (numpy.float32(alpha) - orig_alphas) * numpy.asarray(progress, dtype=numpy.float32)
+
+
+class Gradient(object):
+    """Multi-stop gradient (e.g. color or alpha over life) baked into a lookup table with :attr:`resolution` entries.
+        Sampling is a single array index, so colorizing all particles of a system is one array operation
+
+    Args:
+        stops (Sequence[Tuple[float, Union[float, Sequence[float]]]]): Pairs of position (`0` to `1`) and value.
+            Values are either numbers (alpha) or sequences of equal length (colors)
+        resolution (int, optional): Number of entries of the lookup table, defaults to `256`
+
+    Attributes:
+        stops (List[Tuple[float, Tuple[float, ...]]]): Stops sorted by position
+        resolution (int): Number of entries of the lookup table
+        table (:class:`numpy.ndarray`): Lookup table, shape `(resolution, channels)` or `(resolution,)` for numbers
+
+    Raises:
+        ValueError: Gradient needs at least one stop
+    """
+
+    def __init__(self, stops: Sequence[Tuple[float, Union[float, Sequence[float]]]], resolution: int = 256):
+        """Constructor method
+        """
+        if not stops:
+            raise ValueError("Gradient needs at least one stop")
+        self.stops = sorted((float(position), numpy.atleast_1d(numpy.asarray(value, dtype=numpy.float32)))
+                            for position, value in stops)
+        self.resolution = max(int(resolution), 2)
+
+        positions = numpy.array([position for position, _ in self.stops], dtype=numpy.float32)
+        values = numpy.stack([value for _, value in self.stops])
+        samples = numpy.linspace(0, 1, self.resolution, dtype=numpy.float32)
+        table = numpy.stack([numpy.interp(samples, positions, values[:, channel]) for channel in range(values.shape[1])],
+                            axis=1).astype(numpy.float32)
+        self.table = table if numpy.ndim(stops[0][1]) else table[:, 0]
+
+    def sample(self, progress: Union[float, numpy.ndarray]) -> numpy.ndarray:
+        """Looks up the gradient values at :attr:`progress`
+
+        Args:
+            progress (Union[float, :class:`numpy.ndarray`]): Life span identifiers ranging from `0` to `1`
+
+        Returns:
+            :class:`numpy.ndarray`: Values, shape `(n, channels)` or `(n,)` for numbers
+        """
+        indices = numpy.asarray(progress, dtype=numpy.float32) * (self.resolution - 1) + 0.5
+        return self.table[numpy.clip(indices, 0, self.resolution - 1).astype(numpy.intp)]
+
+
+def fade_system_color(system: particlepy.particle.ParticleSystem, color: Union[Tuple[int, int, int], Gradient],
+                      inverted: bool = True):
+    """Fades the color of all particles of :attr:`system` at once, either to :attr:`color` like :func:`fade_color` or
+        along a color :class:`Gradient`
+
+    Args:
+        system (:class:`particlepy.particle.ParticleSystem`): Particle system to fade colors of
+        color (Union[Tuple[int, int, int], :class:`Gradient`]): Color to fade to or gradient to sample
+        inverted (bool, optional): `True` to use :attr:`particlepy.particle.Particle.inverted_progress` as life span
+            identifier, `False` for :attr:`particlepy.particle.Particle.progress`, defaults to `True`
+    """
+    store = system.store
+    n = store.count
+    progress = 1 - store.progress[:n] if inverted else store.progress[:n]
+    if isinstance(color, Gradient):
+        store.color[:n] = color.sample(progress)
+    else:
+        store.color[:n] = fade_colors(store.orig_color[:n], color, progress)
+
+
+def fade_system_alpha(system: particlepy.particle.ParticleSystem, alpha: Union[int, Gradient], inverted: bool = True):
+    """Fades the transparency of all particles of :attr:`system` at once, either to :attr:`alpha` like
+        :func:`fade_alpha` or along an alpha :class:`Gradient`
+
+    Args:
+        system (:class:`particlepy.particle.ParticleSystem`): Particle system to fade transparencies of
+        alpha (Union[int, :class:`Gradient`]): Transparency to fade to or gradient to sample
+        inverted (bool, optional): `True` to use :attr:`particlepy.particle.Particle.inverted_progress` as life span
+            identifier, `False` for :attr:`particlepy.particle.Particle.progress`, defaults to `True`
+    """
+    store = system.store
+    n = store.count
+    progress = 1 - store.progress[:n] if inverted else store.progress[:n]
+    if isinstance(alpha, Gradient):
+        store.alpha[:n] = alpha.sample(progress)
+    else:
+        store.alpha[:n] = fade_alphas(store.orig_alpha[:n], alpha, progress)
@@ -0,0 +1,152 @@
+# noise.py
+# -*- coding: utf-8 -*-
+
+from typing import Tuple
+import functools
+import numpy
+
+
+def tileable_noise(resolution: int, cells: int = 4, octaves: int = 3, persistence: float = 0.5,
+                   seed: int = 0) -> numpy.ndarray:
+    """Returns a square grid of smooth value noise which wraps around at its borders, so it tiles seamlessly
+
+    Args:
+        resolution (int): Width and height of grid
+        cells (int, optional): Number of random lattice values per side of the first octave, more cells make finer
+            noise, defaults to `4`
+        octaves (int, optional): Number of layers, each with twice the cells of the one before, defaults to `3`
+        persistence (float, optional): Weight of each octave relative to the one before, defaults to `0.5`
+        seed (int, optional): Seed of random lattice values, defaults to `0`
+
+    Returns:
+        :class:`numpy.ndarray`: Noise ranging from `-1` to `1`, shape `(resolution, resolution)`
+    """
+    rng = numpy.random.default_rng(seed)
+    noise = numpy.zeros((resolution, resolution), dtype=numpy.float64)
+    weight = 1.0
+    for octave in range(octaves):
+        count = cells * 2 ** octave
+        lattice = rng.uniform(-1, 1, (count, count))
+        # lattice coordinates of grid points, the last lattice row is followed by the first one again
+        coordinates = numpy.arange(resolution) * count / resolution
+        first = numpy.floor(coordinates).astype(int)
+        second = (first + 1) % count
+        blend = coordinates - first
+        blend = blend * blend * (3 - 2 * blend)
+        rows = lattice[first] * (1 - blend)[:, None] + lattice[second] * blend[:, None]
+        noise += weight * (rows[:, first] * (1 - blend) + rows[:, second] * blend)
+        weight *= persistence
+    peak = numpy.abs(noise).max()
+    if peak > 0:
+        noise /= peak
+    return noise
+
+
+class FlowField(object):
+    """Tileable grid of 2D vectors, sampled with bilinear interpolation. Made once and shared, see
+        :func:`flow_field()`
+
+    Args:
+        vectors (:class:`numpy.ndarray`): Vectors, shape `(resolution, resolution, 2)`, indexed by row (y) and column (x)
+
+    Attributes:
+        vectors (:class:`numpy.ndarray`): Vectors, shape `(resolution, resolution, 2)`
+        resolution (int): Width and height of grid
+    """
+
+    def __init__(self, vectors: numpy.ndarray):
+        """Constructor method
+        """
+        self.vectors = numpy.ascontiguousarray(vectors, dtype=numpy.float32)
+        self.resolution = self.vectors.shape[0]
+        # one more row and column repeating the first ones, so neighbors of a cell never wrap around, and each vector
+        # as one complex number, so a lookup gathers single values
+        padded = numpy.concatenate((self.vectors, self.vectors[:, :1]), axis=1)
+        padded = numpy.concatenate((padded, padded[:1]), axis=0)
+        self._padded = padded.view(numpy.complex64).ravel()
+
+    def sample(self, points: numpy.ndarray) -> numpy.ndarray:
+        """Returns the interpolated vectors at :attr:`points`. Grid coordinates wrap around, so the field repeats every
+            :attr:`resolution` units
+
+        Args:
+            points (:class:`numpy.ndarray`): Points in grid coordinates, shape `(count, 2)`
+
+        Returns:
+            :class:`numpy.ndarray`: Vectors, shape `(count, 2)`
+        """
+        resolution = self.resolution
+        inverse = numpy.float32(1 / resolution)
+        last = resolution - 1
+        x = points[:, 0] - numpy.floor(points[:, 0] * inverse) * numpy.float32(resolution)
+        y = points[:, 1] - numpy.floor(points[:, 1] * inverse) * numpy.float32(resolution)
+        blend_x = numpy.floor(x)
+        blend_y = numpy.floor(y)
+        column = blend_x.astype(numpy.int32)
+        row = blend_y.astype(numpy.int32)
+        numpy.subtract(x, blend_x, out=blend_x)
+        numpy.subtract(y, blend_y, out=blend_y)
+        # rounding can put coordinates just below the wrap onto it
+        numpy.minimum(column, last, out=column)
+        numpy.minimum(row, last, out=row)
+        row *= resolution + 1
+        row += column
+
+        padded = self._padded
+        top = padded.take(row)
+        top += (padded.take(row + 1) - top) * blend_x
+        row += resolution + 1
+        bottom = padded.take(row)
+        bottom += (padded.take(row + 1) - bottom) * blend_x
+        top += (bottom - top) * blend_y
+        return top.view(numpy.float32).reshape(-1, 2)
+
+
+@functools.lru_cache(maxsize=16)
+def flow_field(resolution: int = 128, cells: int = 4, octaves: int = 3, persistence: float = 0.5, seed: int = 0,
+               curl: bool = True) -> FlowField:
+    """Returns a tileable :class:`FlowField` of noise. Fields are cached, so systems asking for the same field share it
+
+    Args:
+        resolution (int, optional): Width and height of grid, defaults to `128`
+        cells (int, optional): See :func:`tileable_noise()`, defaults to `4`
+        octaves (int, optional): See :func:`tileable_noise()`, defaults to `3`
+        persistence (float, optional): See :func:`tileable_noise()`, defaults to `0.5`
+        seed (int, optional): See :func:`tileable_noise()`, defaults to `0`
+        curl (bool, optional): `True` for the curl of the noise, which swirls without sinks or sources like smoke,
+            `False` for two independent noise grids as x and y component, defaults to `True`
+
+    Returns:
+        :class:`FlowField`: Field whose longest vector has length `1`
+    """
+    arguments = dict(resolution=resolution, cells=cells, octaves=octaves, persistence=persistence)
+    if curl:
+        potential = tileable_noise(seed=seed, **arguments)
+        # central differences, wrapping around like the noise
+        vectors = numpy.stack((numpy.roll(potential, -1, axis=0) - numpy.roll(potential, 1, axis=0),
+                               numpy.roll(potential, 1, axis=1) - numpy.roll(potential, -1, axis=1)), axis=-1)
+    else:
+        vectors = numpy.stack((tileable_noise(seed=seed, **arguments),
+                               tileable_noise(seed=seed + 1, **arguments)), axis=-1)
+    length = numpy.sqrt((vectors * vectors).sum(axis=-1)).max()
+    if length > 0:
+        vectors /= length
+    return FlowField(vectors)
+
+
+def grid_points(positions: numpy.ndarray, field: FlowField, scale: float,
+                offset: Tuple[float, float] = (0, 0)) -> numpy.ndarray:
+    """Returns grid coordinates of :attr:`positions` for :func:`FlowField.sample()`
+
+    Args:
+        positions (:class:`numpy.ndarray`): Positions, shape `(count, 2)`
+        field (:class:`FlowField`): Sampled field
+        scale (float): Width and height of the area one tile of the field covers, in position units
+        offset (Tuple[float, float], optional): Shift of the field in position units, defaults to `(0, 0)`
+
+    Returns:
+        :class:`numpy.ndarray`: Grid coordinates, shape `(count, 2)`
+    """
+    points = positions - numpy.asarray(offset, dtype=numpy.float32)
+    points *= numpy.float32(field.resolution / scale)
+    return points
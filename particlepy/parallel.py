@@ -0,0 +1,260 @@
+# parallel.py
+# -*- coding: utf-8 -*-
+
+from typing import Tuple, List, Dict
+import multiprocessing
+import os
+import weakref
+import numpy
+
+import particlepy.particle
+import particlepy.store
+
+_ALIGNMENT = 64
+
+
+def _shared_memory():
+    # imported when first needed, so importing this module works on Python versions without shared memory
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise Exception("particlepy.parallel needs Python 3.8 or newer (multiprocessing.shared_memory)") from None
+    return shared_memory
+
+
+def column_layout(capacity: int) -> List[Tuple[str, Tuple[int, ...], type, int]]:
+    """Returns where the columns of a :class:`SharedParticleStore` lie inside its shared memory block
+
+    Args:
+        capacity (int): Number of allocated rows
+
+    Returns:
+        List[Tuple[str, Tuple[int, ...], type, int]]: Name, shape, data type and byte offset of each column
+    """
+    layout = []
+    offset = 0
+    for name, (width, dtype) in particlepy.store.ParticleStore.columns.items():
+        shape = (capacity, width) if width else (capacity,)
+        layout.append((name, shape, dtype, offset))
+        size = int(numpy.prod(shape)) * numpy.dtype(dtype).itemsize
+        offset += -(-size // _ALIGNMENT) * _ALIGNMENT
+    return layout
+
+
+def _map_columns(block: "multiprocessing.shared_memory.SharedMemory", capacity: int) -> Dict[str, numpy.ndarray]:
+    return {name: numpy.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+            for name, shape, dtype, offset in column_layout(capacity)}
+
+
+def _block_size(capacity: int) -> int:
+    name, shape, dtype, offset = column_layout(capacity)[-1]
+    return max(offset + int(numpy.prod(shape)) * numpy.dtype(dtype).itemsize, 1)
+
+
+def _release(block: "multiprocessing.shared_memory.SharedMemory", unlink: bool):
+    try:
+        block.close()
+    except BufferError:
+        # arrays of the block are still referenced somewhere, the mapping is released with them
+        pass
+    if unlink:
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# shared memory block attached by a worker process, only the block of the current frame is kept
+_worker_block: Dict[str, object] = {}
+
+
+def _attach(name: str, capacity: int) -> Dict[str, numpy.ndarray]:
+    if _worker_block.get("name") != name:
+        old = _worker_block.pop("block", None)
+        _worker_block.clear()
+        if old is not None:
+            _release(old, unlink=False)
+        # pool workers share the resource tracker of the main process, which unlinks the block
+        block = _shared_memory().SharedMemory(name=name)
+        _worker_block.update(name=name, block=block, columns=_map_columns(block, capacity))
+    return _worker_block["columns"]
+
+
+def update_shard(task: Tuple) -> int:
+    """Updates rows :code:`start` to :code:`stop` of a :class:`SharedParticleStore` in place. Runs in worker processes
+
+    Args:
+        task (Tuple): Name of the shared memory block, capacity, start row, stop row, delta time, gravity, whether
+            rates are time based, number of steps and whether to add the acceleration column
+
+    Returns:
+        int: Number of updated rows
+    """
+    name, capacity, start, stop, delta_time, gravity, time_based, steps, accelerate = task
+    shard = particlepy.store.ParticleStore.__new__(particlepy.store.ParticleStore)
+    for column, array in _attach(name, capacity).items():
+        setattr(shard, column, array[start:stop])
+    shard.count = stop - start
+    particlepy.store.ParticleStore.update(shard, delta_time=delta_time, gravity=gravity, time_based=time_based,
+                                          steps=steps, accelerate=accelerate)
+    return shard.count
+
+
+class SharedParticleStore(particlepy.store.ParticleStore):
+    """Particle store whose columns lie in one :class:`multiprocessing.shared_memory.SharedMemory` block.
+        :func:`SharedParticleStore.update()` splits the rows into one contiguous shard per worker process and every
+        worker updates its shard in place, so only the block name and the row range are sent each frame. Forces are
+        summed into the shared acceleration column by the main process before. Rows do not
+        depend on each other, so the result is the same as :func:`particlepy.store.ParticleStore.update()` for any
+        number of workers
+
+    Args:
+        capacity (int, optional): Number of preallocated rows, defaults to `256`
+        workers (int, optional): Number of worker processes, defaults to the number of CPUs
+        min_shard_size (int, optional): Minimum number of rows per shard. Stores with fewer than
+            :code:`2 * min_shard_size` particles are updated in the main process, defaults to `16384`
+
+    Attributes:
+        workers (int): Number of worker processes
+        min_shard_size (int): Minimum number of rows per shard
+        block (:class:`multiprocessing.shared_memory.SharedMemory`): Shared memory block of the columns
+
+    Raises:
+        Exception: Python is older than 3.8, which has no :mod:`multiprocessing.shared_memory`
+
+    Notes:
+        :code:`import particlepy` does not import this module, use :code:`import particlepy.parallel`
+    """
+
+    def __init__(self, capacity: int = 256, workers: int = None, min_shard_size: int = 16384):
+        """Constructor method
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.min_shard_size = min_shard_size
+        self.block: "multiprocessing.shared_memory.SharedMemory" = None
+        self._pool = None
+        self._finalizer = None
+        super(SharedParticleStore, self).__init__(capacity=capacity)
+
+    def reserve(self, capacity: int):
+        """Grows the columns so that at least :attr:`capacity` rows are allocated. The columns are moved to a new
+            shared memory block
+
+        Args:
+            capacity (int): Minimum number of rows
+        """
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, self.capacity * 2)
+        block = _shared_memory().SharedMemory(create=True, size=_block_size(capacity))
+        columns = _map_columns(block, capacity)
+        for name, column in columns.items():
+            column.fill(0)
+            if self.capacity:
+                column[:self.count] = getattr(self, name)[:self.count]
+
+        old = self.block
+        for name, column in columns.items():
+            setattr(self, name, column)
+        self.block = block
+        self.capacity = capacity
+        if self._finalizer is not None:
+            self._finalizer.detach()
+        self._finalizer = weakref.finalize(self, _release, block, True)
+        if old is not None:
+            _release(old, unlink=True)
+
+    def shards(self) -> List[Tuple[int, int]]:
+        """Splits the used rows into contiguous shards, one per worker at most
+
+        Returns:
+            List[Tuple[int, int]]: Start and stop row of each shard
+        """
+        count = min(self.workers, self.count // self.min_shard_size) if self.min_shard_size else self.workers
+        count = max(count, 1)
+        bounds = numpy.linspace(0, self.count, count + 1).astype(int).tolist()
+        return [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+    def update(self, delta_time, gravity: Tuple[float, float] = None, time_based: bool = False, steps=1,
+               accelerate: bool = False):
+        """Updates all particles like :func:`particlepy.store.ParticleStore.update()`, split over the worker processes
+
+        Args:
+            delta_time (float): A value to let the particles move according to frame time
+            gravity (Tuple[float, float], optional): Affects the velocity and 'pulls' particles in a direction, defaults to None
+            time_based (bool, optional): `True` if :attr:`delta_radius` and :attr:`gravity` are rates per second,
+                defaults to `False`
+            steps (int, optional): Number of frames the update stands for, defaults to `1`
+            accelerate (bool, optional): `True` to add :attr:`acceleration` to the velocity, defaults to `False`
+        """
+        shards = self.shards()
+        if len(shards) < 2 or isinstance(delta_time, numpy.ndarray) or isinstance(steps, numpy.ndarray):
+            super(SharedParticleStore, self).update(delta_time=delta_time, gravity=gravity, time_based=time_based,
+                                                    steps=steps, accelerate=accelerate)
+            return
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(processes=self.workers)
+        gravity = None if gravity is None else tuple(gravity)
+        self._pool.map(update_shard, [(self.block.name, self.capacity, start, stop, delta_time, gravity, time_based,
+                                       steps, accelerate)
+                                      for start, stop in shards], chunksize=1)
+
+    def close(self):
+        """Stops the worker processes and releases the shared memory block. The store must not be used afterwards
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        for name, (width, dtype) in self.columns.items():
+            setattr(self, name, getattr(self, name).copy())
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self.block = None
+
+
+class ShardedParticleSystem(particlepy.particle.ParticleSystem):
+    """Particle system which updates its particles in worker processes, see :class:`SharedParticleStore`. Emission,
+        surfaces and rendering stay in the main process. Use :func:`ShardedParticleSystem.close()` or a `with` block to
+        stop the workers
+
+    Args:
+        workers (int, optional): Number of worker processes, defaults to the number of CPUs
+        min_shard_size (int, optional): Minimum number of particles per worker, defaults to `16384`
+        **arguments: Arguments of :class:`particlepy.particle.ParticleSystem`
+
+    Raises:
+        Exception: Python is older than 3.8, see :class:`SharedParticleStore`
+
+    Notes:
+        :code:`import particlepy` does not import this module, use :code:`import particlepy.parallel`.
+        On platforms starting processes with `spawn` (Windows, macOS), the first update has to happen below an
+        :code:`if __name__ == "__main__":` guard
+    """
+
+    def __init__(self, workers: int = None, min_shard_size: int = 16384, **arguments):
+        """Constructor method
+        """
+        super(ShardedParticleSystem, self).__init__(**arguments)
+        self.store = SharedParticleStore(capacity=self.store.capacity, workers=workers, min_shard_size=min_shard_size)
+
+    def __enter__(self) -> "ShardedParticleSystem":
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    @property
+    def workers(self) -> int:
+        """Returns the number of worker processes
+
+        Returns:
+            int: Number of worker processes
+        """
+        return self.store.workers
+
+    def close(self):
+        """Stops the worker processes and releases the shared memory
+        """
+        self.store.close()
@@ -1,16 +1,24 @@
 # particle.py
 # -*- coding: utf-8 -*-
 
-from typing import Tuple, List
-import contextlib
+from typing import Tuple, List, Dict, BinaryIO, Union
+import time
+import numpy
 
-with contextlib.redirect_stdout(None):
-    import pygame
+from particlepy.lazy import pygame
 
+import particlepy.forces
+import particlepy.render
+import particlepy.replay
 import particlepy.shape
+import particlepy.store
+import particlepy.stats
+from particlepy.store import StoreField
 
+_SQRT2 = 2 ** 0.5
 
-class Particle(object):
+
+class Particle(particlepy.store.StoreView):
     """This is the particle class. It simulates the physics of a particle and can be used in a particle system (:class:`ParticleSystem`)
 
     Args:
@@ -29,14 +37,33 @@ class Particle(object):
         progress (float): A variable ranging from 0 to 1 to represent the lifespan
         inverted_progress (float): A variable ranging from 1 to 0 to represent the lifespan
         time (float): A simple timer
-        data (dict): A dictionary for extra data
+        data (dict): A dictionary for extra data, made on first access
         alive (bool): `True` if particle is alive, and `False` if otherwise
+
+    Notes:
+        After being emitted into a :class:`ParticleSystem`, the attributes above (except :attr:`shape` and :attr:`data`)
+        are views into the :class:`particlepy.store.ParticleStore` of the system.
+        Particles use `__slots__`, so no other attributes can be added, use :attr:`data` instead
     """
 
+    __slots__ = ("shape", "_data", "_position", "_velocity", "_delta_radius", "_progress", "_time", "_alive")
+
+    _store_fields = ("position", "velocity", "delta_radius", "progress", "time", "alive")
+
+    position = StoreField("position")
+    velocity = StoreField("velocity")
+    delta_radius = StoreField("delta_radius")
+    progress = StoreField("progress")
+    time = StoreField("time")
+    alive = StoreField("alive", cast=bool)
+
     def __init__(self, shape: particlepy.shape.Shape, position: Tuple[float, float], velocity: Tuple[float, float],
                  delta_radius: float, data: dict = None, alive: bool = True):
         """Constructor method
         """
+        self._store = None
+        self._index = -1
+
         self.shape = shape
 
         self.position = list(position)
@@ -44,16 +71,91 @@ class Particle(object):
 
         self.delta_radius = delta_radius
 
-        self.progress, self.inverted_progress = self.shape.get_progress()
+        self.progress = self.shape.get_progress()[0]
 
-        if data:
-            self.data = data
-        else:
-            self.data = {}
+        self._data = data if data else None
 
         self.time = 0
         self.alive = alive
 
+    @property
+    def data(self) -> dict:
+        """Returns :attr:`data`, which is only made when being accessed the first time
+
+        Returns:
+            dict: A dictionary for extra data
+        """
+        if self._data is None:
+            self._data = {}
+        return self._data
+
+    @data.setter
+    def data(self, data: dict):
+        self._data = data
+
+    @property
+    def inverted_progress(self) -> float:
+        """Returns :attr:`inverted_progress`
+
+        Returns:
+            float: :code:`1 - progress`
+        """
+        return 1 - self.progress
+
+    def _attach(self, store: particlepy.store.ParticleStore, index: int):
+        super(Particle, self)._attach(store, index)
+        self.shape._attach(store, index)
+
+    def _detach(self):
+        super(Particle, self)._detach()
+        self.shape._detach()
+
+    def _set_index(self, index: int):
+        self._index = index
+        self.shape._index = index
+
+    @classmethod
+    def _from_store(cls, store: particlepy.store.ParticleStore, index: int) -> "Particle":
+        """Makes a particle viewing row :attr:`index` of a row added by :func:`particlepy.store.ParticleStore.add_many()`
+
+        Args:
+            store (:class:`particlepy.store.ParticleStore`): Store of the row
+            index (int): Row
+
+        Returns:
+            :class:`Particle`: Particle attached to the row
+        """
+        particle = cls.__new__(cls)
+        particle.shape = store.prototypes[store.kind[index]]._from_store(store, index)
+        particle._data = None
+        particle._store = store
+        particle._index = index
+        return particle
+
+    def reset(self, position: Tuple[float, float], velocity: Tuple[float, float], delta_radius: float,
+              data: dict = None, alive: bool = True):
+        """Resets a detached particle to a new state, like making a new one with the same :attr:`shape`.
+            Used by :class:`ParticlePool`. :attr:`shape` has to be reset before
+
+        Args:
+            position (Tuple[float, float]): Center position
+            velocity (Tuple[float, float]): Velocity
+            delta_radius (float): Radius decrease value
+            data (dict, optional): A dictionary for extra data, the old dictionary is being cleared if `None`,
+                defaults to `None`
+            alive (bool, optional): `True` if particle should be alive, and `False` if otherwise, defaults to `True`
+        """
+        self.position = list(position)
+        self.velocity = list(velocity)
+        self.delta_radius = delta_radius
+        self.progress = self.shape.get_progress()[0]
+        if data:
+            self._data = data
+        elif self._data:
+            self._data.clear()
+        self.time = 0
+        self.alive = alive
+
     def kill(self):
         """Sets attribute :attr:`alive` `False`
         """
@@ -80,44 +182,248 @@ class Particle(object):
                     self.velocity[0] += gravity[0]
                     self.velocity[1] += gravity[1]
 
-                self.progress, self.inverted_progress = self.shape.get_progress()
+                self.progress = self.shape.get_progress()[0]
                 self.time += delta_time
         else:
             self.kill()
 
-    def render(self, surface: pygame.Surface):
+    def render(self, surface: "pygame.Surface", special_flags: int = 0):
         """Renders the particle on given surface
 
         Args:
             surface (:class:`pygame.Surface`): The surface on which the particle is being rendered on
+            special_flags (int, optional): Special flags of the blit, e.g. :code:`pygame.BLEND_RGB_ADD`. Pygame ignores
+                the alpha of the surface with these flags, see :func:`particlepy.render.blend_sprite()`, defaults to `0`
         """
         if self.alive:
-            surface.blit(self.shape.surface, (self.position[0] - self.shape.surface.get_width() / 2,
-                                              self.position[1] - self.shape.surface.get_height() / 2))
+            x, y = self.position
+            width, height = self.shape.surface.get_size()
+            surface.blit(self.shape.surface, (float(x) - width / 2, float(y) - height / 2), special_flags=special_flags)
+
+
+class ParticlePool(object):
+    """Keeps dead particles (and their shapes and surfaces) to reuse them for new particles instead of making new objects.
+        Particles are grouped by the class of their shape
+
+    Args:
+        capacity (int): Maximum number of kept particles
+
+    Attributes:
+        capacity (int): Maximum number of kept particles
+        created (int): Number of particles made because the pool had none of the requested shape class
+        reused (int): Number of particles taken from the pool
+        released (int): Number of dead particles put into the pool
+        dropped (int): Number of dead particles not kept because the pool was full
+    """
+
+    def __init__(self, capacity: int):
+        """Constructor method
+        """
+        self.capacity = capacity
+        self._particles: Dict[type, List[Particle]] = {}
+        self._count = 0
+
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def reuse_rate(self) -> float:
+        """Returns the share of particles which were taken from the pool
+
+        Returns:
+            float: :code:`reused / (reused + created)`, `0` if no particle was requested
+        """
+        requests = self.reused + self.created
+        return self.reused / requests if requests else 0.0
+
+    def acquire(self, shape_type: type) -> Particle:
+        """Takes a particle with a shape of class :attr:`shape_type` out of the pool
+
+        Args:
+            shape_type (type): Class of shape
+
+        Returns:
+            :class:`Particle`: Detached particle which has to be reset, `None` if there is none
+        """
+        particles = self._particles.get(shape_type)
+        if particles:
+            self._count -= 1
+            self.reused += 1
+            return particles.pop()
+        self.created += 1
+        return None
+
+    def release(self, particle: Particle):
+        """Puts a detached particle into the pool if it is not full
+
+        Args:
+            particle (:class:`Particle`): Particle to keep
+        """
+        if self._count >= self.capacity:
+            self.dropped += 1
+            return
+        self._particles.setdefault(type(particle.shape), []).append(particle)
+        self._count += 1
+        self.released += 1
+
+    def clear(self):
+        """Removes all particles from pool
+        """
+        self._particles.clear()
+        self._count = 0
+
+    def reset_stats(self):
+        """Sets :attr:`created`, :attr:`reused`, :attr:`released` and :attr:`dropped` to `0`
+        """
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.dropped = 0
 
 
 class ParticleSystem(object):
-    """The particle system class. It is used to manage particles in a group
+    """The particle system class. It is used to manage particles in a group.
+        The state of all particles is kept in a :class:`particlepy.store.ParticleStore` and updated vectorized
 
     Args:
         data (dict, optional): A dictionary for extra data, defaults to None
         alive (bool, optional): `True` if particle system should be alive, and `False` if otherwise, defaults to `True`
+        capacity (int, optional): Number of particles the store preallocates, defaults to `256`
+        ordered (bool, optional): `True` if particles should stay in emission order when dead particles are removed,
+            `False` to let the last particles take the places of dead ones, which is cheaper, defaults to `True`
+        pool_capacity (int, optional): Maximum number of dead particles kept in :attr:`pool` to be reused by
+            :func:`ParticleSystem.spawn()`, `0` to disable pooling, defaults to `0`
+        fixed_step (float, optional): Length of a simulation step in seconds. If set, :func:`ParticleSystem.update()`
+            collects frame time and simulates as many whole steps as fit in, defaults to `None`
+        max_substeps (int, optional): Maximum number of fixed steps per :func:`ParticleSystem.update()` call. Time left
+            beyond it is dropped, so a hitch slows the effect down instead of making huge steps, defaults to `5`
+        time_based (bool, optional): `True` if :attr:`Particle.delta_radius` and gravity are rates per second, `False`
+            if they are applied once per frame like in :func:`Particle.update()`. Defaults to `True` with
+            :attr:`fixed_step` and `False` without
+        stats (:class:`particlepy.stats.FrameStats`, optional): Frame statistics to record, defaults to `None`
+        renderer (Union[:class:`particlepy.render.TiledRenderer`, :class:`particlepy.render.PixelRenderer`], optional):
+            Renderer which draws the particles in :func:`ParticleSystem.render()`, `None` to blit them serially,
+            defaults to `None`
+        grid (:class:`particlepy.spatial.SpatialGrid`, optional): Grid rebuilt after every update for neighborhood
+            queries, defaults to `None`
+        viewport (Tuple[float, float, float, float], optional): Left, top, width and height of the visible area in
+            particle coordinates (e.g. the camera :class:`pygame.Rect`), `None` to render everything, defaults to `None`
+        kill_margin (float, optional): Particles are killed once their center is more than this far outside of
+            :attr:`viewport`, `None` to never kill them for leaving it, defaults to `None`
+        offscreen_interval (int, optional): Particles outside of :attr:`viewport` are only updated every that many
+            steps, with the time of all of them at once, `1` to update them every step, defaults to `1`
+        forces (List[:class:`particlepy.forces.Force`], optional): Forces acting on all particles, defaults to `None`
+        blend_mode (str, optional): How particles are blended onto the target surface, one of
+            :data:`particlepy.render.BLEND_MODES`, defaults to `"alpha"`
+        seed (Union[int, :class:`numpy.random.Generator`], optional): Seed or generator of :attr:`rng`, defaults to
+            `None`
 
     Attributes:
-        particles (List[:class:`Particle`])
+        store (:class:`particlepy.store.ParticleStore`): Arrays holding the state of all particles
         data (dict): A dictionary for extra data
         alive (bool): `True` if particle system is alive, and `False` if otherwise
+        ordered (bool): `True` if particles stay in emission order
+        pool (:class:`ParticlePool`): Dead particles to reuse, `None` if pooling is disabled
+        fixed_step (float): Length of a simulation step in seconds, `None` for one step per frame
+        max_substeps (int): Maximum number of fixed steps per frame
+        time_based (bool): `True` if radius decrease and gravity are rates per second
+        interpolation (float): Share of a fixed step which is collected but not simulated yet, ranging from `0` to `1`.
+            :func:`ParticleSystem.render()` draws particles that far between their last two positions
+        surfaces_rebuilt (int): Number of surfaces made again by the last :func:`ParticleSystem.make_shape()` call
+        surfaces_skipped (int): Number of surfaces kept by the last :func:`ParticleSystem.make_shape()` call
+        stats (:class:`particlepy.stats.FrameStats`): Frame statistics which record the time spent in
+            :func:`ParticleSystem.update()`, :func:`ParticleSystem.make_shape()` and :func:`ParticleSystem.render()` and
+            the number of emitted and killed particles, made surfaces and blits, `None` to measure nothing
+        renderer (Union[:class:`particlepy.render.TiledRenderer`, :class:`particlepy.render.PixelRenderer`]): Renderer
+            which draws the particles, `None` to blit them serially. Particles drawn as pixels by a
+            :class:`particlepy.render.PixelRenderer` get no surface in :func:`ParticleSystem.make_shape()`
+        grid (:class:`particlepy.spatial.SpatialGrid`): Grid over the particle positions which is rebuilt at the end of
+            :func:`ParticleSystem.update()`, `None` to keep no grid
+        viewport (Tuple[float, float, float, float]): Visible area in particle coordinates, `None` if everything is
+            visible. Particles outside of it get no new surface in :func:`ParticleSystem.make_shape()` and are not
+            rendered, the others are rendered relative to its top left corner
+        kill_margin (float): Distance outside of :attr:`viewport` from which on particles are killed, `None` to keep them
+        offscreen_interval (int): Number of steps between updates of particles outside of :attr:`viewport`. While less
+            than half of the particles are visible, the others are updated in turns, one block of rows per step with the
+            time of :attr:`offscreen_interval` steps. Their positions are approximate, as rows move between blocks when
+            particles die
+        forces (List[:class:`particlepy.forces.Force`]): Forces acting on all particles. Enabled forces are evaluated
+            for all particles at once every step, and their sum is added to the velocities like gravity
+        blend_mode (str): How particles are blended onto the target surface. `alpha` blits them normally, `add` adds
+            their colors (fire, sparks, glow), `multiply` darkens the target by them (shadows, smoke) and `screen`
+            brightens it without oversaturating. All blits of a frame are still batched, with the special flags of
+            :func:`particlepy.render.blend_flags()`. As pygame ignores transparency in these blits, every surface is
+            converted once by :func:`particlepy.render.blend_sprite()` while it is being rendered, so modes other than
+            `alpha` work best with shared surfaces, e.g. from a :class:`particlepy.cache.SpriteCache` or
+            :func:`particlepy.shape.glow_surface()`
+        rng (:class:`numpy.random.Generator`): Random number generator of the system, used by
+            :class:`particlepy.emitter.Emitter` without own seed. Seed it to make effects reproducible
+        recorder (:class:`particlepy.replay.Recorder`): Records every update and emission, `None` to record nothing,
+            see :func:`ParticleSystem.record()`
+
+    Notes:
+        If pooling is enabled, every dead particle can be reused for a new one, so references to particles must not be kept
+        after they died
     """
 
-    def __init__(self, data: dict = None, alive: bool = True):
+    def __init__(self, data: dict = None, alive: bool = True, capacity: int = 256, ordered: bool = True,
+                 pool_capacity: int = 0, fixed_step: float = None, max_substeps: int = 5, time_based: bool = None,
+                 stats: particlepy.stats.FrameStats = None, renderer=None, grid=None, viewport=None,
+                 kill_margin: float = None, offscreen_interval: int = 1,
+                 forces: List[particlepy.forces.Force] = None, blend_mode: str = "alpha",
+                 seed: Union[int, numpy.random.Generator] = None):
         """Constructor method
         """
-        self.particles: List[particlepy.particle.Particle] = []
+        self.store = particlepy.store.ParticleStore(capacity=capacity)
         if data:
             self.data = data
         else:
             self.data = {}
         self.alive = alive
+        self.ordered = ordered
+        self.pool = ParticlePool(capacity=pool_capacity) if pool_capacity else None
+        self.fixed_step = fixed_step
+        self.max_substeps = max_substeps
+        self.time_based = fixed_step is not None if time_based is None else time_based
+        self.interpolation = 0.0
+        self._accumulator = 0.0
+        self.surfaces_rebuilt = 0
+        self.surfaces_skipped = 0
+        self.stats = stats
+        self.renderer = renderer
+        self.grid = grid
+        self.viewport = viewport
+        self.kill_margin = kill_margin
+        self.offscreen_interval = offscreen_interval
+        self._step_count = 0
+        self.forces = list(forces) if forces else []
+        self.blend_mode = blend_mode
+        self._blend_cache: particlepy.render.BlendCache = None
+        self.rng = numpy.random.default_rng(seed)
+        self.recorder: particlepy.replay.Recorder = None
+
+    @property
+    def particles(self) -> List[Particle]:
+        """Returns the particles in system. The list must not be modified, use :func:`ParticleSystem.emit()` and
+            :func:`ParticleSystem.clear()` instead. Particles emitted by :func:`ParticleSystem.emit_many()` get
+            their :class:`Particle` object here, on first access
+
+        Returns:
+            List[:class:`Particle`]: Particles in system
+        """
+        store = self.store
+        if store.anonymous:
+            objects = store.objects
+            for index, particle in enumerate(objects):
+                if particle is None:
+                    objects[index] = Particle._from_store(store, index)
+            store.anonymous = 0
+        return store.objects
 
     def emit(self, particle: Particle):
         """Creates a new particle
@@ -129,51 +435,448 @@ class ParticleSystem(object):
             Exception: Particle system is not alive, not able to add particles
         """
         if self.alive:
-            self.particles.append(particle)
+            index = self.store.add(particle)
+            self._emitted(slice(index, index + 1), type(particle.shape))
+        else:
+            raise Exception("Particle system is not alive, not able to add particles")
+
+    def spawn(self, shape_type: type, position: Tuple[float, float], velocity: Tuple[float, float],
+              delta_radius: float, data: dict = None, **shape_arguments) -> Particle:
+        """Creates a new particle like :func:`ParticleSystem.emit()`, but reuses a dead particle of :attr:`pool` with a
+            shape of class :attr:`shape_type` if there is one
+
+        Args:
+            shape_type (type): Class of shape, e.g. :class:`particlepy.shape.Circle`
+            position (Tuple[float, float]): Center position
+            velocity (Tuple[float, float]): Velocity
+            delta_radius (float): Radius decrease value
+            data (dict, optional): A dictionary for extra data, defaults to `None`
+            **shape_arguments: Arguments of :attr:`shape_type` (and its :func:`reset()` method)
+
+        Returns:
+            :class:`Particle`: Emitted particle
+
+        Raises:
+            Exception: Particle system is not alive, not able to add particles
+        """
+        if not self.alive:
+            raise Exception("Particle system is not alive, not able to add particles")
+        particle = self.pool.acquire(shape_type) if self.pool is not None else None
+        if particle is None:
+            particle = Particle(shape=shape_type(**shape_arguments), position=position, velocity=velocity,
+                                delta_radius=delta_radius, data=data)
         else:
+            particle.shape.reset(**shape_arguments)
+            particle.reset(position=position, velocity=velocity, delta_radius=delta_radius, data=data)
+        index = self.store.add(particle)
+        self._emitted(slice(index, index + 1), shape_type)
+        return particle
+
+    def emit_many(self, count: int, shape: particlepy.shape.Shape, position, velocity, delta_radius,
+                  radius=None, size=None, color=None, alpha=None, angle=None):
+        """Creates :attr:`count` particles at once without making :class:`Particle` objects. Every value is either
+            a single value for all particles or an array with one value per particle. Values which are `None` are taken
+            from :attr:`shape`
+
+        Args:
+            count (int): Number of particles
+            shape (:class:`particlepy.shape.Shape`): Prototype of the particle shapes. Surfaces are made by it, so
+                :class:`particlepy.shape.BaseForm.sprite_cache` or prebaked images apply as usual. Pass the same shape
+                every call, see :func:`particlepy.store.ParticleStore.add_prototype()`
+            position (Union[Tuple[float, float], :class:`numpy.ndarray`]): Center positions
+            velocity (Union[Tuple[float, float], :class:`numpy.ndarray`]): Velocities
+            delta_radius (Union[float, :class:`numpy.ndarray`]): Radius decrease values
+            radius (Union[float, :class:`numpy.ndarray`], optional): Radii of :class:`particlepy.shape.BaseForm` shapes,
+                square sizes for :class:`particlepy.shape.Image` shapes, defaults to `None`
+            size (Union[Tuple[float, float], :class:`numpy.ndarray`], optional): Sizes of :class:`particlepy.shape.Image`
+                shapes, defaults to `None`
+            color (Union[Tuple[int, int, int], :class:`numpy.ndarray`], optional): Colors, defaults to `None`
+            alpha (Union[int, :class:`numpy.ndarray`], optional): Transparencies, defaults to `None`
+            angle (Union[float, :class:`numpy.ndarray`], optional): Degrees of rotation, defaults to `None`
+
+        Raises:
+            Exception: Particle system is not alive, not able to add particles
+        """
+        if not self.alive:
             raise Exception("Particle system is not alive, not able to add particles")
+        if count <= 0:
+            return
+
+        if isinstance(shape, particlepy.shape.Image):
+            if size is None and radius is None:
+                size = shape.size
+            color = (255, 255, 255)
+        else:
+            if radius is None:
+                radius = shape.radius
+            if color is None:
+                color = shape.color
+        if radius is not None:
+            size = numpy.asarray(radius, dtype=numpy.float32)
+            size = size[:, None] if size.ndim else size
+
+        rows = self.store.add_many(count=count, shape=shape, position=position, velocity=velocity,
+                                   delta_radius=delta_radius, size=size, color=color,
+                                   alpha=shape.alpha if alpha is None else alpha,
+                                   angle=shape.angle if angle is None else angle)
+        self._emitted(rows, type(shape))
+
+    def _emitted(self, rows: slice, shape_type: type):
+        # counts and records rows which were just added to the store
+        if self.stats is not None:
+            self.stats.current.emitted += rows.stop - rows.start
+        if self.recorder is not None:
+            self.recorder.record_emission(self.store, rows, shape_type)
 
     def clear(self):
         """Clears the particle list
         """
-        self.particles.clear()
+        self.store.clear()
+        if self.pool is not None:
+            self.pool.clear()
+        if self.recorder is not None:
+            self.recorder.record_clear()
 
     def kill(self):
         """Sets :attr:`alive` `False`
         """
         self.alive = False
+        if self.recorder is not None:
+            self.recorder.record_alive(False)
 
     def revive(self):
         """Sets :attr:`alive` `True`
         """
         self.alive = True
+        if self.recorder is not None:
+            self.recorder.record_alive(True)
+
+    def record(self, stream: BinaryIO) -> particlepy.replay.Recorder:
+        """Starts recording the inputs of the system to :attr:`stream`, see :class:`particlepy.replay.Recorder`. The
+            particles the system already has and its state are recorded first (see
+            :func:`particlepy.replay.Recorder.record_state()`), so running systems can be recorded as well. Set
+            :attr:`recorder` `None` to stop recording
+
+        Args:
+            stream (BinaryIO): Stream to write to, e.g. a file opened with :code:`"wb"`
+
+        Returns:
+            :class:`particlepy.replay.Recorder`: Recorder of the system
+        """
+        self.recorder = particlepy.replay.Recorder(stream)
+        self.recorder.record_state(self)
+        return self.recorder
+
+    def add_force(self, force: particlepy.forces.Force) -> particlepy.forces.Force:
+        """Adds a force acting on all particles
+
+        Args:
+            force (:class:`particlepy.forces.Force`): Force to add
+
+        Returns:
+            :class:`particlepy.forces.Force`: Added force
+        """
+        self.forces.append(force)
+        return force
+
+    def remove_force(self, force: particlepy.forces.Force):
+        """Removes a force added by :func:`ParticleSystem.add_force()`
+
+        Args:
+            force (:class:`particlepy.forces.Force`): Force to remove
+        """
+        self.forces.remove(force)
+
+    def apply_forces(self, delta_time: float) -> bool:
+        """Advances all enabled :attr:`forces` by :attr:`delta_time`, evaluates them and writes their sum into
+            :attr:`particlepy.store.ParticleStore.acceleration`. Called before every step
+
+        Args:
+            delta_time (float): Time of step
+
+        Returns:
+            bool: `True` if any force is enabled, and `False` if otherwise
+        """
+        forces = [force for force in self.forces if force.enabled]
+        store = self.store
+        n = store.count
+        if not forces or not n:
+            return False
+        acceleration = store.acceleration[:n]
+        acceleration.fill(0)
+        position = store.position[:n]
+        velocity = store.velocity[:n]
+        stats = self.stats
+        for force in forces:
+            if stats is None:
+                force.advance(delta_time)
+                acceleration += force.acceleration(position, velocity)
+                continue
+            start = time.perf_counter()
+            force.advance(delta_time)
+            acceleration += force.acceleration(position, velocity)
+            elapsed = time.perf_counter() - start
+            record = stats.current
+            record.forces[force.name] = record.forces.get(force.name, 0.0) + elapsed
+            record.force_time += elapsed
+        return True
 
     def update(self, delta_time: float, gravity: Tuple[float, float] = None):
-        """Calls :func:`Particle.update()` for every particle in system
+        """Updates all particles in system at once (see :func:`Particle.update()`) and removes dead particles.
+            With :attr:`fixed_step`, the particles are updated in up to :attr:`max_substeps` fixed steps
 
         Args:
             delta_time (float): A value to let the particles move according to frame time
             gravity (Tuple[float, float], optional): Affects the velocity and 'pulls' particles in a direction, defaults to None
         """
+        if self.recorder is not None:
+            self.recorder.record_update(delta_time, gravity)
+        stats = self.stats
+        if stats is not None:
+            stats.next_frame(alive=self.store.count)
+            start = time.perf_counter()
+
         if self.alive:
-            for particle in self.particles:
-                particle.update(gravity=gravity, delta_time=delta_time)
-                if not particle.alive:
-                    self.particles.remove(particle)
+            store = self.store
+            if self.fixed_step is None:
+                self._step(delta_time=delta_time, gravity=gravity)
+            else:
+                fixed_step = self.fixed_step
+                self._accumulator += delta_time
+                steps = min(int(self._accumulator / fixed_step), self.max_substeps)
+                self._accumulator -= steps * fixed_step
+                if steps == self.max_substeps:
+                    self._accumulator = min(self._accumulator, fixed_step)
+                for _ in range(steps):
+                    store.previous_position[:store.count] = store.position[:store.count]
+                    self._step(delta_time=fixed_step, gravity=gravity)
+                self.interpolation = self._accumulator / fixed_step
+
+            if self.viewport is not None and self.kill_margin is not None:
+                left, top, width, height = self.viewport
+                margin = self.kill_margin
+                position = store.position[:store.count]
+                store.alive[:store.count] &= ((position[:, 0] >= left - margin) &
+                                              (position[:, 0] <= left + width + margin) &
+                                              (position[:, 1] >= top - margin) &
+                                              (position[:, 1] <= top + height + margin))
+
+            if self.pool is None:
+                killed = store.remove_dead(ordered=self.ordered)
+            else:
+                removed = []
+                killed = store.remove_dead(ordered=self.ordered, removed=removed)
+                for particle in removed:
+                    self.pool.release(particle)
+
+            if self.grid is not None:
+                self.grid.build(store.position[:store.count])
+            if stats is not None:
+                stats.current.killed += killed
+
+        if stats is not None:
+            stats.current.update_time += time.perf_counter() - start
+
+    def _step(self, delta_time: float, gravity: Tuple[float, float] = None):
+        store = self.store
+        accelerate = self.apply_forces(delta_time)
+        interval = self.offscreen_interval
+        if self.viewport is None or interval <= 1:
+            store.update(delta_time=delta_time, gravity=gravity, time_based=self.time_based, accelerate=accelerate)
+            return
+
+        self._step_count += 1
+        visible = self.in_viewport()
+        n = store.count
+        if 2 * numpy.count_nonzero(visible) >= n:
+            store.update(delta_time=delta_time, gravity=gravity, time_based=self.time_based, accelerate=accelerate)
+            return
+
+        # off-screen rows are updated in turns, one contiguous block per step with the time of a whole interval
+        block = self._step_count % interval
+        start, stop = n * block // interval, n * (block + 1) // interval
+        inside = visible[start:stop]
+        steps = numpy.where(inside, 1, interval).astype(numpy.float32)
+        store.view(start, stop).update(delta_time=steps * numpy.float32(delta_time), gravity=gravity,
+                                       time_based=self.time_based, steps=steps, accelerate=accelerate)
+        # visible rows of the other blocks are updated every step
+        rows = numpy.flatnonzero(visible)
+        rows = rows[(rows < start) | (rows >= stop)]
+        store.update_rows(rows, delta_time=delta_time, gravity=gravity, time_based=self.time_based,
+                          accelerate=accelerate)
+
+    def in_viewport(self) -> numpy.ndarray:
+        """Returns which particles may overlap :attr:`viewport`. The test is conservative and uses the larger one of the
+            current surface and the rotated shape size
+
+        Returns:
+            :class:`numpy.ndarray`: `True` for each particle which may be visible, shape `(count,)`
+        """
+        store = self.store
+        n = store.count
+        if self.viewport is None:
+            return numpy.ones(n, dtype=bool)
+        left, top, width, height = self.viewport
+        offset = store.offset[:n]
+        size = store.size[:n]
+        extent = numpy.maximum(numpy.maximum(offset[:, 0], offset[:, 1]), numpy.maximum(size[:, 0], size[:, 1]) * _SQRT2)
+        x = store.position[:n, 0]
+        y = store.position[:n, 1]
+        return (x + extent > left) & (x - extent < left + width) & (y + extent > top) & (y - extent < top + height)
 
     def make_shape(self):
-        """Makes the surface of all particles in system
+        """Makes the surface of all particles in system whose (quantized) visual state changed since the last call,
+            see :func:`particlepy.shape.Shape.refresh_surface()`. Rows emitted by :func:`ParticleSystem.emit_many()`
+            share the state of their prototype shape, so they only keep the surface of the previous row if it looks the
+            same. With a :attr:`viewport`, only particles inside of it get a new surface
         """
-        if self.alive:
-            for particle in self.particles:
-                particle.shape.make_surface()
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter()
 
-    def render(self, surface: pygame.Surface):
-        """Renders surface of all particles on given surface
+        if self.alive:
+            store = self.store
+            prototypes = store.prototypes
+            kinds = store.kind[:store.count].tolist() if store.anonymous else None
+            objects = store.objects
+            drawn = None if self.viewport is None else self.in_viewport()
+            pixels = self._pixel_mask()
+            if pixels is not None:
+                drawn = ~pixels if drawn is None else drawn & ~pixels
+            rows = None if drawn is None else numpy.flatnonzero(drawn)
+            sprites = []
+            rebuilt = 0
+            # surfaces drawn again in place need a new blend copy
+            blend_cache = self._blend_cache if self.blend_mode != "alpha" else None
+            for index in (range(store.count) if rows is None else rows.tolist()):
+                particle = objects[index]
+                if particle is None:
+                    shape = prototypes[kinds[index]]
+                    shape._index = index
+                else:
+                    shape = particle.shape
+                if shape.refresh_surface():
+                    rebuilt += 1
+                    if blend_cache is not None:
+                        blend_cache.discard(shape.surface)
+                sprites.append(shape.surface)
+            store.set_sprites(sprites, rows)
+            self.surfaces_rebuilt = rebuilt
+            self.surfaces_skipped = store.count - rebuilt
+            if stats is not None:
+                stats.current.surfaces += rebuilt
+
+        if stats is not None:
+            stats.current.make_shape_time += time.perf_counter() - start
+
+    def render(self, surface: "pygame.Surface"):
+        """Renders surface of all particles on given surface. All surfaces made by :func:`ParticleSystem.make_shape()`
+            are submitted in a single :func:`pygame.Surface.fblits()` (or :func:`pygame.Surface.blits()`) call, with
+            destinations computed from the position arrays of :attr:`store`, or handed to :attr:`renderer`. Particles
+            are blended in :attr:`blend_mode`
 
         Args:
             surface (:class:`pygame.Surface`): Surface on which the particles are being rendered
         """
-        if self.alive:
-            for particle in self.particles:
-                particle.render(surface=surface)
+        stats = self.stats
+        if stats is None:
+            self._render(surface)
+        else:
+            start = time.perf_counter()
+            stats.current.blits += self._render(surface)
+            stats.current.render_time += time.perf_counter() - start
+
+    def _render(self, surface: "pygame.Surface") -> int:
+        if not self.alive:
+            return 0
+        mode = self.blend_mode
+        flags = particlepy.render.blend_flags(mode)
+        if isinstance(self.renderer, particlepy.render.PixelRenderer):
+            self._render_pixels(surface)
+        sprites, destinations, rows = self._blit_rows()
+        if not sprites:
+            return 0
+        if flags:
+            if self._blend_cache is None or self._blend_cache.mode != mode:
+                self._blend_cache = particlepy.render.BlendCache(mode)
+            sprites = self._blend_cache.convert(sprites)
+        if mode == "screen":
+            particlepy.render.invert(surface)
+        try:
+            if self.renderer is not None:
+                # the offsets are half the sizes of the sprites, which saves asking every sprite for its size
+                offset = self.store.offset[:len(sprites)] if rows is None else self.store.offset[rows]
+                return self.renderer.render(surface, sprites, destinations, flags, offset * 2)
+            particlepy.render._blit(surface, sprites, destinations.tolist(), flags)
+            return len(sprites)
+        finally:
+            if mode == "screen":
+                particlepy.render.invert(surface)
+
+    def _render_pixels(self, surface: "pygame.Surface"):
+        store = self.store
+        n = store.count
+        pixels = self._pixel_mask()
+        if not n or not pixels.any():
+            return
+        rows = numpy.flatnonzero(pixels & store.alive[:n])
+        centers = self._render_positions()[rows]
+        if self.viewport is not None:
+            centers -= numpy.asarray(self.viewport[:2], dtype=numpy.float32)
+        drawn = self.renderer.draw(surface, centers, store.size[rows, 0], store.form[rows], store.color[rows],
+                                   store.alpha[rows], self.blend_mode)
+        if self.stats is not None:
+            self.stats.current.pixels += drawn
+
+    def _pixel_mask(self) -> numpy.ndarray:
+        # rows drawn as pixels by a PixelRenderer, None without one
+        if not isinstance(self.renderer, particlepy.render.PixelRenderer):
+            return None
+        store = self.store
+        n = store.count
+        return self.renderer.select(store.size[:n], store.form[:n], store.angle[:n])
+
+    def _render_positions(self) -> numpy.ndarray:
+        # centers at render time, between the last two fixed steps with fixed_step
+        store = self.store
+        n = store.count
+        if self.fixed_step is None:
+            return store.position[:n]
+        previous = store.previous_position[:n]
+        return previous + (store.position[:n] - previous) * numpy.float32(self.interpolation)
+
+    def blit_sequence(self) -> Tuple[List["pygame.Surface"], numpy.ndarray]:
+        """Returns the surfaces made by :func:`ParticleSystem.make_shape()` of all living (and, with a :attr:`viewport`,
+            visible) particles together with their top left corners on the target surface, in the order they are being
+            rendered. Particles drawn as pixels by a :class:`particlepy.render.PixelRenderer` are left out
+
+        Returns:
+            Tuple[List[:class:`pygame.Surface`], :class:`numpy.ndarray`]: Surfaces and destinations, shape `(count, 2)`
+        """
+        sprites, destinations, rows = self._blit_rows()
+        return sprites, destinations
+
+    def _blit_rows(self) -> Tuple[List["pygame.Surface"], numpy.ndarray, numpy.ndarray]:
+        # the blit sequence and the rows it was taken from, None for all rows
+        store = self.store
+        n = store.count
+        if not n:
+            return [], numpy.empty((0, 2), dtype=numpy.float32), None
+        destinations = self._render_positions() - store.offset[:n]
+        sprites = store.sprites
+        alive = store.alive[:n]
+        pixels = self._pixel_mask()
+        if pixels is not None:
+            alive = alive & ~pixels
+        if self.viewport is not None:
+            alive = alive & self.in_viewport()
+            # pygame truncates towards zero, flooring keeps particles at the left and top edges from jumping a pixel
+            destinations = numpy.floor(destinations - numpy.asarray(self.viewport[:2], dtype=numpy.float32))
+        if None in sprites:
+            alive = alive & numpy.array([sprite is not None for sprite in sprites])
+        visible = None
+        if not alive.all():
+            visible = numpy.flatnonzero(alive)
+            destinations = destinations[visible]
+            sprites = [sprites[index] for index in visible.tolist()]
+        return sprites, destinations, visible
@@ -0,0 +1,602 @@
+# render.py
+# -*- coding: utf-8 -*-
+
+from typing import Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+import math
+import sys
+import numpy
+
+from particlepy.lazy import pygame
+
+_NO_OWNER = numpy.iinfo(numpy.intp).max
+
+BLEND_MODES = ("alpha", "add", "multiply", "screen")
+
+
+def blend_flags(mode: str) -> int:
+    """Returns the special flags of blits in blend :attr:`mode`
+
+    Args:
+        mode (str): Blend mode, one of :data:`BLEND_MODES`
+
+    Returns:
+        int: Special flags of :func:`pygame.Surface.blit()`
+
+    Raises:
+        Exception: If :attr:`mode` is unknown
+    """
+    if mode == "alpha":
+        return 0
+    if mode == "add":
+        return pygame.BLEND_RGB_ADD
+    if mode in ("multiply", "screen"):
+        # screen multiplies the inverted colors, see invert()
+        return pygame.BLEND_RGB_MULT
+    raise Exception("Unknown blend mode '{}', expected one of {}".format(mode, ", ".join(BLEND_MODES)))
+
+
+def blend_sprite(sprite: "pygame.Surface", mode: str) -> "pygame.Surface":
+    """Returns a copy of :attr:`sprite` to blit with the flags of :func:`blend_flags()`. Pygame ignores transparency in
+        these blits, so the per pixel and surface alpha of :attr:`sprite` are baked into the colors: towards black for
+        `add`, white for `multiply` and black for `screen`, whose copy is also inverted
+
+    Args:
+        sprite (:class:`pygame.Surface`): Surface of a particle
+        mode (str): Blend mode, one of :data:`BLEND_MODES`
+
+    Returns:
+        :class:`pygame.Surface`: Surface without alpha, :attr:`sprite` itself for `alpha`
+    """
+    if not blend_flags(mode):
+        return sprite
+    width, height = sprite.get_size()
+    if not width or not height:
+        return pygame.Surface((width, height))
+    colors = pygame.surfarray.array3d(sprite).astype(numpy.float32)
+    alpha = sprite.get_alpha()
+    opacity = numpy.float32((255 if alpha is None else alpha) / 255)
+    if sprite.get_flags() & pygame.SRCALPHA:
+        opacity = (pygame.surfarray.array_alpha(sprite) * (opacity / 255))[:, :, None]
+    elif sprite.get_colorkey() is not None:
+        opacity = (pygame.surfarray.array_colorkey(sprite) * (opacity / 255))[:, :, None]
+    colors *= opacity
+    if mode == "multiply":
+        colors += (1 - opacity) * 255
+    elif mode == "screen":
+        numpy.subtract(255, colors, out=colors)
+    colors += numpy.float32(0.5)
+    return pygame.surfarray.make_surface(colors.astype(numpy.uint8))
+
+
+def invert(surface: "pygame.Surface"):
+    """Inverts the colors of :attr:`surface` in place, keeping its alpha. Blending in `screen` mode inverts the target,
+        multiplies it with inverted sprites and inverts it back
+
+    Args:
+        surface (:class:`pygame.Surface`): Surface with 24 or 32 bits per pixel
+    """
+    if surface.get_bytesize() == 4:
+        red, green, blue, alpha = surface.get_masks()
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels ^= numpy.uint32(red | green | blue)
+    else:
+        pixels = pygame.surfarray.pixels3d(surface)
+        pixels ^= numpy.uint8(255)
+    # the array locks the surface until it is released
+    del pixels
+
+
+class BlendCache(object):
+    """Keeps the copies of particle surfaces made by :func:`blend_sprite()`, so every surface is converted once while it
+        is being rendered. Copies of surfaces which were not rendered in the last frame are dropped
+
+    Args:
+        mode (str): Blend mode, one of :data:`BLEND_MODES`
+
+    Attributes:
+        mode (str): Blend mode
+        converted (int): Number of surfaces converted by the last :func:`BlendCache.convert()` call
+    """
+
+    def __init__(self, mode: str):
+        """Constructor method
+        """
+        blend_flags(mode)
+        self.mode = mode
+        self.converted = 0
+        self._sprites = {}
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def convert(self, sprites: List["pygame.Surface"]) -> List["pygame.Surface"]:
+        """Returns the blend copies of :attr:`sprites`
+
+        Args:
+            sprites (List[:class:`pygame.Surface`]): Surfaces of particles
+
+        Returns:
+            List[:class:`pygame.Surface`]: Copies in the same order
+        """
+        mode = self.mode
+        if mode == "alpha":
+            return sprites
+        cached = self._sprites
+        kept = {}
+        copies = []
+        converted = 0
+        for sprite in sprites:
+            key = id(sprite)
+            entry = kept.get(key)
+            if entry is None:
+                entry = cached.get(key)
+                # the surface is kept with its copy, so its id cannot be taken by another one in between
+                if entry is None or entry[0] is not sprite:
+                    entry = (sprite, blend_sprite(sprite, mode))
+                    converted += 1
+                kept[key] = entry
+            copies.append(entry[1])
+        self._sprites = kept
+        self.converted = converted
+        return copies
+
+    def discard(self, sprite: "pygame.Surface"):
+        """Drops the copy of :attr:`sprite`, e.g. because it was drawn again in place
+
+        Args:
+            sprite (:class:`pygame.Surface`): Surface of a particle
+        """
+        self._sprites.pop(id(sprite), None)
+
+
+class TiledRenderer(object):
+    """Renders particles tile by tile. Particles are binned by the screen tiles their surface overlaps and every tile
+        is blitted into its own subsurface of the target. Blitting one tile after another keeps the part of the target
+        being written to in the CPU cache, while blitting in particle order jumps across the whole target. A particle
+        straddling a tile border is blitted into every tile it overlaps and clipped by the subsurfaces, so the result is
+        the same as blitting serially in the same order. With more than one thread, tiles are handed to a thread pool.
+        Particle systems never use it on their own, assign it to :attr:`particlepy.particle.ParticleSystem.renderer`
+        to opt in
+
+    Args:
+        tile_size (Tuple[int, int], optional): Width and height of tiles, defaults to `(512, 512)`
+        threads (int, optional): Number of threads, defaults to `1`
+        min_particles (int, optional): Systems with fewer particles are blitted serially, defaults to `2048`
+
+    Attributes:
+        tile_size (Tuple[int, int]): Width and height of tiles
+        threads (int): Number of threads
+        min_particles (int): Systems with fewer particles are blitted serially
+
+    Notes:
+        Pygame 2.6 holds the GIL while blitting, so threads do not blit in parallel and only add overhead. More than
+        one thread only pays off with a pygame build which releases the GIL while blitting (or a free threaded Python)
+        and several cores. The speedup comes from the tile order alone: on one core, alpha blended circles with radii of
+        2 to 16 on a 3840x2160 target took 149 ms per frame instead of 210 ms for 50000 particles and 392 ms instead of
+        466 ms for 100000 particles, but 37 ms like serial blitting for 10000 particles. Smaller targets (e.g.
+        1920x1080) and fewer particles gain little or lose, compare both with :code:`python -m benchmarks` on the
+        target hardware before using it
+    """
+
+    def __init__(self, tile_size: Tuple[int, int] = (512, 512), threads: int = 1, min_particles: int = 2048):
+        """Constructor method
+        """
+        self.tile_size = (int(tile_size[0]), int(tile_size[1]))
+        self.threads = threads or 1
+        self.min_particles = min_particles
+
+        self._executor: ThreadPoolExecutor = None
+        self._target: "pygame.Surface" = None
+        self._target_size: Tuple[int, int] = None
+        self._tiles: List["pygame.Surface"] = []
+        self._origins: numpy.ndarray = None
+        self._columns = 0
+
+    def _prepare(self, surface: "pygame.Surface"):
+        size = surface.get_size()
+        if surface is self._target and size == self._target_size:
+            return
+        width, height = size
+        tile_width, tile_height = self.tile_size
+        self._columns = -(-width // tile_width)
+        rows = -(-height // tile_height)
+        self._tiles = []
+        origins = []
+        for row in range(rows):
+            for column in range(self._columns):
+                x, y = column * tile_width, row * tile_height
+                self._tiles.append(surface.subsurface((x, y, min(tile_width, width - x), min(tile_height, height - y))))
+                origins.append((x, y))
+        self._origins = numpy.array(origins, dtype=numpy.int64).reshape(-1, 2)
+        self._target = surface
+        self._target_size = size
+
+    def _bin(self, surface: "pygame.Surface", sprites: List["pygame.Surface"], destinations: numpy.ndarray,
+             sizes: numpy.ndarray = None) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        # tiles, indices into sprites and destinations relative to the tiles sorted by tile, and where the tiles start
+        self._prepare(surface)
+        width, height = surface.get_size()
+
+        # pygame truncates float destinations, so do the same before moving them into tile coordinates
+        corners = numpy.trunc(destinations).astype(numpy.int64)
+        if sizes is None:
+            sizes = numpy.array([sprite.get_size() for sprite in sprites], dtype=numpy.int64).reshape(-1, 2)
+        else:
+            sizes = numpy.asarray(sizes).astype(numpy.int64)
+        ends = corners + sizes
+        visible = numpy.flatnonzero((ends[:, 0] > 0) & (ends[:, 1] > 0) & (corners[:, 0] < width) &
+                                    (corners[:, 1] < height) & (sizes[:, 0] > 0) & (sizes[:, 1] > 0))
+        first = numpy.maximum(corners[visible], 0) // self.tile_size
+        last = (numpy.minimum(ends[visible], (width, height)) - 1) // self.tile_size
+        spans = last - first + 1
+
+        # one entry per overlapped tile, most particles overlap only one
+        counts = spans[:, 0] * spans[:, 1]
+        if (counts == 1).all():
+            indices = visible
+            tiles = first[:, 1] * self._columns + first[:, 0]
+        else:
+            indices = numpy.repeat(visible, counts)
+            local = numpy.arange(len(indices)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+            span_x = numpy.repeat(spans[:, 0], counts)
+            tile_x = numpy.repeat(first[:, 0], counts) + local % span_x
+            tile_y = numpy.repeat(first[:, 1], counts) + local // span_x
+            tiles = tile_y * self._columns + tile_x
+
+        # a stable sort keeps the order of the particles inside of each tile
+        order = numpy.argsort(tiles, kind="stable")
+        tiles = tiles[order]
+        indices = indices[order]
+        starts = numpy.flatnonzero(numpy.r_[True, tiles[1:] != tiles[:-1]]) if len(tiles) else tiles
+        return tiles, indices, corners[indices] - self._origins[tiles], starts
+
+    def bin(self, surface: "pygame.Surface", sprites: List["pygame.Surface"], destinations: numpy.ndarray,
+            sizes: numpy.ndarray = None) -> List[Tuple[int, numpy.ndarray, numpy.ndarray]]:
+        """Sorts the surfaces into the tiles of :attr:`surface` they overlap, keeping their order inside of each tile
+
+        Args:
+            surface (:class:`pygame.Surface`): Target surface
+            sprites (List[:class:`pygame.Surface`]): Surfaces to blit
+            destinations (:class:`numpy.ndarray`): Top left corners of :attr:`sprites`, shape `(count, 2)`
+            sizes (:class:`numpy.ndarray`, optional): Widths and heights of :attr:`sprites`, shape `(count, 2)`,
+                `None` to ask the surfaces, defaults to `None`
+
+        Returns:
+            List[Tuple[int, :class:`numpy.ndarray`, :class:`numpy.ndarray`]]: Tile index, indices into :attr:`sprites`
+            and destinations relative to the tile
+        """
+        tiles, indices, corners, starts = self._bin(surface, sprites, destinations, sizes)
+        stops = numpy.r_[starts[1:], len(tiles)]
+        return [(int(tiles[start]), indices[start:stop], corners[start:stop])
+                for start, stop in zip(starts.tolist(), stops.tolist())]
+
+    def render(self, surface: "pygame.Surface", sprites: List["pygame.Surface"], destinations: numpy.ndarray,
+               special_flags: int = 0, sizes: numpy.ndarray = None) -> int:
+        """Blits :attr:`sprites` at :attr:`destinations` on :attr:`surface`
+
+        Args:
+            surface (:class:`pygame.Surface`): Target surface
+            sprites (List[:class:`pygame.Surface`]): Surfaces to blit
+            destinations (:class:`numpy.ndarray`): Top left corners of :attr:`sprites`, shape `(count, 2)`
+            special_flags (int, optional): Special flags of all blits, see :func:`blend_flags()`, defaults to `0`
+            sizes (:class:`numpy.ndarray`, optional): Widths and heights of :attr:`sprites`, shape `(count, 2)`,
+                `None` to ask the surfaces, defaults to `None`
+
+        Returns:
+            int: Number of blits issued, particles straddling tile borders count once per tile
+        """
+        if len(sprites) < self.min_particles:
+            _blit(surface, sprites, destinations.tolist(), special_flags)
+            return len(sprites)
+
+        tiles, indices, corners, starts = self._bin(surface, sprites, destinations, sizes)
+        ordered = list(map(sprites.__getitem__, indices.tolist()))
+        # tuples of ints are cheaper to make than lists, which trigger many garbage collections at this count
+        corners = list(zip(corners[:, 0].tolist(), corners[:, 1].tolist()))
+        bounds = starts.tolist() + [len(ordered)]
+        jobs = [(self._tiles[tile], ordered[start:stop], corners[start:stop], special_flags)
+                for tile, start, stop in zip(tiles[starts].tolist(), bounds[:-1], bounds[1:])]
+        if self.threads < 2:
+            for job in jobs:
+                _blit(*job)
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="particlepy-render")
+            list(self._executor.map(_blit_tile, jobs))
+        return len(ordered)
+
+    def close(self):
+        """Stops the threads and releases the subsurfaces
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._target = None
+        self._tiles = []
+
+
+class PixelRenderer(object):
+    """Draws small particles straight into the pixels of the target surface instead of making and blitting a surface for
+        each of them. Discs (:class:`particlepy.shape.Circle`) and squares (unrotated :class:`particlepy.shape.Rect`) up
+        to :attr:`max_radius` are written through the zero-copy arrays of :mod:`pygame.surfarray` and alpha blended
+        with vectorized NumPy operations. Particles smaller than a pixel cover the pixel of their center. Overlapping
+        particles are blended in row order, like blits. Larger particles and other shapes get surfaces as usual and are
+        blitted afterwards, by :attr:`fallback` if it is set. Assign it to
+        :attr:`particlepy.particle.ParticleSystem.renderer` to use it
+
+    Args:
+        max_radius (float, optional): Largest radius of particles drawn as pixels, defaults to `2`
+        fallback (:class:`TiledRenderer`, optional): Renderer which blits the other particles, `None` to blit them
+            serially, defaults to `None`
+
+    Attributes:
+        max_radius (float): Largest radius of particles drawn as pixels
+        fallback (:class:`TiledRenderer`): Renderer which blits the other particles, `None` to blit them serially
+
+    Notes:
+        The target surface must have 24 or 32 bits per pixel. Pixel particles are drawn before the blitted ones
+    """
+
+    def __init__(self, max_radius: float = 2, fallback: TiledRenderer = None):
+        """Constructor method
+        """
+        self.max_radius = max_radius
+        self.fallback = fallback
+        self._owner_buffer: numpy.ndarray = None
+
+    def select(self, size: numpy.ndarray, form: numpy.ndarray, angle: numpy.ndarray) -> numpy.ndarray:
+        """Returns which particles are drawn as pixels
+
+        Args:
+            size (:class:`numpy.ndarray`): Sizes, shape `(count, 2)`, see :attr:`particlepy.store.ParticleStore.size`
+            form (:class:`numpy.ndarray`): Pixel forms, shape `(count,)`, see :attr:`particlepy.shape.Shape.pixel_form`
+            angle (:class:`numpy.ndarray`): Degrees of rotation, shape `(count,)`
+
+        Returns:
+            :class:`numpy.ndarray`: `True` for each particle drawn as pixels, shape `(count,)`
+        """
+        selected = (form > 0) & (size[:, 0] <= self.max_radius) & (size[:, 1] <= self.max_radius)
+        # rotated squares keep their surfaces
+        squares = form == 2
+        if squares.any():
+            selected &= ~squares | (angle % 90 == 0)
+        return selected
+
+    def render(self, surface: "pygame.Surface", sprites: List["pygame.Surface"], destinations: numpy.ndarray,
+               special_flags: int = 0, sizes: numpy.ndarray = None) -> int:
+        """Blits the surfaces of particles not drawn as pixels, see :func:`TiledRenderer.render()`
+
+        Args:
+            surface (:class:`pygame.Surface`): Target surface
+            sprites (List[:class:`pygame.Surface`]): Surfaces to blit
+            destinations (:class:`numpy.ndarray`): Top left corners of :attr:`sprites`, shape `(count, 2)`
+            special_flags (int, optional): Special flags of all blits, see :func:`blend_flags()`, defaults to `0`
+            sizes (:class:`numpy.ndarray`, optional): Widths and heights of :attr:`sprites` for :attr:`fallback`,
+                shape `(count, 2)`, defaults to `None`
+
+        Returns:
+            int: Number of blits issued
+        """
+        if self.fallback is not None:
+            return self.fallback.render(surface, sprites, destinations, special_flags, sizes)
+        _blit(surface, sprites, destinations.tolist(), special_flags)
+        return len(sprites)
+
+    def draw(self, surface: "pygame.Surface", centers: numpy.ndarray, radii: numpy.ndarray, forms: numpy.ndarray,
+             colors: numpy.ndarray, alphas: numpy.ndarray, mode: str = "alpha") -> int:
+        """Blends particles into the pixels of :attr:`surface`
+
+        Args:
+            surface (:class:`pygame.Surface`): Target surface
+            centers (:class:`numpy.ndarray`): Centers in surface coordinates, shape `(count, 2)`
+            radii (:class:`numpy.ndarray`): Radii, shape `(count,)`
+            forms (:class:`numpy.ndarray`): Pixel forms, `1` for discs and `2` for squares, shape `(count,)`
+            colors (:class:`numpy.ndarray`): Colors, shape `(count, 3)`
+            alphas (:class:`numpy.ndarray`): Transparencies from `0` to `255`, shape `(count,)`
+            mode (str, optional): Blend mode, one of :data:`BLEND_MODES`, like the blits of the same mode. Only
+                `alpha` changes the alpha channel of the target, defaults to `"alpha"`
+
+        Returns:
+            int: Number of particles which covered at least one pixel
+        """
+        blend_flags(mode)
+        if not len(centers):
+            return 0
+        width, height = surface.get_size()
+        reach = max(int(math.ceil(float(radii.max()))), 0)
+        x = centers[:, 0]
+        y = centers[:, 1]
+        inside = numpy.flatnonzero((x + reach + 1 > 0) & (x - reach < width) & (y + reach + 1 > 0) & (y - reach < height))
+        if not len(inside):
+            return 0
+        x = numpy.asarray(x[inside], dtype=numpy.float32)
+        y = numpy.asarray(y[inside], dtype=numpy.float32)
+        radius = numpy.asarray(radii[inside], dtype=numpy.float32)
+        squares = forms[inside] == 2
+        if not squares.any():
+            squares = None
+        column = numpy.floor(x)
+        row = numpy.floor(y)
+        packed = surface.get_bytesize() == 4
+        row_length = surface.get_pitch() // 4 if packed else width
+
+        # every particle tests the pixels of a square stencil around the pixel of its center, one offset at a time
+        offsets = range(-reach, reach + 1)
+        stencil_x = [_stencil_axis(column + offset, x, radius, width) for offset in offsets]
+        keys = []
+        particles = []
+        for offset_y in offsets:
+            pixel_y, distance_y, square_y, inside_y = _stencil_axis(row + offset_y, y, radius, height)
+            distance_y *= distance_y
+            for offset_x, (pixel_x, distance_x, square_x, inside_x) in zip(offsets, stencil_x):
+                if offset_x == 0 and offset_y == 0:
+                    covered = radius > 0
+                else:
+                    covered = distance_x * distance_x
+                    covered += distance_y
+                    covered = covered <= radius * radius
+                    if squares is not None:
+                        covered = numpy.where(squares, square_x & square_y, covered)
+                covered &= inside_x
+                covered &= inside_y
+                hit = numpy.flatnonzero(covered)
+                keys.append(pixel_y[hit] * row_length + pixel_x[hit])
+                particles.append(hit)
+        keys = numpy.concatenate(keys)
+        particles = numpy.concatenate(particles)
+        if not len(keys):
+            return 0
+        drawn = numpy.zeros(len(inside), dtype=bool)
+        drawn[particles] = True
+
+        colors = numpy.asarray(colors, dtype=numpy.float32)[inside]
+        opacity = numpy.asarray(alphas, dtype=numpy.float32)[inside] * numpy.float32(1 / 255)
+        if packed:
+            pixels = pygame.surfarray.pixels2d(surface)
+            # all rows of the surface as one array, keys already count in the padding at the end of each row
+            target = numpy.lib.stride_tricks.as_strided(pixels, shape=((height - 1) * row_length + width,),
+                                                         strides=(pixels.strides[0],))
+            blend = _PackedBlend(target, surface, colors, opacity, mode)
+        else:
+            pixels = pygame.surfarray.pixels3d(surface)
+            alpha_pixels = pygame.surfarray.pixels_alpha(surface) if surface.get_flags() & pygame.SRCALPHA else None
+            blend = _ChannelBlend(pixels, alpha_pixels, width, colors, opacity, mode)
+        try:
+            # writes of several particles to the same pixel are blended one after another in row order: each pass
+            # blends the write of the first remaining particle of every pixel
+            owner = self._owners(len(target) if packed else width * height)
+            while len(keys):
+                numpy.minimum.at(owner, keys, particles)
+                first = owner[keys] == particles
+                owner[keys] = _NO_OWNER
+                if first.all():
+                    blend(keys, particles)
+                    break
+                blend(keys[first], particles[first])
+                later = ~first
+                keys = keys[later]
+                particles = particles[later]
+        finally:
+            # the arrays lock the surface until they are released
+            del pixels, blend
+            if not packed:
+                del alpha_pixels
+        return int(numpy.count_nonzero(drawn))
+
+    def _owners(self, size: int) -> numpy.ndarray:
+        # first particle per pixel of the current pass, kept between frames and reset after each pass
+        owners = self._owner_buffer
+        if owners is None or len(owners) < size:
+            owners = numpy.full(size, _NO_OWNER, dtype=numpy.intp)
+            self._owner_buffer = owners
+        return owners
+
+
+def _stencil_axis(pixel: numpy.ndarray, center: numpy.ndarray, radius: numpy.ndarray,
+                  length: int) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    # pixel indices along one axis, distances of their centers to the particle centers, whether the pixels lie inside
+    # of squares and inside of the surface
+    distance = pixel + numpy.float32(0.5)
+    distance -= center
+    square = (distance >= -radius) & (distance < radius)
+    inside = (pixel >= 0) & (pixel < length)
+    return pixel.astype(numpy.intp), distance, square, inside
+
+
+def _blend_factors(colors: numpy.ndarray, opacity: numpy.ndarray,
+                   mode: str) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    # every mode blends as target * keep + add, per particle and channel, the added 0.5 rounds. Returns the factors of
+    # the color channels and of the alpha channel, which only alpha blending changes
+    count = len(colors)
+    weighted = colors * opacity[:, None]
+    half = numpy.float32(0.5)
+    if mode == "alpha":
+        keep = numpy.repeat((1 - opacity)[:, None], 3, axis=1)
+        add = weighted + half
+        return keep, add, 1 - opacity, numpy.float32(255) * opacity + half
+    if mode == "add":
+        keep = numpy.ones((count, 3), dtype=numpy.float32)
+        add = weighted + half
+    elif mode == "multiply":
+        keep = weighted * numpy.float32(1 / 255)
+        keep += (1 - opacity)[:, None]
+        add = numpy.full((count, 3), half, dtype=numpy.float32)
+    elif mode == "screen":
+        keep = 1 - weighted * numpy.float32(1 / 255)
+        add = weighted + half
+    else:
+        raise Exception("Unknown blend mode '{}', expected one of {}".format(mode, ", ".join(BLEND_MODES)))
+    return keep, add, numpy.ones(count, dtype=numpy.float32), numpy.full(count, half, dtype=numpy.float32)
+
+
+class _PackedBlend(object):
+    # blends colors into 32 bit pixels, all bytes of a pixel at once: target * keep + add
+
+    def __init__(self, target: numpy.ndarray, surface: "pygame.Surface", colors: numpy.ndarray,
+                 opacity: numpy.ndarray, mode: str):
+        self.target = target
+        self.saturate = mode == "add"
+        shifts = surface.get_shifts()
+        has_alpha = bool(surface.get_masks()[3])
+        keep, add, alpha_keep, alpha_add = _blend_factors(colors, opacity, mode)
+        count = len(colors)
+        # bytes which are not a channel keep their value
+        self.keep = numpy.ones((count, 4), dtype=numpy.float32)
+        self.add = numpy.full((count, 4), 0.5, dtype=numpy.float32)
+        for channel, shift in enumerate(shifts if has_alpha else shifts[:3]):
+            byte = shift // 8 if sys.byteorder == "little" else 3 - shift // 8
+            self.keep[:, byte] = keep[:, channel] if channel < 3 else alpha_keep
+            self.add[:, byte] = add[:, channel] if channel < 3 else alpha_add
+
+    def __call__(self, keys: numpy.ndarray, particles: numpy.ndarray):
+        # whole pixels are gathered and scattered, which is much faster than rows of four bytes
+        values = self.target.take(keys).view(numpy.uint8).reshape(-1, 4).astype(numpy.float32)
+        values *= self.keep.take(particles, axis=0)
+        values += self.add.take(particles, axis=0)
+        if self.saturate:
+            numpy.minimum(values, 255, out=values)
+        self.target[keys] = values.astype(numpy.uint8).view(numpy.uint32).ravel()
+
+
+class _ChannelBlend(object):
+    # blends colors into the channel arrays of surfaces which are not 32 bit
+
+    def __init__(self, pixels: numpy.ndarray, alpha_pixels: numpy.ndarray, width: int, colors: numpy.ndarray,
+                 opacity: numpy.ndarray, mode: str):
+        self.pixels = pixels
+        self.alpha_pixels = alpha_pixels if mode == "alpha" else None
+        self.width = width
+        self.saturate = mode == "add"
+        self.keep, self.add, self.alpha_keep, self.alpha_add = _blend_factors(colors, opacity, mode)
+
+    def __call__(self, keys: numpy.ndarray, particles: numpy.ndarray):
+        x = keys % self.width
+        y = keys // self.width
+        values = self.pixels[x, y].astype(numpy.float32)
+        values *= self.keep.take(particles, axis=0)
+        values += self.add.take(particles, axis=0)
+        if self.saturate:
+            numpy.minimum(values, 255, out=values)
+        self.pixels[x, y] = values.astype(numpy.uint8)
+        if self.alpha_pixels is not None:
+            alpha = self.alpha_pixels[x, y].astype(numpy.float32)
+            alpha *= self.alpha_keep[particles]
+            alpha += self.alpha_add[particles]
+            self.alpha_pixels[x, y] = alpha.astype(numpy.uint8)
+
+
+def _blit(surface: "pygame.Surface", sprites: List["pygame.Surface"], destinations: List[List[float]],
+          special_flags: int = 0):
+    blits = getattr(surface, "fblits", None)
+    if blits is not None:
+        blits(zip(sprites, destinations), special_flags)
+    elif special_flags:
+        surface.blits(((sprite, destination, None, special_flags) for sprite, destination in zip(sprites, destinations)),
+                      doreturn=False)
+    else:
+        surface.blits(zip(sprites, destinations), doreturn=False)
+
+
+def _blit_tile(job: Tuple["pygame.Surface", List["pygame.Surface"], List[List[int]], int]):
+    _blit(*job)
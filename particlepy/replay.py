@@ -0,0 +1,345 @@
+# replay.py
+# -*- coding: utf-8 -*-
+
+from typing import Tuple, List, Dict, BinaryIO
+import importlib
+import itertools
+import struct
+import numpy
+
+import particlepy.shape
+import particlepy.store
+
+MAGIC = b"PPYREC"
+FORMAT_VERSION = 2
+
+# columns which are not recorded, because they are derived from others, only used while updating or rendering state
+_DERIVED_COLUMNS = ("previous_position", "offset", "kind", "form", "acceleration")
+
+_UPDATE = 1
+_KIND = 2
+_EMIT = 3
+_CLEAR = 4
+_KILL = 5
+_REVIVE = 6
+_STATE = 7
+
+_HEADER = struct.Struct("<6sHH")
+_COLUMN = struct.Struct("<B8sB")
+_TAG = struct.Struct("<B")
+_UPDATE_RECORD = struct.Struct("<dBdd")
+_KIND_RECORD = struct.Struct("<HH")
+_EMIT_RECORD = struct.Struct("<HI")
+_STATE_RECORD = struct.Struct("<ddQBHI")
+_FORCE_RECORD = struct.Struct("<H")
+
+
+def shape_name(shape_type: type) -> str:
+    """Returns the name a shape class is recorded as
+
+    Args:
+        shape_type (type): Class of shape
+
+    Returns:
+        str: Module and qualified name of the class, e.g. :code:`"particlepy.shape:Circle"`
+    """
+    return "{}:{}".format(shape_type.__module__, shape_type.__qualname__)
+
+
+def make_prototype(name: str, shapes: Dict[str, particlepy.shape.Shape] = None) -> particlepy.shape.Shape:
+    """Returns a prototype shape of the class recorded as :attr:`name`
+
+    Args:
+        name (str): Name made by :func:`shape_name()`
+        shapes (Dict[str, :class:`particlepy.shape.Shape`], optional): Prototypes by name. A prototype made because
+            :attr:`name` is missing is added, defaults to `None`
+
+    Returns:
+        :class:`particlepy.shape.Shape`: Prototype from :attr:`shapes`, otherwise a new shape with radius `1` and
+        white color
+
+    Raises:
+        Exception: Class is a :class:`particlepy.shape.Image`, which can not be made without a surface
+    """
+    if shapes is not None and name in shapes:
+        return shapes[name]
+    module, qualname = name.split(":")
+    shape_type = importlib.import_module(module)
+    for part in qualname.split("."):
+        shape_type = getattr(shape_type, part)
+    if issubclass(shape_type, particlepy.shape.Image):
+        raise Exception("{} shapes need a prototype in shapes".format(name))
+    shape = shape_type(radius=1, color=(255, 255, 255))
+    if shapes is not None:
+        shapes[name] = shape
+    return shape
+
+
+class Recorder(object):
+    """Writes the inputs of a :class:`particlepy.particle.ParticleSystem` to a compact, append-only binary stream: the
+        delta time and gravity of every :func:`particlepy.particle.ParticleSystem.update()` call, the rows of all
+        emitted particles and clearing, killing and reviving the system. A :class:`Replayer` drives a system with the
+        same settings (e.g. forces and fixed step) through the same states from the stream. Use
+        :func:`particlepy.particle.ParticleSystem.record()` to attach a recorder, which starts the stream with the
+        particles and state the system already has (see :func:`Recorder.record_state()`)
+
+    Args:
+        stream (BinaryIO): Stream to write to, e.g. a file opened with :code:`"wb"`
+
+    Attributes:
+        stream (BinaryIO): Stream written to
+        frames (int): Number of recorded updates
+        emitted (int): Number of recorded particles
+
+    Notes:
+        Changes made to particles outside of the particle system (e.g. :func:`particlepy.math.fade_system_color()` or
+        setting attributes of particles) and the data dictionaries of particles are not recorded
+    """
+
+    def __init__(self, stream: BinaryIO):
+        """Constructor method
+        """
+        self.stream = stream
+        self.frames = 0
+        self.emitted = 0
+        self._kinds: Dict[type, int] = {}
+        self._columns = [(name, width, numpy.dtype(dtype))
+                         for name, (width, dtype) in particlepy.store.ParticleStore.columns.items()
+                         if name not in _DERIVED_COLUMNS]
+
+        stream.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(self._columns)))
+        for name, width, dtype in self._columns:
+            encoded = name.encode("utf-8")
+            stream.write(_COLUMN.pack(len(encoded), dtype.str.encode("ascii"), width))
+            stream.write(encoded)
+
+    def record_update(self, delta_time: float, gravity: Tuple[float, float] = None):
+        """Records an update
+
+        Args:
+            delta_time (float): Frame time of update
+            gravity (Tuple[float, float], optional): Gravity of update, defaults to `None`
+        """
+        if gravity is None:
+            record = _UPDATE_RECORD.pack(delta_time, 0, 0, 0)
+        else:
+            record = _UPDATE_RECORD.pack(delta_time, 1, gravity[0], gravity[1])
+        self.stream.write(_TAG.pack(_UPDATE) + record)
+        self.frames += 1
+
+    def record_emission(self, store: particlepy.store.ParticleStore, rows: slice, shape_type: type):
+        """Records the rows of newly emitted particles
+
+        Args:
+            store (:class:`particlepy.store.ParticleStore`): Store of the particle system
+            rows (slice): Rows of the emitted particles
+            shape_type (type): Class of their shapes
+        """
+        count = rows.stop - rows.start
+        if count <= 0:
+            return
+        stream = self.stream
+        kind = self._kinds.get(shape_type)
+        if kind is None:
+            kind = self._kinds[shape_type] = len(self._kinds)
+            encoded = shape_name(shape_type).encode("utf-8")
+            stream.write(_TAG.pack(_KIND) + _KIND_RECORD.pack(kind, len(encoded)) + encoded)
+        stream.write(_TAG.pack(_EMIT) + _EMIT_RECORD.pack(kind, count))
+        for name, width, dtype in self._columns:
+            stream.write(numpy.ascontiguousarray(getattr(store, name)[rows], dtype=dtype).tobytes())
+        self.emitted += count
+
+    def record_state(self, system: "particlepy.particle.ParticleSystem"):
+        """Records the current particles of :attr:`system` as emissions, followed by its fixed step accumulator, step
+            count, :attr:`particlepy.particle.ParticleSystem.alive`, the state of its forces (see
+            :func:`particlepy.forces.Force.state()`) and the previous positions of the particles. Recording a running
+            system starts with this, so the replay continues from the same state
+
+        Args:
+            system (:class:`particlepy.particle.ParticleSystem`): Particle system being recorded
+        """
+        store = system.store
+        n = store.count
+        prototypes = store.prototypes
+        kinds = store.kind[:n].tolist()
+        shape_types = [type(prototypes[kinds[index]]) if particle is None else type(particle.shape)
+                       for index, particle in enumerate(store.objects[:n])]
+        start = 0
+        for shape_type, rows in itertools.groupby(shape_types):
+            stop = start + len(list(rows))
+            self.record_emission(store, slice(start, stop), shape_type)
+            start = stop
+
+        states = [tuple(force.state()) for force in system.forces]
+        stream = self.stream
+        stream.write(_TAG.pack(_STATE) + _STATE_RECORD.pack(system._accumulator, system.interpolation,
+                                                            system._step_count, system.alive, len(states), n))
+        for state in states:
+            stream.write(_FORCE_RECORD.pack(len(state)) + struct.pack("<{}d".format(len(state)), *state))
+        stream.write(numpy.ascontiguousarray(store.previous_position[:n], dtype=numpy.float32).tobytes())
+
+    def record_clear(self):
+        """Records clearing the particle system
+        """
+        self.stream.write(_TAG.pack(_CLEAR))
+
+    def record_alive(self, alive: bool):
+        """Records killing or reviving the particle system
+
+        Args:
+            alive (bool): `True` if the system was revived, and `False` if it was killed
+        """
+        self.stream.write(_TAG.pack(_REVIVE if alive else _KILL))
+
+    def flush(self):
+        """Flushes the stream
+        """
+        self.stream.flush()
+
+
+class Replayer(object):
+    """Reads a stream written by :class:`Recorder` and replays it into a particle system. Emitted rows are restored with
+        the exact recorded values and updates get the recorded delta time and gravity, so the system goes through the
+        same states as the recorded one, bit for bit, without rendering or waiting for frames
+
+    Args:
+        stream (BinaryIO): Stream to read from, e.g. a file opened with :code:`"rb"`
+        shapes (Dict[str, :class:`particlepy.shape.Shape`], optional): Prototype shapes by recorded class name (see
+            :func:`shape_name()`), see :func:`make_prototype()`, defaults to `None`
+
+    Attributes:
+        stream (BinaryIO): Stream read from
+        version (int): Format version of the stream
+        frames (int): Number of replayed updates
+        emitted (int): Number of replayed particles
+
+    Raises:
+        Exception: Stream is no recording or has an unsupported version
+
+    Notes:
+        The particle system should be empty when the replay starts. Particles which were alive when the recording
+        started are restored from the stream, the forces of the system are restored in order
+        Surfaces are not recorded. Systems with an :attr:`particlepy.particle.ParticleSystem.viewport` and an
+        :attr:`particlepy.particle.ParticleSystem.offscreen_interval` above `1` take the extents of surfaces into
+        account, so they have to call :func:`particlepy.particle.ParticleSystem.make_shape()` during the replay as well
+    """
+
+    def __init__(self, stream: BinaryIO, shapes: Dict[str, particlepy.shape.Shape] = None):
+        """Constructor method
+        """
+        self.stream = stream
+        self.frames = 0
+        self.emitted = 0
+        self._shapes = dict(shapes) if shapes else {}
+        self._kinds: Dict[int, particlepy.shape.Shape] = {}
+
+        header = stream.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise Exception("Stream is no particle recording")
+        magic, self.version, count = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise Exception("Stream is no particle recording")
+        if self.version > FORMAT_VERSION:
+            raise Exception("Recording has format version {}, only versions up to {} are supported".format(
+                self.version, FORMAT_VERSION))
+        self._columns: List[Tuple[str, int, numpy.dtype]] = []
+        for _ in range(count):
+            length, dtype, width = _COLUMN.unpack(self._read(_COLUMN.size))
+            name = self._read(length).decode("utf-8")
+            self._columns.append((name, width, numpy.dtype(dtype.rstrip(b"\0").decode("ascii"))))
+
+    def _read(self, size: int) -> bytes:
+        data = self.stream.read(size)
+        if len(data) < size:
+            raise EOFError
+        return data
+
+    def step(self, system: "particlepy.particle.ParticleSystem") -> bool:
+        """Replays the records up to and including the next update. A record cut off at the end of the stream (e.g. by
+            a crash while recording) is treated as end of stream
+
+        Args:
+            system (:class:`particlepy.particle.ParticleSystem`): Particle system to drive
+
+        Returns:
+            bool: `True` if an update was replayed, `False` at the end of the stream
+        """
+        read = self._read
+        try:
+            while True:
+                tag = read(_TAG.size)[0]
+                if tag == _UPDATE:
+                    delta_time, has_gravity, gravity_x, gravity_y = _UPDATE_RECORD.unpack(read(_UPDATE_RECORD.size))
+                    system.update(delta_time, (gravity_x, gravity_y) if has_gravity else None)
+                    self.frames += 1
+                    return True
+                elif tag == _KIND:
+                    kind, length = _KIND_RECORD.unpack(read(_KIND_RECORD.size))
+                    self._kinds[kind] = make_prototype(read(length).decode("utf-8"), self._shapes)
+                elif tag == _EMIT:
+                    kind, count = _EMIT_RECORD.unpack(read(_EMIT_RECORD.size))
+                    values = {}
+                    for name, width, dtype in self._columns:
+                        shape = (count, width) if width else (count,)
+                        values[name] = numpy.frombuffer(read(count * max(width, 1) * dtype.itemsize),
+                                                        dtype=dtype).reshape(shape)
+                    self._emit(system, self._kinds[kind], count, values)
+                elif tag == _CLEAR:
+                    system.clear()
+                elif tag == _KILL:
+                    system.kill()
+                elif tag == _REVIVE:
+                    system.revive()
+                elif tag == _STATE:
+                    self._restore(system, read)
+                else:
+                    raise Exception("Unknown record {} in particle recording".format(tag))
+        except EOFError:
+            return False
+
+    def _restore(self, system: "particlepy.particle.ParticleSystem", read):
+        accumulator, interpolation, step_count, alive, forces, count = _STATE_RECORD.unpack(read(_STATE_RECORD.size))
+        states = []
+        for _ in range(forces):
+            length, = _FORCE_RECORD.unpack(read(_FORCE_RECORD.size))
+            states.append(struct.unpack("<{}d".format(length), read(length * 8)))
+        previous = numpy.frombuffer(read(count * 8), dtype=numpy.float32).reshape(count, 2)
+
+        system._accumulator = accumulator
+        system.interpolation = interpolation
+        system._step_count = step_count
+        system.alive = bool(alive)
+        for force, state in zip(system.forces, states):
+            force.set_state(state)
+        # the rows of the recorded particles were just emitted, they are the last ones of the store
+        store = system.store
+        store.previous_position[store.count - count:store.count] = previous
+
+    def _emit(self, system: "particlepy.particle.ParticleSystem", shape: particlepy.shape.Shape, count: int,
+              values: Dict[str, numpy.ndarray]):
+        store = system.store
+        rows = store.add_many(count=count, shape=shape, position=values["position"], velocity=values["velocity"],
+                              delta_radius=values["delta_radius"], size=values["size"], color=values["color"],
+                              alpha=values["alpha"], angle=values["angle"])
+        # the other columns, e.g. progress and time of particles changed before they were emitted
+        for name, array in values.items():
+            column = getattr(store, name, None)
+            if column is not None:
+                column[rows] = array
+        system._emitted(rows, type(shape))
+        self.emitted += count
+
+    def replay(self, system: "particlepy.particle.ParticleSystem", frames: int = None) -> int:
+        """Replays the stream until its end or until :attr:`frames` updates were replayed
+
+        Args:
+            system (:class:`particlepy.particle.ParticleSystem`): Particle system to drive
+            frames (int, optional): Maximum number of updates, `None` for all, defaults to `None`
+
+        Returns:
+            int: Number of replayed updates
+        """
+        replayed = 0
+        while (frames is None or replayed < frames) and self.step(system):
+            replayed += 1
+        return replayed
@@ -1,19 +1,33 @@
 # shape.py
 # -*- coding: utf-8 -*-
 
-from typing import Tuple
+from typing import Tuple, Hashable
 from abc import ABC
+import copy
+import functools
 import numpy
-import contextlib
 
-with contextlib.redirect_stdout(None):
-    import pygame
+from particlepy.lazy import pygame
+
+import particlepy.cache
+import particlepy.store
+from particlepy.store import StoreField
 
 
 # TODO: AA shapes
 
 
-def rotate(surface: pygame.Surface, angle: float):
+def _pixels(value: float) -> int:
+    """Converts a size to whole pixels
+
+    Notes:
+        Sizes come from float32 store columns, so a size of 20 may arrive as 19.99998. Rounding to
+        three decimals first keeps that from costing a pixel while real fractions still truncate.
+    """
+    return int(round(float(value), 3))
+
+
+def rotate(surface: "pygame.Surface", angle: float):
     """Rotates shape by angle
 
     Notes:
@@ -25,7 +39,61 @@ def rotate(surface: pygame.Surface, angle: float):
         return surface
 
 
-class Shape(object):
+@functools.lru_cache(maxsize=64)
+def glow_mask(size: int, falloff: float = 2) -> numpy.ndarray:
+    """Returns the alpha of a radial glow, opaque in the center and fading out towards the edge of the inscribed circle.
+        Masks are cached and must not be modified
+
+    Args:
+        size (int): Width and height of mask
+        falloff (float, optional): Power of the fade, `1` fades linearly and larger values make a smaller, brighter
+            core, defaults to `2`
+
+    Returns:
+        :class:`numpy.ndarray`: Alpha values from `0` to `255`, shape `(size, size)`
+    """
+    radius = size / 2
+    coordinates = numpy.arange(size) + 0.5 - radius
+    distance = numpy.sqrt(coordinates[:, None] ** 2 + coordinates[None, :] ** 2)
+    mask = numpy.clip(1 - distance / max(radius, 1e-9), 0, 1) ** falloff
+    mask = (mask * 255 + 0.5).astype(numpy.uint8)
+    mask.flags.writeable = False
+    return mask
+
+
+@functools.lru_cache(maxsize=256)
+def glow_surface(radius: int, color: Tuple[int, int, int], falloff: float = 2, alpha: int = 255) -> "pygame.Surface":
+    """Returns a prebaked radial glow sprite, see :func:`glow_mask()`. Sprites are cached, so a glow costs one blit of a
+        shared surface instead of several layered ones, e.g. as surface of an :class:`Image` shape or with
+        :attr:`particlepy.particle.ParticleSystem.blend_mode` `add`. Sprites must not be modified
+
+    Args:
+        radius (int): Radius of glow
+        color (Tuple[int, int, int]): Color of glow
+        falloff (float, optional): Power of the fade, see :func:`glow_mask()`, defaults to `2`
+        alpha (int, optional): Transparency of the whole sprite `(0 - 255 → RGBA)`, defaults to `255`
+
+    Returns:
+        :class:`pygame.Surface`: Sprite of size :code:`(2 * radius, 2 * radius)`
+    """
+    size = _pixels(radius * 2)
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    _draw_glow(surface, color, falloff)
+    if alpha < 255:
+        surface.set_alpha(alpha)
+    return surface
+
+
+def _draw_glow(surface: "pygame.Surface", color: Tuple[int, int, int], falloff: float):
+    surface.fill(color)
+    if surface.get_width():
+        alpha = pygame.surfarray.pixels_alpha(surface)
+        alpha[...] = glow_mask(surface.get_width(), falloff)
+        # the array locks the surface until it is released
+        del alpha
+
+
+class Shape(particlepy.store.StoreView):
     """This is the shape class. It is only used to subclass and use as a base for shapes.
 
     Args:
@@ -37,18 +105,46 @@ class Shape(object):
         _orig_alpha (int): Transparency of shape when being instanced. Property is :func:`Shape.orig_alpha()`
         angle (float): Degrees of rotation
         _orig_angle (float): Angle of shape when being instanced. Property is :func:`Shape.orig_angle()`
+
+    Class Attributes:
+        pixel_form (int): How :class:`particlepy.render.PixelRenderer` may draw small shapes without a surface, `0` if
+            they always need their surface, `1` as discs and `2` as squares. Reset to `0` for subclasses which override
+            :func:`make_shape()` without setting it again, defaults to `0`
+
+    Notes:
+        Shapes use `__slots__`. Subclasses without `__slots__` get an instance dictionary again
     """
 
+    __slots__ = ("_alpha", "_angle", "_orig_alpha", "_orig_angle", "_shared", "_surface_key", "surface", "rect")
+
+    _store_fields = ("alpha", "angle")
+
+    pixel_form = 0
+
+    alpha = StoreField("alpha")
+    angle = StoreField("angle")
+
+    def __init_subclass__(cls, **arguments):
+        super(Shape, cls).__init_subclass__(**arguments)
+        # a shape drawing itself differently does not look like the disc or square of its parent anymore
+        if "make_shape" in cls.__dict__ and "pixel_form" not in cls.__dict__:
+            cls.pixel_form = 0
+
     def __init__(self, alpha: int = 255, angle: float = 0):
         """Constructor method
         """
+        self._store = None
+        self._index = -1
+        self._shared = False
+        self._surface_key = None
+
         self._orig_alpha = alpha
         self.alpha = self._orig_alpha
         self.angle = angle
         self._orig_angle = self.angle
 
-        self.surface: pygame.Surface = None
-        self.rect: pygame.Rect = None
+        self.surface: "pygame.Surface" = None
+        self.rect: "pygame.Rect" = None
 
     @property
     def orig_alpha(self):
@@ -68,6 +164,46 @@ class Shape(object):
         """
         return self._orig_angle
 
+    def reset(self, alpha: int = 255, angle: float = 0):
+        """Resets a detached shape to a new state, like making a new one. Used by
+            :class:`particlepy.particle.ParticlePool`
+
+        Args:
+            alpha (int, optional): Transparency of shape `(0 - 255 → RGBA)`, defaults to `255`
+            angle (float, optional): Degrees of rotation, defaults to `0`
+        """
+        self._orig_alpha = alpha
+        self.alpha = self._orig_alpha
+        self.angle = angle
+        self._orig_angle = self.angle
+        self._surface_key = None
+
+    def _attach(self, store: particlepy.store.ParticleStore, index: int):
+        super(Shape, self)._attach(store, index)
+        store.orig_alpha[index] = self._orig_alpha
+
+    def _from_store(self, store: particlepy.store.ParticleStore, index: int) -> "Shape":
+        """Makes a copy of this (prototype) shape which views row :attr:`index` of :attr:`store` and takes its original
+            values from it
+
+        Args:
+            store (:class:`particlepy.store.ParticleStore`): Store of the row
+            index (int): Row
+
+        Returns:
+            :class:`Shape`: Shape attached to the row
+        """
+        shape = copy.copy(self)
+        shape._store = store
+        shape._index = index
+        shape._shared = False
+        shape._surface_key = None
+        shape._orig_alpha = float(store.orig_alpha[index])
+        shape._orig_angle = float(store.angle[index])
+        shape.surface = store.sprites[index]
+        shape.rect = None if shape.surface is None else shape.surface.get_rect()
+        return shape
+
     def check_size_above_zero(self) -> bool:
         """Checks if surface size is above `null`
 
@@ -89,7 +225,7 @@ class Shape(object):
         """
         raise NotImplementedError
 
-    def make_surface(self) -> pygame.Surface:
+    def make_surface(self) -> "pygame.Surface":
         """Makes the surface by also calling :func:`Shape.make_shape()`
 
         Returns:
@@ -97,6 +233,29 @@ class Shape(object):
         """
         self.make_shape()
 
+    def surface_key(self) -> Hashable:
+        """Returns a key of the (quantized) visual state of the shape. If the key did not change since the surface was
+            made, the surface does not have to be made again
+
+        Returns:
+            Hashable: Key of the visual state, `None` if unknown
+        """
+        return None
+
+    def refresh_surface(self) -> bool:
+        """Calls :func:`Shape.make_surface()` only if :func:`Shape.surface_key()` changed since the last refresh
+            (dirty tracking). Shapes without key are always made again
+
+        Returns:
+            bool: `True` if the surface was made again, `False` if it was kept
+        """
+        key = self.surface_key()
+        if key is not None and key == self._surface_key and self.surface is not None:
+            return False
+        self._surface_key = key
+        self.make_surface()
+        return True
+
     def make_shape(self):
         """Is being called by :func:`Shape.make_surface()` and used to make the visual representation of the shape
         """
@@ -122,14 +281,41 @@ class BaseForm(Shape, ABC):
         _orig_alpha (int): Transparency of shape when being instanced. Property is :func:`BaseForm.orig_alpha()`
         angle (int): Degrees of rotation of shape
         _orig_angle (float): Angle of shape when being instanced. Property is :func:`BaseForm.orig_angle()`
-        surface (:class:`pygame.Surface`): Pygame surface of shape
+        surface (:class:`pygame.Surface`): Pygame surface of shape. Only made on construction if pygame is imported,
+            otherwise `None` until :func:`BaseForm.make_surface()` is called
         rect (:class:`pygame.Rect`): Pygame Rect of :attr:`surface`. Position does not affect anything
+
+    Class Attributes:
+        sprite_cache (:class:`particlepy.cache.SpriteCache`): Cache shared by all instances of the class (and subclasses)
+            to look up surfaces instead of drawing them, `None` to always draw, defaults to `None`
+        reuse_surface (bool): `True` if the surface is being drawn again instead of being made anew when its size did
+            not change (only without :attr:`sprite_cache`), defaults to `True`
+        quantizer (:class:`particlepy.cache.Quantizer`): Quantizes the visual state for :func:`BaseForm.surface_key()`
+            if there is no :attr:`sprite_cache`. `None` to only keep surfaces whose exact state did not change,
+            defaults to `None`
+        tint_cache (:class:`particlepy.cache.TintCache`): Cache shared by all instances of the class (and subclasses)
+            which draws each quantized radius and angle once in white and tints copies of it, so color changes do not
+            draw the shape again. Takes precedence over :attr:`sprite_cache`, `None` to draw every color,
+            defaults to `None`
     """
 
+    __slots__ = ("_radius", "_orig_radius", "_color", "_orig_color", "_canvas")
+
+    sprite_cache: particlepy.cache.SpriteCache = None
+    tint_cache: particlepy.cache.TintCache = None
+    reuse_surface = True
+    quantizer: particlepy.cache.Quantizer = None
+
+    _store_fields = Shape._store_fields + ("radius", "color")
+
+    radius = StoreField("size", component=0)
+    color = StoreField("color")
+
     def __init__(self, radius: float, color: Tuple[int, int, int], alpha: int = 255, angle: float = 0):
         """Constructor method
         """
         super(BaseForm, self).__init__(alpha=alpha, angle=angle)
+        self._canvas = None
 
         self.radius = radius
         self._orig_radius = self.radius
@@ -137,7 +323,8 @@ class BaseForm(Shape, ABC):
         self.color = list(color)
         self._orig_color = tuple(self.color)
 
-        self.make_surface()
+        if pygame.imported:
+            self.make_surface()
 
     @property
     def orig_radius(self):
@@ -157,6 +344,36 @@ class BaseForm(Shape, ABC):
         """
         return self._orig_color
 
+    def _attach(self, store: particlepy.store.ParticleStore, index: int):
+        super(BaseForm, self)._attach(store, index)
+        store.orig_size[index] = self._orig_radius
+        store.orig_color[index] = self._orig_color
+
+    def _from_store(self, store: particlepy.store.ParticleStore, index: int) -> "BaseForm":
+        shape = super(BaseForm, self)._from_store(store, index)
+        shape._orig_radius = float(store.orig_size[index, 0])
+        shape._orig_color = tuple(store.orig_color[index].tolist())
+        # the copy must not draw into the reused surface of the shape it was copied from
+        shape._canvas = None
+        return shape
+
+    def reset(self, radius: float, color: Tuple[int, int, int], alpha: int = 255, angle: float = 0):
+        """Resets a detached shape to a new state, like making a new one. Its surface is being reused if possible
+
+        Args:
+            radius (float): Radius of shape
+            color (Tuple[int, int, int]): Color of shape
+            alpha (int, optional): Transparency of shape `(0 - 255 → RGBA)`, defaults to `255`
+            angle (float, optional): Degrees of rotation, defaults to `0`
+        """
+        super(BaseForm, self).reset(alpha=alpha, angle=angle)
+        self.radius = radius
+        self._orig_radius = self.radius
+        self.color = list(color)
+        self._orig_color = tuple(self.color)
+        if pygame.imported:
+            self.make_surface()
+
     def check_size_above_zero(self):
         if self.radius > 0:
             return True
@@ -182,19 +399,90 @@ class BaseForm(Shape, ABC):
         if self.radius < 0:
             self.radius = 0
 
-    def make_surface(self) -> pygame.Surface:
-        """Makes the surface by also calling :func:`Shape.make_shape()`
+    def make_surface(self) -> "pygame.Surface":
+        """Makes the surface by also calling :func:`Shape.make_shape()`.
+            If :attr:`sprite_cache` is set, a cached surface of a shape with the same quantized look is used if there is one.
+            If :attr:`tint_cache` is set, a tinted copy of the cached white shape is used
 
         Returns:
             :class:`pygame.Surface`: Surface of shape
         """
-        self.surface = pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA)
+        cache = self.tint_cache if self.tint_cache is not None else self.sprite_cache
+        if cache is not None:
+            return self._make_surface(cache.make_key(type(self), self.radius, self.color, self.alpha, self.angle))
+        return self._make_surface(None)
+
+    def surface_key(self) -> Hashable:
+        """Returns the key of :attr:`tint_cache`, :attr:`sprite_cache` or :attr:`quantizer`, or the exact visual state if
+            all are `None`
+
+        Returns:
+            Hashable: Key of the visual state
+        """
+        quantizer = self.tint_cache
+        if quantizer is None:
+            quantizer = self.sprite_cache
+        if quantizer is None:
+            quantizer = self.quantizer
+        if quantizer is not None:
+            return quantizer.make_key(type(self), self.radius, self.color, self.alpha, self.angle)
+        r, g, b = self.color
+        return self.radius, float(r), float(g), float(b), self.alpha, self.angle
+
+    def refresh_surface(self) -> bool:
+        key = self.surface_key()
+        if key == self._surface_key and self.surface is not None:
+            return False
+        self._surface_key = key
+        self._make_surface(key if self.sprite_cache is not None or self.tint_cache is not None else None)
+        return True
+
+    def _make_surface(self, key: Hashable) -> "pygame.Surface":
+        tint_cache = self.tint_cache
+        if tint_cache is not None:
+            surface = tint_cache.tint(key, self.color, self.alpha, self._make_base)
+            self.surface = surface
+            self.rect = surface.get_rect()
+            return surface
+
+        cache = self.sprite_cache
+        if cache is not None:
+            surface = cache.get(key)
+            if surface is not None:
+                self.surface = surface
+                self.rect = surface.get_rect()
+                return surface
+
+        size = _pixels(self.radius * 2)
+        canvas = self._canvas
+        reuse = cache is None and self.reuse_surface and not self._shared
+        if reuse and canvas is not None and canvas.get_width() == size:
+            canvas.fill((0, 0, 0, 0))
+        else:
+            canvas = pygame.Surface((size, size), pygame.SRCALPHA)
+            if reuse:
+                self._canvas = canvas
+        self.surface = canvas
         self.surface.set_alpha(self.alpha)
         self.make_shape()
         self.surface = rotate(surface=self.surface, angle=self.angle)
         self.rect = self.surface.get_rect()
+
+        if cache is not None:
+            cache.put(key, self.surface)
         return self.surface
 
+    def _make_base(self) -> "pygame.Surface":
+        # the shape drawn in white and opaque, for the tinted copies of the tint cache
+        color = tuple(self.color)
+        self.surface = pygame.Surface((_pixels(self.radius * 2), _pixels(self.radius * 2)), pygame.SRCALPHA)
+        self.color = (255, 255, 255)
+        try:
+            self.make_shape()
+        finally:
+            self.color = color
+        return rotate(surface=self.surface, angle=self.angle)
+
     def make_shape(self):
         """Creates shape for shape surface. Can be modified to make different shapes and effects.
         """
@@ -224,6 +512,10 @@ class Circle(BaseForm, ABC):
         rect (:class:`pygame.Rect`): Pygame Rect of :attr:`surface`. Position does not affect anything
     """
 
+    __slots__ = ()
+
+    pixel_form = 1
+
     def __init__(self, radius: float, color: Tuple[int, int, int], alpha: int = 255, angle: float = 0):
         """Constructor method
         """
@@ -257,6 +549,10 @@ class Rect(BaseForm, ABC):
         rect (:class:`pygame.Rect`): Pygame Rect of :attr:`surface`. Position does not affect anything
     """
 
+    __slots__ = ()
+
+    pixel_form = 2
+
     def __init__(self, radius: float, color: Tuple[int, int, int], alpha: int = 255, angle: float = 0):
         """Constructor method
         """
@@ -268,6 +564,48 @@ class Rect(BaseForm, ABC):
         self.surface.fill(self.color)
 
 
+class Glow(BaseForm, ABC):
+    """Radial glow shape class, a disc fading out from its center, see :func:`glow_mask()`. Is subclass of
+        :class:`BaseForm` and inherits all attributes and methods. Glows look best with
+        :attr:`particlepy.particle.ParticleSystem.blend_mode` `add` and a :class:`particlepy.cache.SpriteCache`
+
+    Args:
+        radius (float): Radius of shape
+        color (Tuple[int, int, int]): Color of shape
+        alpha (int, optional): Transparency of shape `(0 - 255 → RGBA)`, defaults to `255`
+        angle (float, optional): Degrees of rotation, defaults to `0`
+
+    Attributes:
+        radius (float): Radius of shape
+        _orig_radius (float): Radius of shape when being instanced. Property is :func:`Glow.orig_radius()`
+        color (List[int, int, int]): Color of shape
+        _orig_color (Tuple[int, int, int]): Color of shape when being instanced. Property is :func:`Glow.orig_color()`
+        alpha (int): Transparency of shape, ranges from `0` to `255`
+        _orig_alpha (int): Transparency of shape when being instanced. Property is :func:`Glow.orig_alpha()`
+        angle (int): Degrees of rotation of shape
+        _orig_angle (float): Angle of shape when being instanced. Property is :func:`Glow.orig_angle()`
+        surface (:class:`pygame.Surface`): Pygame surface of shape
+        rect (:class:`pygame.Rect`): Pygame Rect of :attr:`surface`. Position does not affect anything
+
+    Class Attributes:
+        falloff (float): Power of the fade, subclass to change it, defaults to `2`
+    """
+
+    __slots__ = ()
+
+    falloff = 2
+
+    def __init__(self, radius: float, color: Tuple[int, int, int], alpha: int = 255, angle: float = 0):
+        """Constructor method
+        """
+        super(Glow, self).__init__(radius, color, alpha, angle)
+
+    def make_shape(self):
+        """Makes a radial glow
+        """
+        _draw_glow(self.surface, self.color, self.falloff)
+
+
 class Image(Shape, ABC):
     """Image shape class. Is subclass of :class:`Shape` and inherits all attributes and methods and adds to it
 
@@ -276,6 +614,8 @@ class Image(Shape, ABC):
         size (Tuple[int, int]): Scaled size of surface
         alpha (int, optional): Transparency of shape `(0 - 255 → RGBA)`, defaults to `255`
         angle (float, optional): Degrees of rotation, defaults to `0`
+        prebaked (bool, optional): `True` to pick the nearest surface of a :class:`particlepy.cache.ImageChain` shared by
+            all prebaked images of :attr:`surface` instead of scaling and rotating every frame, defaults to `False`
 
     Attributes:
         alpha (int): Transparency of shape, ranges from `0` to `255`
@@ -287,16 +627,41 @@ class Image(Shape, ABC):
         surface (:class:`pygame.Surface`): Pygame surface of shape
         _orig_surface (:class:`pygame.Surface`): Surface of shape when being instanced. Property is :func:`Image.orig_surface()`
         rect (:class:`pygame.Rect`): Pygame Rect of :attr:`surface`. Position does not affect anything
+        chain (:class:`particlepy.cache.ImageChain`): Shared pre-made surfaces in prebaked mode, `None` otherwise
+
+    Class Attributes:
+        prebake_size_steps (int): Number of sizes of new image chains, defaults to `16`
+        prebake_angle_steps (int): Number of angles of new image chains, defaults to `36`
+        prebake_max_bytes (int): Memory limit of each new image chain, defaults to `32 MiB`
     """
 
-    def __init__(self, surface: pygame.Surface, size: Tuple[int, int], alpha: int = 255, angle: float = 0):
+    __slots__ = ("_size", "_orig_size", "_source", "_orig_surface", "chain")
+
+    prebake_size_steps = 16
+    prebake_angle_steps = 36
+    prebake_max_bytes = 32 * 1024 * 1024
+
+    _store_fields = Shape._store_fields + ("size",)
+
+    size = StoreField("size")
+
+    def __init__(self, surface: "pygame.Surface", size: Tuple[int, int], alpha: int = 255, angle: float = 0,
+                 prebaked: bool = False):
         """Constructor method
         """
         super(Image, self).__init__(alpha=alpha, angle=angle)
         self._orig_size = tuple(size)
         self.size = list(self._orig_size)
 
+        self._source = surface
         self._orig_surface = surface.copy()
+        if prebaked:
+            self.chain = particlepy.cache.get_image_chain(surface=surface, size=self._orig_size,
+                                                          size_steps=self.prebake_size_steps,
+                                                          angle_steps=self.prebake_angle_steps,
+                                                          max_bytes=self.prebake_max_bytes)
+        else:
+            self.chain = None
         self.make_surface()
 
     @property
@@ -317,6 +682,43 @@ class Image(Shape, ABC):
         """
         return self._orig_surface
 
+    def _attach(self, store: particlepy.store.ParticleStore, index: int):
+        super(Image, self)._attach(store, index)
+        store.orig_size[index] = self._orig_size
+        store.color[index] = store.orig_color[index] = (255, 255, 255)
+
+    def _from_store(self, store: particlepy.store.ParticleStore, index: int) -> "Image":
+        shape = super(Image, self)._from_store(store, index)
+        shape._orig_size = tuple(store.orig_size[index].tolist())
+        return shape
+
+    def reset(self, surface: "pygame.Surface", size: Tuple[int, int], alpha: int = 255, angle: float = 0,
+              prebaked: bool = False):
+        """Resets a detached shape to a new state, like making a new one. :attr:`surface` is only being copied again if
+            it is not the surface the shape was made with
+
+        Args:
+            surface (:class:`pygame.Surface`): Surface of shape
+            size (Tuple[int, int]): Scaled size of surface
+            alpha (int, optional): Transparency of shape `(0 - 255 → RGBA)`, defaults to `255`
+            angle (float, optional): Degrees of rotation, defaults to `0`
+            prebaked (bool, optional): `True` to use a shared :class:`particlepy.cache.ImageChain`, defaults to `False`
+        """
+        super(Image, self).reset(alpha=alpha, angle=angle)
+        self._orig_size = tuple(size)
+        self.size = list(self._orig_size)
+        if surface is not self._source:
+            self._source = surface
+            self._orig_surface = surface.copy()
+        if prebaked:
+            self.chain = particlepy.cache.get_image_chain(surface=surface, size=self._orig_size,
+                                                          size_steps=self.prebake_size_steps,
+                                                          angle_steps=self.prebake_angle_steps,
+                                                          max_bytes=self.prebake_max_bytes)
+        else:
+            self.chain = None
+        self.make_surface()
+
     def check_size_above_zero(self) -> bool:
         """Checks if surface size is above `null`
 
@@ -334,7 +736,8 @@ class Image(Shape, ABC):
         Returns:
             Tuple[float, float]: :attr:`progress`, :attr:`inverted_progress`
         """
-        progress = (self.size[0] - numpy.diff(self.size) / 2) / (self._orig_size[0] - numpy.diff(self._orig_size) / 2)
+        progress = (float(self.size[0]) - (self.size[1] - self.size[0]) / 2) / \
+                   (self._orig_size[0] - (self._orig_size[1] - self._orig_size[0]) / 2)
         return progress, 1 - progress
 
     def decrease(self, delta: float):
@@ -345,21 +748,35 @@ class Image(Shape, ABC):
             if self.size[i] <= 0:
                 self.size[i] = 0
 
-    def make_surface(self) -> pygame.Surface:
+    def make_surface(self) -> "pygame.Surface":
         """Makes the surface by also calling :func:`Image.make_shape()`
 
         Returns:
             :class:`pygame.Surface`: Surface of shape
         """
+        if self.chain is not None:
+            self.surface = self.chain.get(size=self.size, angle=self.angle, alpha=self.alpha)
+            self.rect = self.surface.get_rect()
+            return self.surface
         self.make_shape()
         if self.alpha < 255:
             self.surface.set_alpha(self.alpha)
         return self.surface
 
+    def surface_key(self) -> Hashable:
+        """Returns the indices of the nearest surface of :attr:`chain`, or the scaled size, alpha and angle without chain
+
+        Returns:
+            Hashable: Key of the visual state
+        """
+        if self.chain is not None and self.chain.surfaces:
+            return self.chain.make_key(size=self.size, angle=self.angle, alpha=self.alpha)
+        width, height = self.size
+        return _pixels(width), _pixels(height), self.alpha, self.angle
+
     def make_shape(self):
         """Is being called by :func:`Image.make_surface()` and used to make the visual representation of the shape
         """
-        if self.size != self._orig_size:
-            self.surface = pygame.transform.scale(self._orig_surface, (int(self.size[0]), int(self.size[1])))
+        self.surface = pygame.transform.scale(self._orig_surface, (_pixels(self.size[0]), _pixels(self.size[1])))
         self.surface = rotate(surface=self.surface, angle=self.angle)
         self.rect = self.surface.get_rect()
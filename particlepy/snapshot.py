@@ -0,0 +1,215 @@
+# snapshot.py
+# -*- coding: utf-8 -*-
+
+from typing import Dict, Union, BinaryIO
+import json
+import os
+import struct
+import zipfile
+import numpy
+
+import particlepy.particle
+import particlepy.replay
+import particlepy.shape
+import particlepy.store
+
+FORMAT = "particlepy-snapshot"
+FORMAT_VERSION = 1
+
+# scratch column of the current step, not part of the state
+_SKIPPED_COLUMNS = ("acceleration",)
+
+
+def save(system: particlepy.particle.ParticleSystem, file: Union[str, os.PathLike, BinaryIO]):
+    """Saves the state of all particles of :attr:`system` to an uncompressed `.npz` file with one `.npy` array per
+        column of :attr:`particlepy.particle.ParticleSystem.store` and a versioned JSON header. The header holds the
+        shape class of every row (see :func:`particlepy.replay.shape_name()`), the data dictionaries of particles and
+        :attr:`particlepy.particle.ParticleSystem.data`. Surfaces, forces and other settings of the system are not saved
+
+    Args:
+        system (:class:`particlepy.particle.ParticleSystem`): Particle system
+        file (Union[str, os.PathLike, BinaryIO]): Path or binary file to write to
+
+    Raises:
+        TypeError: Data dictionaries are not JSON serializable
+    """
+    store = system.store
+    n = store.count
+
+    # shape class of every row, numbered in order of first appearance among the prototypes and particles
+    names = []
+    numbers = {}
+
+    def number(shape_type: type) -> int:
+        name = particlepy.replay.shape_name(shape_type)
+        if name not in numbers:
+            numbers[name] = len(names)
+            names.append(name)
+        return numbers[name]
+
+    lookup = numpy.array([0 if prototype is None else number(type(prototype)) for prototype in store.prototypes] or [0],
+                         dtype=numpy.int32)
+    kinds = lookup[numpy.maximum(store.kind[:n], 0)]
+    particle_data = {}
+    if store.anonymous < n:
+        for index, particle in enumerate(store.objects):
+            if particle is None:
+                continue
+            kinds[index] = number(type(particle.shape))
+            if particle._data:
+                particle_data[str(index)] = particle._data
+
+    header = {
+        "format": FORMAT,
+        "version": FORMAT_VERSION,
+        "count": n,
+        "kinds": names,
+        "alive": system.alive,
+        "data": system.data,
+        "accumulator": system._accumulator,
+        "interpolation": system.interpolation,
+        "step_count": system._step_count,
+        "particle_data": particle_data
+    }
+    arrays = {"header": numpy.frombuffer(json.dumps(header).encode("utf-8"), dtype=numpy.uint8)}
+    for name in store.columns:
+        if name not in _SKIPPED_COLUMNS:
+            arrays[name] = kinds if name == "kind" else getattr(store, name)[:n]
+    numpy.savez(file, **arrays)
+
+
+def read_header(arrays: Dict[str, numpy.ndarray]) -> dict:
+    """Returns the header of the arrays of a snapshot
+
+    Args:
+        arrays (Dict[str, :class:`numpy.ndarray`]): Arrays of a snapshot
+
+    Returns:
+        dict: Header
+
+    Raises:
+        Exception: Arrays are no snapshot or have an unsupported version
+    """
+    if "header" not in arrays:
+        raise Exception("File is no particle snapshot")
+    header = json.loads(bytes(numpy.asarray(arrays["header"])).decode("utf-8"))
+    if header.get("format") != FORMAT:
+        raise Exception("File is no particle snapshot")
+    if header["version"] > FORMAT_VERSION:
+        raise Exception("Snapshot has format version {}, only versions up to {} are supported".format(
+            header["version"], FORMAT_VERSION))
+    return header
+
+
+def map_arrays(path: Union[str, os.PathLike]) -> Dict[str, numpy.ndarray]:
+    """Maps the arrays of an uncompressed `.npz` file into memory instead of reading them. The arrays are copy on write,
+        so they can be changed without changing the file. Compressed and empty arrays are read as usual
+
+    Args:
+        path (Union[str, os.PathLike]): Path of file
+
+    Returns:
+        Dict[str, :class:`numpy.ndarray`]: Arrays by name
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as file:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = numpy.lib.format.read_array(member)
+                continue
+            # the data of stored members starts after their local header, whose extra field can differ from the one in
+            # the central directory
+            file.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", file.read(4))
+            file.seek(info.header_offset + 30 + name_length + extra_length)
+            version = numpy.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = numpy.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = numpy.lib.format.read_array_header_2_0(file)
+            if dtype.hasobject or not int(numpy.prod(shape)):
+                file.seek(info.header_offset + 30 + name_length + extra_length)
+                arrays[name] = numpy.lib.format.read_array(file)
+                continue
+            arrays[name] = numpy.memmap(path, dtype=dtype, mode="c", offset=file.tell(), shape=shape,
+                                        order="F" if fortran_order else "C")
+    return arrays
+
+
+def load(system: particlepy.particle.ParticleSystem, file: Union[str, os.PathLike, BinaryIO],
+         shapes: Dict[str, particlepy.shape.Shape] = None, mmap: bool = True) -> int:
+    """Replaces the particles of :attr:`system` with the ones of a snapshot written by :func:`save()`. With
+        :attr:`mmap`, the columns of a path are memory mapped (see :func:`map_arrays()`) and used by the store as they
+        are, so large snapshots are loaded without reading them first. Pages are read when being accessed and copied
+        when being written to. Rows are restored without :class:`particlepy.particle.Particle` objects, like rows of
+        :func:`particlepy.particle.ParticleSystem.emit_many()`, except for particles with data. Their surfaces are made
+        by the next :func:`particlepy.particle.ParticleSystem.make_shape()` call
+
+    Args:
+        system (:class:`particlepy.particle.ParticleSystem`): Particle system
+        file (Union[str, os.PathLike, BinaryIO]): Path or binary file to read from, files are never memory mapped
+        shapes (Dict[str, :class:`particlepy.shape.Shape`], optional): Prototype shapes by class name, see
+            :func:`particlepy.replay.make_prototype()`, defaults to `None`
+        mmap (bool, optional): `True` to memory map the columns, `False` to read them, defaults to `True`
+
+    Returns:
+        int: Number of loaded particles
+
+    Raises:
+        Exception: File is no snapshot or has an unsupported version
+
+    Notes:
+        Memory mapped files stay open while the store uses their columns, at most until the store grows
+    """
+    if mmap and isinstance(file, (str, os.PathLike)):
+        arrays = map_arrays(file)
+    else:
+        with numpy.load(file) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+    header = read_header(arrays)
+    count = header["count"]
+    shapes = dict(shapes) if shapes else {}
+    prototypes = [particlepy.replay.make_prototype(name, shapes) for name in header["kinds"]]
+
+    store = system.store
+    store.clear()
+    lookup = numpy.array([store.add_prototype(prototype) for prototype in prototypes] or [0], dtype=numpy.int32)
+    # only plain stores can take over mapped columns, others (e.g. in shared memory) keep their own
+    mapped = (count and type(store) is particlepy.store.ParticleStore and
+              all(isinstance(array, numpy.memmap) for array in arrays.values()))
+    if mapped:
+        for name, (width, dtype) in store.columns.items():
+            shape = (count, width) if width else (count,)
+            column = arrays.get(name)
+            if column is None or column.shape != shape or column.dtype != dtype:
+                column = numpy.zeros(shape, dtype=dtype) if column is None else column.astype(dtype).reshape(shape)
+            setattr(store, name, column)
+        store.capacity = count
+    else:
+        store.reserve(count)
+        for name in store.columns:
+            if name in arrays:
+                getattr(store, name)[:count] = arrays[name]
+    store.kind[:count] = lookup[store.kind[:count]]
+
+    store.count = count
+    store._count_prototypes()
+    store.objects.extend([None] * count)
+    store.sprites.extend([None] * count)
+    store.anonymous = count
+    for index, data in header["particle_data"].items():
+        particle = particlepy.particle.Particle._from_store(store, int(index))
+        particle.data = data
+        store.objects[int(index)] = particle
+        store.anonymous -= 1
+
+    system.alive = header["alive"]
+    system.data = header["data"]
+    system._accumulator = header["accumulator"]
+    system.interpolation = header["interpolation"]
+    system._step_count = header["step_count"]
+    if system.grid is not None:
+        system.grid.build(store.position[:count])
+    return count
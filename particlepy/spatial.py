@@ -0,0 +1,286 @@
+# spatial.py
+# -*- coding: utf-8 -*-
+
+from typing import Tuple
+import math
+import numpy
+
+import particlepy.particle
+import particlepy.shape
+import particlepy.store
+
+
+class SpatialGrid(object):
+    """Uniform grid (cell list) over particle positions for neighborhood queries. Rows are sorted by the cell they lie
+        in, so every query only looks at the particles of the cells it overlaps and finding all close pairs is linear in
+        the number of particles for bounded densities. Assign it to :attr:`particlepy.particle.ParticleSystem.grid` to
+        rebuild it after every update. The order of the last build is sorted again, which is cheap while particles stay
+        in their cells. Queries return rows of :attr:`particlepy.particle.ParticleSystem.store`
+
+    Args:
+        cell_size (float): Width and height of cells, ideally about the distance of most queries
+
+    Raises:
+        ValueError: Cell size is not positive
+
+    Attributes:
+        cell_size (float): Width and height of cells
+        count (int): Number of rows of the last build
+        order (:class:`numpy.ndarray`): Rows sorted by cell
+        keys (:class:`numpy.ndarray`): Sorted cell keys, one per row
+    """
+
+    def __init__(self, cell_size: float):
+        """Constructor method
+        """
+        if not cell_size > 0:
+            raise ValueError("Cell size of spatial grid must be positive, got {}".format(cell_size))
+        self.cell_size = float(cell_size)
+        self.count = 0
+        self.order = numpy.empty(0, dtype=numpy.intp)
+        self.keys = numpy.empty(0, dtype=numpy.int64)
+
+        self._positions = numpy.empty((0, 2), dtype=numpy.float32)
+        self._cells = numpy.empty(0, dtype=numpy.int64)
+        self._starts = numpy.empty(0, dtype=numpy.intp)
+        self._stops = numpy.empty(0, dtype=numpy.intp)
+
+    @staticmethod
+    def make_key(cell_x, cell_y):
+        """Packs cell coordinates into one integer
+
+        Args:
+            cell_x (Union[int, :class:`numpy.ndarray`]): Column of cell
+            cell_y (Union[int, :class:`numpy.ndarray`]): Row of cell
+
+        Returns:
+            Union[int, :class:`numpy.ndarray`]: Cell key
+        """
+        return (numpy.asarray(cell_x, dtype=numpy.int64) << 32) + (numpy.asarray(cell_y, dtype=numpy.int64) & 0xFFFFFFFF)
+
+    def build(self, positions: numpy.ndarray):
+        """Sorts the rows into their cells
+
+        Args:
+            positions (:class:`numpy.ndarray`): Center positions, shape `(count, 2)`
+        """
+        positions = numpy.asarray(positions, dtype=numpy.float32)
+        count = len(positions)
+        cells = numpy.floor(positions / self.cell_size).astype(numpy.int64)
+        keys = self.make_key(cells[:, 0], cells[:, 1])
+
+        if count == self.count and count:
+            # rows rarely change their cell between frames, so the last order is almost sorted already
+            order = self.order[numpy.argsort(keys[self.order], kind="stable")]
+        else:
+            order = numpy.argsort(keys, kind="stable")
+        self.count = count
+        self.order = order
+        self.keys = keys[order]
+        self._positions = positions.copy()
+
+        if count:
+            starts = numpy.flatnonzero(numpy.r_[True, self.keys[1:] != self.keys[:-1]])
+        else:
+            starts = numpy.empty(0, dtype=numpy.intp)
+        self._cells = self.keys[starts]
+        self._starts = starts
+        self._stops = numpy.r_[starts[1:], count].astype(numpy.intp)
+
+    def _ranges(self, keys: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        # start and stop in sorted order of the cells with the given keys, empty ranges for empty cells
+        index = numpy.searchsorted(self._cells, keys)
+        index = numpy.minimum(index, max(len(self._cells) - 1, 0))
+        if not len(self._cells):
+            empty = numpy.zeros(len(keys), dtype=numpy.intp)
+            return empty, empty
+        found = self._cells[index] == keys
+        return numpy.where(found, self._starts[index], 0), numpy.where(found, self._stops[index], 0)
+
+    def _gather(self, first: Tuple[int, int], last: Tuple[int, int]) -> numpy.ndarray:
+        cell_x, cell_y = numpy.meshgrid(numpy.arange(first[0], last[0] + 1), numpy.arange(first[1], last[1] + 1))
+        starts, stops = self._ranges(self.make_key(cell_x.ravel(), cell_y.ravel()))
+        if not len(starts):
+            return numpy.empty(0, dtype=numpy.intp)
+        return self.order[numpy.concatenate([numpy.arange(start, stop)
+                                             for start, stop in zip(starts.tolist(), stops.tolist())])]
+
+    def query_radius(self, point: Tuple[float, float], radius: float) -> numpy.ndarray:
+        """Returns the rows within :attr:`radius` around :attr:`point`
+
+        Args:
+            point (Tuple[float, float]): Center of query
+            radius (float): Radius of query
+
+        Returns:
+            :class:`numpy.ndarray`: Rows, ascending
+        """
+        x, y = point
+        size = self.cell_size
+        rows = self._gather((math.floor((x - radius) / size), math.floor((y - radius) / size)),
+                            (math.floor((x + radius) / size), math.floor((y + radius) / size)))
+        delta = self._positions[rows] - numpy.asarray(point, dtype=numpy.float32)
+        return numpy.sort(rows[numpy.einsum("ij,ij->i", delta, delta) <= radius * radius])
+
+    def query_rect(self, rect: Tuple[float, float, float, float]) -> numpy.ndarray:
+        """Returns the rows inside of :attr:`rect`
+
+        Args:
+            rect (Tuple[float, float, float, float]): Left, top, width and height, e.g. a :class:`pygame.Rect`
+
+        Returns:
+            :class:`numpy.ndarray`: Rows, ascending
+        """
+        left, top, width, height = rect
+        size = self.cell_size
+        rows = self._gather((math.floor(left / size), math.floor(top / size)),
+                            (math.floor((left + width) / size), math.floor((top + height) / size)))
+        positions = self._positions[rows]
+        inside = ((positions[:, 0] >= left) & (positions[:, 0] < left + width) &
+                  (positions[:, 1] >= top) & (positions[:, 1] < top + height))
+        return numpy.sort(rows[inside])
+
+    def pairs(self, distance: float) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Returns all pairs of rows closer than :attr:`distance`, every pair once
+
+        Args:
+            distance (float): Maximum distance
+
+        Returns:
+            Tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]: First and second row of each pair
+        """
+        if self.count < 2:
+            empty = numpy.empty(0, dtype=numpy.intp)
+            return empty, empty
+        reach = max(math.ceil(distance / self.cell_size), 1)
+        sorted_positions = self._positions[self.order]
+        cells_x = self.keys >> 32
+        cells_y = (self.keys & 0xFFFFFFFF).astype(numpy.int32).astype(numpy.int64)
+        own = numpy.arange(self.count)
+
+        first, second = [], []
+        for offset_y in range(0, reach + 1):
+            for offset_x in range(-reach, reach + 1):
+                if offset_y == 0 and offset_x < 0:
+                    continue
+                starts, stops = self._ranges(self.make_key(cells_x + offset_x, cells_y + offset_y))
+                if offset_y == 0 and offset_x == 0:
+                    # pairs inside of the same cell, each once
+                    starts = own + 1
+                counts = numpy.maximum(stops - starts, 0)
+                total = int(counts.sum())
+                if not total:
+                    continue
+                left = numpy.repeat(own, counts)
+                right = numpy.repeat(starts - numpy.cumsum(counts) + counts, counts) + numpy.arange(total)
+                delta = sorted_positions[left] - sorted_positions[right]
+                close = numpy.einsum("ij,ij->i", delta, delta) < distance * distance
+                first.append(left[close])
+                second.append(right[close])
+
+        if not first:
+            empty = numpy.empty(0, dtype=numpy.intp)
+            return empty, empty
+        return self.order[numpy.concatenate(first)], self.order[numpy.concatenate(second)]
+
+
+def _grid(system: particlepy.particle.ParticleSystem, distance: float) -> SpatialGrid:
+    # the grid of the system is up to date after an update, unless particles were emitted since
+    store = system.store
+    grid = system.grid
+    if grid is None:
+        grid = SpatialGrid(cell_size=distance)
+    elif grid.count == store.count:
+        return grid
+    grid.build(store.position[:store.count])
+    return grid
+
+
+def collision_radii(store: particlepy.store.ParticleStore) -> numpy.ndarray:
+    """Returns the radius of every row of :attr:`store` as circle. :class:`particlepy.shape.Image` rows keep their full
+        width and height in :attr:`particlepy.store.ParticleStore.size`, so half of the larger one is used for them
+
+    Args:
+        store (:class:`particlepy.store.ParticleStore`): Particle store
+
+    Returns:
+        :class:`numpy.ndarray`: Radii, shape `(count,)`
+    """
+    n = store.count
+    size = store.size[:n]
+    images = numpy.zeros(n, dtype=bool)
+    if store.anonymous:
+        kinds = store.kind[:n]
+        prototypes = numpy.array([isinstance(prototype, particlepy.shape.Image) for prototype in store.prototypes] +
+                                 [False])
+        images |= prototypes[kinds]
+    if store.anonymous < n:
+        images |= numpy.array([particle is not None and isinstance(particle.shape, particlepy.shape.Image)
+                               for particle in store.objects[:n]], dtype=bool)
+    return numpy.where(images, size.max(axis=1) / 2, size[:, 0])
+
+
+def repel(system: particlepy.particle.ParticleSystem, radius: float, strength: float):
+    """Pushes particles of :attr:`system` closer than :attr:`radius` away from each other, e.g. for fluid-like sparks.
+        The push falls off linearly with distance
+
+    Args:
+        system (:class:`particlepy.particle.ParticleSystem`): Particle system
+        radius (float): Distance from which on particles do not affect each other
+        strength (float): Velocity change of two particles at the same position per call
+
+    Raises:
+        ValueError: :attr:`radius` is not positive and the system has no :attr:`particlepy.particle.ParticleSystem.grid`
+    """
+    store = system.store
+    first, second = _grid(system, radius).pairs(radius)
+    if not len(first):
+        return
+    delta = store.position[first] - store.position[second]
+    distance = numpy.sqrt(numpy.einsum("ij,ij->i", delta, delta))
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        push = numpy.where(distance[:, None] > 0, delta / distance[:, None], 0)
+    push *= (strength * (1 - distance / radius))[:, None]
+    velocity = store.velocity
+    for axis in range(2):
+        velocity[:store.count, axis] += numpy.bincount(first, push[:, axis], minlength=store.count)
+        velocity[:store.count, axis] -= numpy.bincount(second, push[:, axis], minlength=store.count)
+
+
+def collide(system: particlepy.particle.ParticleSystem, restitution: float = 1):
+    """Lets overlapping particles of :attr:`system` bounce off each other. Particles are circles of their current radius
+        with equal mass. Overlaps are pushed apart and approaching velocities are reflected
+
+    Args:
+        system (:class:`particlepy.particle.ParticleSystem`): Particle system
+        restitution (float, optional): Share of the approaching speed kept after a collision, `1` for elastic and
+            `0` for inelastic collisions, defaults to `1`
+    """
+    store = system.store
+    n = store.count
+    if n < 2:
+        return
+    radii = collision_radii(store)
+    reach = 2 * float(radii.max())
+    # particles without size can not overlap
+    if reach <= 0:
+        return
+    first, second = _grid(system, reach).pairs(reach)
+    if not len(first):
+        return
+    delta = store.position[first] - store.position[second]
+    distance = numpy.sqrt(numpy.einsum("ij,ij->i", delta, delta))
+    hit = distance < radii[first] + radii[second]
+    first, second, delta, distance = first[hit], second[hit], delta[hit], distance[hit]
+    if not len(first):
+        return
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        normal = numpy.where(distance[:, None] > 0, delta / distance[:, None], (1, 0)).astype(numpy.float32)
+
+    overlap = (radii[first] + radii[second] - distance) / 2
+    approach = numpy.einsum("ij,ij->i", store.velocity[first] - store.velocity[second], normal)
+    impulse = numpy.where(approach < 0, -(1 + restitution) * approach / 2, 0)
+    for column, values in ((store.position, normal * overlap[:, None]), (store.velocity, normal * impulse[:, None])):
+        for axis in range(2):
+            column[:n, axis] += numpy.bincount(first, values[:, axis], minlength=n)
+            column[:n, axis] -= numpy.bincount(second, values[:, axis], minlength=n)
@@ -0,0 +1,190 @@
+# stats.py
+# -*- coding: utf-8 -*-
+
+from typing import Callable, Dict, List
+from collections import deque
+
+
+class FrameRecord(object):
+    """Measurements of one frame of a :class:`particlepy.particle.ParticleSystem`. A frame lasts from one call of
+        :func:`particlepy.particle.ParticleSystem.update()` to the next one
+
+    Class Attributes:
+        fields (Tuple[str, ...]): Names of all measurements
+
+    Attributes:
+        update_time (float): Seconds spent in :func:`particlepy.particle.ParticleSystem.update()`
+        make_shape_time (float): Seconds spent in :func:`particlepy.particle.ParticleSystem.make_shape()`
+        render_time (float): Seconds spent in :func:`particlepy.particle.ParticleSystem.render()`
+        alive (int): Number of particles in system at the end of the frame
+        emitted (int): Number of particles emitted
+        killed (int): Number of dead particles removed
+        surfaces (int): Number of surfaces made again by :func:`particlepy.particle.ParticleSystem.make_shape()`,
+            including surfaces taken from a :class:`particlepy.cache.SpriteCache`
+        blits (int): Number of surfaces blitted by :func:`particlepy.particle.ParticleSystem.render()`
+        pixels (int): Number of particles drawn straight into pixels by a :class:`particlepy.render.PixelRenderer`
+        force_time (float): Seconds spent evaluating :attr:`particlepy.particle.ParticleSystem.forces`, part of
+            :attr:`update_time`
+        forces (Dict[str, float]): Seconds spent evaluating each force, by :attr:`particlepy.forces.Force.name`
+    """
+
+    fields = ("update_time", "make_shape_time", "render_time", "alive", "emitted", "killed", "surfaces", "blits",
+              "pixels", "force_time")
+    __slots__ = fields + ("forces",)
+
+    def __init__(self):
+        """Constructor method
+        """
+        self.update_time = 0.0
+        self.make_shape_time = 0.0
+        self.render_time = 0.0
+        self.alive = 0
+        self.emitted = 0
+        self.killed = 0
+        self.surfaces = 0
+        self.blits = 0
+        self.pixels = 0
+        self.force_time = 0.0
+        self.forces: Dict[str, float] = {}
+
+    @property
+    def total_time(self) -> float:
+        """Returns the seconds spent in all phases
+
+        Returns:
+            float: Sum of :attr:`update_time`, :attr:`make_shape_time` and :attr:`render_time`
+        """
+        return self.update_time + self.make_shape_time + self.render_time
+
+    def as_dict(self) -> Dict[str, float]:
+        """Returns the measurements as dictionary
+
+        Returns:
+            Dict[str, float]: Measurements by field name, and the times of :attr:`forces` under `"forces"`
+        """
+        measurements = {name: getattr(self, name) for name in self.fields}
+        measurements["forces"] = dict(self.forces)
+        return measurements
+
+
+class FrameStats(object):
+    """Rolling window of :class:`FrameRecord` objects. Assign it to
+        :attr:`particlepy.particle.ParticleSystem.stats` to enable instrumentation of a particle system.
+        Without it the system does not measure anything
+
+    Args:
+        window (int, optional): Number of frames kept in :attr:`frames`, defaults to `120`
+
+    Attributes:
+        window (int): Number of frames kept in :attr:`frames`
+        frames (Deque[:class:`FrameRecord`]): Last finished frames, oldest first
+        current (:class:`FrameRecord`): Frame which is being measured
+        frame_count (int): Number of finished frames
+        callbacks (List[Callable[[:class:`FrameRecord`], None]]): Functions called with every finished frame
+    """
+
+    def __init__(self, window: int = 120):
+        """Constructor method
+        """
+        self.window = window
+        self.frames = deque(maxlen=window)
+        self.current = FrameRecord()
+        self.frame_count = 0
+        self.callbacks: List[Callable[[FrameRecord], None]] = []
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def last(self) -> FrameRecord:
+        """Returns the last finished frame
+
+        Returns:
+            :class:`FrameRecord`: Last finished frame, `None` if no frame is finished yet
+        """
+        return self.frames[-1] if self.frames else None
+
+    def add_callback(self, callback: Callable[[FrameRecord], None]):
+        """Adds a function which is called with every finished frame, e.g. to log frames which blew their budget
+
+        Args:
+            callback (Callable[[:class:`FrameRecord`], None]): Function to add
+        """
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[FrameRecord], None]):
+        """Removes a function added by :func:`FrameStats.add_callback()`
+
+        Args:
+            callback (Callable[[:class:`FrameRecord`], None]): Function to remove
+        """
+        self.callbacks.remove(callback)
+
+    def next_frame(self, alive: int):
+        """Finishes :attr:`current`, adds it to :attr:`frames`, calls :attr:`callbacks` and starts a new frame.
+            Called by :func:`particlepy.particle.ParticleSystem.update()`
+
+        Args:
+            alive (int): Number of particles in system at the end of the frame
+        """
+        record = self.current
+        record.alive = alive
+        self.frames.append(record)
+        self.frame_count += 1
+        self.current = FrameRecord()
+        for callback in self.callbacks:
+            callback(record)
+
+    def mean(self, name: str) -> float:
+        """Returns the mean of a measurement over :attr:`frames`
+
+        Args:
+            name (str): Name of measurement, see :attr:`FrameRecord.fields`, or `"total_time"`
+
+        Returns:
+            float: Mean value, `0` if no frame is finished yet
+        """
+        if not self.frames:
+            return 0.0
+        return sum(getattr(record, name) for record in self.frames) / len(self.frames)
+
+    def max(self, name: str) -> float:
+        """Returns the maximum of a measurement over :attr:`frames`
+
+        Args:
+            name (str): Name of measurement, see :attr:`FrameRecord.fields`, or `"total_time"`
+
+        Returns:
+            float: Maximum value, `0` if no frame is finished yet
+        """
+        return max((getattr(record, name) for record in self.frames), default=0)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Returns mean and maximum of all measurements over :attr:`frames`
+
+        Returns:
+            Dict[str, Dict[str, float]]: :code:`{"mean": ..., "max": ...}` by measurement name
+        """
+        return {name: {"mean": self.mean(name), "max": self.max(name)}
+                for name in FrameRecord.fields + ("total_time",)}
+
+    def force_summary(self) -> Dict[str, Dict[str, float]]:
+        """Returns mean and maximum of the time spent on each force over :attr:`frames`. Frames in which a force was
+            disabled count as `0`
+
+        Returns:
+            Dict[str, Dict[str, float]]: :code:`{"mean": ..., "max": ...}` in seconds by force name
+        """
+        names = {}
+        for record in self.frames:
+            names.update(dict.fromkeys(record.forces))
+        return {name: {"mean": sum(record.forces.get(name, 0.0) for record in self.frames) / len(self.frames),
+                       "max": max(record.forces.get(name, 0.0) for record in self.frames)}
+                for name in names}
+
+    def reset(self):
+        """Removes all frames and starts measuring a new frame. Callbacks are kept
+        """
+        self.frames.clear()
+        self.current = FrameRecord()
+        self.frame_count = 0
@@ -0,0 +1,520 @@
+# store.py
+# -*- coding: utf-8 -*-
+
+from typing import Tuple, List, Dict
+import copy
+import numpy
+
+
+class StoreField(object):
+    """Descriptor for particle and shape attributes which can live inside a :class:`ParticleStore`.
+        As long as the owner is not attached to a store, the value is kept on the object itself (e.g. :code:`_position`).
+        After being attached, the value is read from and written to the row :attr:`_index` of the store column.
+
+    Args:
+        column (str): Name of the store column
+        component (int, optional): Reads only this component of a vector column and writes the value to the whole row,
+            defaults to `None`
+        cast (type, optional): Type scalar values are converted to when being read from the store, defaults to `float`
+    """
+
+    def __init__(self, column: str, component: int = None, cast: type = float):
+        """Constructor method
+        """
+        self.column = column
+        self.component = component
+        self.cast = cast
+        self.name = None
+        self.local = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.local = "_" + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        store = instance._store
+        if store is None:
+            return getattr(instance, self.local)
+        column = getattr(store, self.column)
+        if self.component is not None:
+            return self.cast(column[instance._index, self.component])
+        if column.ndim == 1:
+            return self.cast(column[instance._index])
+        return column[instance._index]
+
+    def __set__(self, instance, value):
+        store = instance._store
+        if store is None:
+            setattr(instance, self.local, value)
+        else:
+            getattr(store, self.column)[instance._index] = value
+
+
+class StoreView(object):
+    """Base class for objects whose attributes can be backed by a :class:`ParticleStore`.
+        Subclasses list their :class:`StoreField` names in :attr:`_store_fields` and have to set :attr:`_store` to `None`
+        and :attr:`_index` to `-1` before setting any of them
+
+    Attributes:
+        _store (:class:`ParticleStore`): Store the object is attached to, `None` if detached
+        _index (int): Row of the object inside of :attr:`_store`
+    """
+
+    __slots__ = ("_store", "_index")
+
+    _store_fields: Tuple[str, ...] = ()
+
+    def _attach(self, store: "ParticleStore", index: int):
+        """Moves the values of all store fields into row :attr:`index` of :attr:`store`. The values kept on the object
+            are dropped, so attached objects do not hold any lists
+
+        Args:
+            store (:class:`ParticleStore`): Store to attach to
+            index (int): Row inside of the store
+        """
+        values = [getattr(self, name) for name in self._store_fields]
+        self._store = store
+        self._index = index
+        for name, value in zip(self._store_fields, values):
+            setattr(self, name, value)
+            setattr(self, "_" + name, None)
+
+    def _detach(self):
+        """Copies the values of all store fields out of the store and detaches the object
+        """
+        values = [getattr(self, name) for name in self._store_fields]
+        self._store = None
+        self._index = -1
+        for name, value in zip(self._store_fields, values):
+            setattr(self, name, value.tolist() if isinstance(value, numpy.ndarray) else value)
+
+
+class ParticleStore(object):
+    """Structure of arrays holding the state of all particles of a :class:`particlepy.particle.ParticleSystem`.
+        Every column is a contiguous `float32` array (:attr:`alive` is `bool`), row `i` belongs to :code:`objects[i]`.
+        Only the first :attr:`count` rows are in use, the arrays grow by doubling.
+
+    Args:
+        capacity (int, optional): Number of preallocated rows, defaults to `256`
+
+    Attributes:
+        count (int): Number of particles in store
+        capacity (int): Number of allocated rows
+        objects (List[:class:`particlepy.particle.Particle`]): Particle of each row, `None` for rows added by
+            :func:`ParticleStore.add_many()`
+        sprites (List[:class:`pygame.Surface`]): Surface of each row which is being rendered, `None` until made
+        position (:class:`numpy.ndarray`): Center positions, shape `(capacity, 2)`
+        velocity (:class:`numpy.ndarray`): Velocities, shape `(capacity, 2)`
+        size (:class:`numpy.ndarray`): Size of shapes, shape `(capacity, 2)`. Radius of :class:`particlepy.shape.BaseForm` in both components
+        orig_size (:class:`numpy.ndarray`): Size of shapes when being emitted, shape `(capacity, 2)`
+        delta_radius (:class:`numpy.ndarray`): Radius decrease values, shape `(capacity,)`
+        color (:class:`numpy.ndarray`): Colors, shape `(capacity, 3)`
+        orig_color (:class:`numpy.ndarray`): Colors when being emitted, shape `(capacity, 3)`
+        alpha (:class:`numpy.ndarray`): Transparencies, shape `(capacity,)`
+        orig_alpha (:class:`numpy.ndarray`): Transparencies when being emitted, shape `(capacity,)`
+        angle (:class:`numpy.ndarray`): Degrees of rotation, shape `(capacity,)`
+        progress (:class:`numpy.ndarray`): Life span identifiers ranging from `1` to `0`, shape `(capacity,)`
+        time (:class:`numpy.ndarray`): Timers, shape `(capacity,)`
+        alive (:class:`numpy.ndarray`): `True` if particle is alive, shape `(capacity,)`
+        offset (:class:`numpy.ndarray`): Half size of :attr:`sprites`, shape `(capacity, 2)`
+        previous_position (:class:`numpy.ndarray`): Center positions before the last fixed step, used for interpolation,
+            shape `(capacity, 2)`
+        kind (:class:`numpy.ndarray`): Index into :attr:`prototypes` for rows without particle object, `-1` otherwise,
+            shape `(capacity,)`
+        acceleration (:class:`numpy.ndarray`): Sum of the forces of the current step, added to the velocity like
+            gravity if :func:`ParticleStore.update()` is called with :attr:`accelerate`, shape `(capacity, 2)`
+        form (:class:`numpy.ndarray`): :attr:`particlepy.shape.Shape.pixel_form` of the shape of each row, shape
+            `(capacity,)`
+        prototypes (List[:class:`particlepy.shape.Shape`]): Shapes which make the surfaces of rows without particle object,
+            `None` for free slots
+        anonymous (int): Number of rows without particle object (`None` in :attr:`objects`)
+    """
+
+    columns = {
+        "position": (2, numpy.float32),
+        "velocity": (2, numpy.float32),
+        "size": (2, numpy.float32),
+        "orig_size": (2, numpy.float32),
+        "delta_radius": (0, numpy.float32),
+        "color": (3, numpy.float32),
+        "orig_color": (3, numpy.float32),
+        "alpha": (0, numpy.float32),
+        "orig_alpha": (0, numpy.float32),
+        "angle": (0, numpy.float32),
+        "progress": (0, numpy.float32),
+        "time": (0, numpy.float32),
+        "alive": (0, bool),
+        "offset": (2, numpy.float32),
+        "previous_position": (2, numpy.float32),
+        "kind": (0, numpy.int32),
+        "acceleration": (2, numpy.float32),
+        "form": (0, numpy.int8)
+    }
+
+    # columns read by ParticleStore.update() and the ones it writes
+    _update_columns = ("position", "velocity", "size", "orig_size", "delta_radius", "progress", "time", "alive",
+                       "acceleration")
+    _updated_columns = ("position", "velocity", "size", "progress", "time", "alive")
+
+    def __init__(self, capacity: int = 256):
+        """Constructor method
+        """
+        self.count = 0
+        self.capacity = 0
+        self.objects: List = []
+        self.sprites: List = []
+        self.prototypes: List = []
+        self._prototype_indices: Dict[int, int] = {}
+        # shape each prototype was copied from, keeps a reference so that its id can not be reused
+        self._prototype_shapes: List = []
+        self._prototype_counts: List[int] = []
+        self._free_prototypes: List[int] = []
+        self.anonymous = 0
+        self.reserve(max(capacity, 1))
+
+    def reserve(self, capacity: int):
+        """Grows the columns so that at least :attr:`capacity` rows are allocated
+
+        Args:
+            capacity (int): Minimum number of rows
+        """
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, self.capacity * 2)
+        for name, (width, dtype) in self.columns.items():
+            shape = (capacity, width) if width else (capacity,)
+            column = numpy.zeros(shape, dtype=dtype)
+            if self.capacity:
+                column[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def add(self, particle) -> int:
+        """Attaches a particle and its shape to a new row
+
+        Args:
+            particle (:class:`particlepy.particle.Particle`): Particle to add
+
+        Returns:
+            int: Row of the particle
+
+        Raises:
+            Exception: Particle already belongs to a particle store
+        """
+        if particle._store is not None:
+            raise Exception("Particle already belongs to a particle system")
+        self.reserve(self.count + 1)
+        index = self.count
+        self.count += 1
+        particle._attach(self, index)
+        self.previous_position[index] = self.position[index]
+        self.kind[index] = -1
+        self.form[index] = particle.shape.pixel_form
+        self.objects.append(particle)
+        self.sprites.append(None)
+        self.set_sprite(index, particle.shape.surface)
+        return index
+
+    def add_prototype(self, shape) -> int:
+        """Registers a copy of :attr:`shape` which makes the surfaces of rows added by :func:`ParticleStore.add_many()`.
+            The copy is attached to the store and moved to the row it is making a surface for. Copies are looked up by
+            the identity of :attr:`shape`, so callers should pass the same shape for all rows of a kind. A copy is kept
+            as long as rows of it are alive, changes of :attr:`shape` in the meantime are not picked up. Its slot is
+            freed by :func:`ParticleStore.remove_dead()` once no rows are left and reused by the next new prototype
+
+        Args:
+            shape (:class:`particlepy.shape.Shape`): Shape to copy
+
+        Returns:
+            int: Index of prototype in :attr:`prototypes`
+        """
+        index = self._prototype_indices.get(id(shape))
+        if index is not None:
+            return index
+        prototype = copy.copy(shape)
+        prototype._store = self
+        prototype._index = 0
+        # the prototype draws the surfaces of many rows, so it must not draw into the same surface again
+        prototype._shared = True
+        # nor into the reused surface (see particlepy.shape.BaseForm.reuse_surface) of the shape it was copied from
+        if hasattr(prototype, "_canvas"):
+            prototype._canvas = None
+        if self._free_prototypes:
+            index = self._free_prototypes.pop()
+            self.prototypes[index] = prototype
+            self._prototype_shapes[index] = shape
+        else:
+            index = len(self.prototypes)
+            self.prototypes.append(prototype)
+            self._prototype_shapes.append(shape)
+            self._prototype_counts.append(0)
+        self._prototype_indices[id(shape)] = index
+        return index
+
+    def _count_prototypes(self):
+        # counts the rows of each prototype again, after the kind column was written directly
+        kinds = self.kind[:self.count]
+        counts = numpy.bincount(kinds[kinds >= 0], minlength=len(self.prototypes))
+        self._prototype_counts = counts.tolist()
+
+    def _release_prototypes(self, kinds: numpy.ndarray):
+        # forgets the rows of removed kinds and frees the prototypes without rows
+        kinds = kinds[kinds >= 0]
+        if not len(kinds):
+            return
+        counts = self._prototype_counts
+        for index, removed in enumerate(numpy.bincount(kinds, minlength=len(counts)).tolist()):
+            counts[index] -= removed
+            if not counts[index] and self.prototypes[index] is not None:
+                del self._prototype_indices[id(self._prototype_shapes[index])]
+                self.prototypes[index] = None
+                self._prototype_shapes[index] = None
+                self._free_prototypes.append(index)
+
+    def add_many(self, count: int, shape, position, velocity, delta_radius, size, color, alpha, angle) -> slice:
+        """Adds :attr:`count` rows without particle objects. All values are broadcast to :attr:`count` rows
+
+        Args:
+            count (int): Number of rows
+            shape (:class:`particlepy.shape.Shape`): Prototype of the shapes, see :func:`ParticleStore.add_prototype()`
+            position (:class:`numpy.ndarray`): Center positions, shape `(count, 2)` or `(2,)`
+            velocity (:class:`numpy.ndarray`): Velocities, shape `(count, 2)` or `(2,)`
+            delta_radius (:class:`numpy.ndarray`): Radius decrease values, shape `(count,)` or scalar
+            size (:class:`numpy.ndarray`): Sizes, shape `(count, 2)`, `(count, 1)` or `(2,)`
+            color (:class:`numpy.ndarray`): Colors, shape `(count, 3)` or `(3,)`
+            alpha (:class:`numpy.ndarray`): Transparencies, shape `(count,)` or scalar
+            angle (:class:`numpy.ndarray`): Degrees of rotation, shape `(count,)` or scalar
+
+        Returns:
+            slice: Rows which were added
+        """
+        kind = self.add_prototype(shape)
+        self.reserve(self.count + count)
+        rows = slice(self.count, self.count + count)
+
+        self.position[rows] = position
+        self.previous_position[rows] = self.position[rows]
+        self.velocity[rows] = velocity
+        self.delta_radius[rows] = delta_radius
+        self.size[rows] = self.orig_size[rows] = size
+        self.color[rows] = self.orig_color[rows] = color
+        self.alpha[rows] = self.orig_alpha[rows] = alpha
+        self.angle[rows] = angle
+        self.progress[rows] = 1
+        self.time[rows] = 0
+        self.alive[rows] = True
+        self.kind[rows] = kind
+        self.form[rows] = shape.pixel_form
+        self._prototype_counts[kind] += count
+
+        self.count += count
+        self.objects.extend([None] * count)
+        self.sprites.extend([None] * count)
+        self.anonymous += count
+        return rows
+
+    def set_sprite(self, index: int, surface):
+        """Sets the rendered surface of row :attr:`index`
+
+        Args:
+            index (int): Row
+            surface (:class:`pygame.Surface`): Surface of the row
+        """
+        self.sprites[index] = surface
+        if surface is not None:
+            self.offset[index] = surface.get_width() / 2, surface.get_height() / 2
+
+    def set_sprites(self, sprites: List, rows: numpy.ndarray = None):
+        """Sets the rendered surfaces of all rows, or of :attr:`rows` only, at once
+
+        Args:
+            sprites (List[:class:`pygame.Surface`]): Surface of each row, or of each of :attr:`rows`
+            rows (:class:`numpy.ndarray`, optional): Rows to set, defaults to `None` for all rows
+        """
+        if rows is None:
+            self.sprites[:] = sprites
+            rows = slice(0, self.count)
+        else:
+            for index, sprite in zip(rows.tolist(), sprites):
+                self.sprites[index] = sprite
+        if sprites:
+            self.offset[rows] = numpy.array([sprite.get_size() for sprite in sprites], dtype=numpy.float32)
+            self.offset[rows] *= 0.5
+
+    def clear(self):
+        """Detaches all particles, empties the store and frees all prototypes
+        """
+        for particle in self.objects:
+            if particle is not None:
+                particle._detach()
+        self.objects.clear()
+        self.sprites.clear()
+        self.prototypes.clear()
+        self._prototype_indices.clear()
+        self._prototype_shapes.clear()
+        self._prototype_counts.clear()
+        self._free_prototypes.clear()
+        self.anonymous = 0
+        self.count = 0
+
+    def update(self, delta_time, gravity: Tuple[float, float] = None, time_based: bool = False, steps=1,
+               accelerate: bool = False):
+        """Vectorized version of :func:`particlepy.particle.Particle.update()` for all particles in store
+
+        Args:
+            delta_time (Union[float, :class:`numpy.ndarray`]): A value to let the particles move according to frame time,
+                or one value per particle
+            gravity (Tuple[float, float], optional): Affects the velocity and 'pulls' particles in a direction, defaults to None
+            time_based (bool, optional): `True` if :attr:`delta_radius` and :attr:`gravity` are rates per second and
+                are scaled by :attr:`delta_time`, `False` if they are applied once per call, defaults to `False`
+            steps (Union[int, :class:`numpy.ndarray`], optional): Number of frames the update stands for, or one number
+                per particle. Without :attr:`time_based`, radius decrease and gravity are applied that many times,
+                defaults to `1`
+            accelerate (bool, optional): `True` to add :attr:`acceleration` to the velocity like :attr:`gravity`,
+                defaults to `False`
+        """
+        n = self.count
+        if not n:
+            return
+        if not isinstance(delta_time, numpy.ndarray):
+            delta_time = numpy.float32(delta_time)
+        scale = delta_time if time_based else steps
+        scaled = isinstance(scale, numpy.ndarray) or scale != 1
+
+        size = self.size[:n]
+        if scaled:
+            size -= (self.delta_radius[:n] * scale)[:, None]
+        else:
+            size -= self.delta_radius[:n, None]
+        numpy.maximum(size, 0, out=size)
+
+        above_zero = (size[:, 0] > 0) & (size[:, 1] > 0)
+        alive = self.alive[:n]
+        moving = alive & above_zero
+
+        step = moving.astype(numpy.float32)
+        step *= delta_time
+        self.position[:n] += self.velocity[:n] * step[:, None]
+        if gravity or accelerate:
+            if scaled:
+                pull = moving.astype(numpy.float32)
+                pull *= scale
+            else:
+                pull = moving
+            if gravity:
+                self.velocity[:n] += numpy.asarray(gravity, dtype=numpy.float32) * pull[:, None]
+            if accelerate:
+                self.velocity[:n] += self.acceleration[:n] * pull[:, None]
+
+        orig_size = self.orig_size[:n]
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            progress = (1.5 * size[:, 0] - 0.5 * size[:, 1]) / (1.5 * orig_size[:, 0] - 0.5 * orig_size[:, 1])
+        numpy.copyto(self.progress[:n], progress, where=moving)
+        self.time[:n] += step
+
+        alive &= above_zero
+
+    def update_rows(self, rows: numpy.ndarray, delta_time, gravity: Tuple[float, float] = None,
+                    time_based: bool = False, steps=1, accelerate: bool = False):
+        """Updates only :attr:`rows` like :func:`ParticleStore.update()`. The rows are copied out, updated and copied
+            back, which is cheaper than updating all rows if only few of them are chosen
+
+        Args:
+            rows (:class:`numpy.ndarray`): Rows to update
+            delta_time (Union[float, :class:`numpy.ndarray`]): A value to let the particles move according to frame
+                time, or one value per row
+            gravity (Tuple[float, float], optional): Affects the velocity and 'pulls' particles in a direction, defaults to None
+            time_based (bool, optional): `True` if :attr:`delta_radius` and :attr:`gravity` are rates per second,
+                defaults to `False`
+            steps (Union[int, :class:`numpy.ndarray`], optional): Number of frames the update stands for, or one
+                number per row, defaults to `1`
+            accelerate (bool, optional): `True` to add :attr:`acceleration` to the velocity, defaults to `False`
+        """
+        part = ParticleStore.__new__(ParticleStore)
+        part.count = len(rows)
+        if not part.count:
+            return
+        for name in self._update_columns:
+            setattr(part, name, getattr(self, name)[rows])
+        ParticleStore.update(part, delta_time=delta_time, gravity=gravity, time_based=time_based, steps=steps,
+                             accelerate=accelerate)
+        for name in self._updated_columns:
+            getattr(self, name)[rows] = getattr(part, name)
+
+    def view(self, start: int, stop: int) -> "ParticleStore":
+        """Returns a store whose columns are views of rows :attr:`start` to :attr:`stop`, e.g. to update only these rows
+            in place. Only the columns are shared, particle objects and surfaces are not part of the view
+
+        Args:
+            start (int): First row
+            stop (int): Row after the last one
+
+        Returns:
+            :class:`ParticleStore`: View of the rows
+        """
+        part = ParticleStore.__new__(ParticleStore)
+        for name in self.columns:
+            setattr(part, name, getattr(self, name)[start:stop])
+        part.count = max(min(stop, self.count) - start, 0)
+        part.capacity = part.count
+        return part
+
+    def remove_dead(self, ordered: bool = True, removed: List = None) -> int:
+        """Removes all rows whose particle is not alive anymore. Removed particles are detached from the store and keep
+            their last state. Cost is linear in the number of rows, independent of how many particles died
+
+        Args:
+            ordered (bool, optional): `True` to keep the emission order of the remaining particles by shifting them down,
+                `False` to fill the holes with the last rows of the store (swap with last), which only moves as many rows
+                as particles died, defaults to `True`
+            removed (List[:class:`particlepy.particle.Particle`], optional): List the detached particles are appended to,
+                defaults to `None`
+
+        Returns:
+            int: Number of removed particles
+        """
+        n = self.count
+        alive = self.alive[:n]
+        dead = numpy.flatnonzero(~alive)
+        if not len(dead):
+            return 0
+
+        for index in dead.tolist():
+            particle = self.objects[index]
+            if particle is None:
+                self.anonymous -= 1
+            else:
+                particle._detach()
+                if removed is not None:
+                    removed.append(particle)
+        self._release_prototypes(self.kind[dead])
+
+        count = n - len(dead)
+        if ordered:
+            first = int(dead[0])
+            source = first + numpy.flatnonzero(alive[first:])
+            target = numpy.arange(first, count)
+        else:
+            target = dead[dead < count]
+            source = count + numpy.flatnonzero(alive[count:])
+
+        if len(target):
+            for name in self.columns:
+                column = getattr(self, name)
+                column[target] = column[source]
+
+            objects = self.objects
+            sprites = self.sprites
+            for index, moved in zip(target.tolist(), source.tolist()):
+                particle = objects[moved]
+                if particle is not None:
+                    particle._set_index(index)
+                objects[index] = particle
+                sprites[index] = sprites[moved]
+        del self.objects[count:]
+        del self.sprites[count:]
+
+        self.count = count
+        return len(dead)
@@ -110,7 +110,7 @@ setup(
     },
     python_requires=REQUIRES_PYTHON,
     url=URL,
-    packages=find_packages(exclude=["tests", "*.tests", "*.tests.*", "tests.*"]),
+    packages=find_packages(exclude=["tests", "*.tests", "*.tests.*", "tests.*", "benchmarks", "benchmarks.*"]),
     # If your package is a single module, use this instead of 'packages':
     # py_modules=['mypackage'],
 